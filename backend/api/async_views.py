@@ -0,0 +1,143 @@
+"""
+Coroutine versions of the read-heavy endpoints, routed in place of their sync
+counterparts when ``ASYNC_VIEWS`` is on (``SERVER_MODE=asgi``, see
+config/urls.py). Under uvicorn workers a request waiting on the database or
+the cache gives the event loop back instead of holding the whole worker.
+
+DRF itself is synchronous: ``AsyncDispatchMixin`` runs authentication,
+permissions and the remaining sync handlers (writes, detail views) in a
+thread and awaits the async ones.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.utils.cache import get_conditional_response, parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import telemetry, views
+from .pagination import keyset_requested
+from .stats import acurrent_generation, aget_dashboard_stats
+
+
+class AsyncDispatchMixin:
+    """DRF's ``APIView.dispatch`` as a coroutine, for views and viewsets."""
+    view_is_async = True
+
+    @classmethod
+    def as_view(cls, *args, **initkwargs):
+        # ViewSetMixin.as_view does not mark its view for Django's async handler.
+        return markcoroutinefunction(super().as_view(*args, **initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            if not iscoroutinefunction(handler):
+                handler = sync_to_async(handler)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncListMixin:
+    """``ConditionalGetMixin.list`` with the validator and the page read through the async ORM."""
+
+    async def list(self, request, *args, **kwargs):
+        if keyset_requested(request):
+            return await sync_to_async(super().list)(request, *args, **kwargs)
+
+        # Filter backends may validate choices against the database (?member=).
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        etag = self.list_etag(await queryset.order_by().aaggregate(**self.list_version()))
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return self._conditional(not_modified, etag)
+
+        values_serializer = self.get_values_serializer(queryset)
+        if values_serializer is not None:
+            queryset = values_serializer.rows(queryset)
+        page = await self.apaginate_queryset(queryset)
+        # Async iteration runs the planned prefetches too.
+        rows = [obj async for obj in queryset] if page is None else page
+        if values_serializer is not None:
+            # Nested lists are one query each, read in a thread.
+            data = await sync_to_async(values_serializer.to_representation)(rows)
+        else:
+            data = self.get_serializer(rows, many=True).data
+        response = Response(data) if page is None else self.get_paginated_response(data)
+        return self._conditional(response, etag)
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+
+
+class AsyncFacetMixin:
+    """``FacetMixin.list`` around the async list; a cache miss counts in a thread."""
+
+    async def list(self, request, *args, **kwargs):
+        fields = self.requested_facets()
+        response = await super().list(request, *args, **kwargs)
+        # Cursor pages went through the sync list, facets included.
+        if fields and response.status_code == 200 and 'facets' not in response.data:
+            response.data['facets'] = await sync_to_async(self.get_facets)(fields)
+        return response
+
+
+class AsyncInstituteViewSet(AsyncDispatchMixin, AsyncListMixin, views.InstituteViewSet):
+    pass
+
+
+class AsyncMemberViewSet(AsyncDispatchMixin, AsyncFacetMixin, AsyncListMixin, views.MemberViewSet):
+    pass
+
+
+class AsyncAnalysisViewSet(AsyncDispatchMixin, AsyncFacetMixin, AsyncListMixin, views.AnalysisViewSet):
+    pass
+
+
+class AsyncShiftViewSet(AsyncDispatchMixin, AsyncListMixin, views.ShiftViewSet):
+    pass
+
+
+class AsyncDashboardStatsView(AsyncDispatchMixin, views.DashboardStatsView):
+    async def get(self, request):
+        etag = self.get_etag(await acurrent_generation())
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(await aget_dashboard_stats(), headers={'ETag': etag})
+
+
+class AsyncLhcTelemetryView(AsyncDispatchMixin, views.LhcTelemetryView):
+    async def get(self, request):
+        try:
+            since = self.get_since(request)
+        except ValueError:
+            return Response({"detail": self.invalid_since}, status=status.HTTP_400_BAD_REQUEST)
+
+        current_status = await telemetry.aget_beam_status()
+        if since is not None:
+            samples = await telemetry.asamples_since(since, request.query_params.get('sensor'))
+            return self.history_response(samples, current_status)
+        return self.latest_response(await telemetry.aget_last_sample(), current_status)
+
+
+class AsyncLhcStatusView(AsyncDispatchMixin, APIView):
+    async def get(self, request):
+        return Response({"status": await telemetry.aget_beam_status()}, status=status.HTTP_200_OK)
+
+
+async_get_lhc_status = AsyncLhcStatusView.as_view()
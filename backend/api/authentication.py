@@ -0,0 +1,82 @@
+"""
+Stateless JWT authentication (``JWT_AUTH_MODE=stateless``, the default).
+
+simplejwt's ``JWTAuthentication`` loads the ``User`` row on every request.
+``StatelessJWTAuthentication`` builds a ``TokenUser`` from the verified claims
+instead, and keeps recently verified tokens in a small per-process LRU so a
+client polling with the same token skips the signature check as well. An
+entry lives for ``JWT_TOKEN_CACHE_TTL`` seconds at most and never past the
+token's own expiry.
+
+The trade-off: deactivating an account only locks it out once its access
+token expires. Admin-only actions therefore re-read the account
+(``permissions.IsAdminUserFromDatabase``).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+
+class TokenCache:
+    """A thread-safe LRU whose entries also expire after their own lifetime."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, lifetime):
+        """Stores ``value`` for ``lifetime`` seconds, capped at the cache's TTL."""
+        lifetime = min(self.ttl, lifetime)
+        if lifetime <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + lifetime, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(settings.JWT_TOKEN_CACHE_SIZE, settings.JWT_TOKEN_CACHE_TTL)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """``JWTStatelessUserAuthentication`` with verified tokens cached per raw token."""
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        authenticated = token_cache.get(raw_token)
+        if authenticated is None:
+            validated_token = self.get_validated_token(raw_token)
+            authenticated = (self.get_user(validated_token), validated_token)
+            token_cache.set(raw_token, authenticated, validated_token['exp'] - time.time())
+        return authenticated
@@ -0,0 +1,35 @@
+"""
+Endpoint benchmarks under plain pytest, without pytest-django:
+
+    pytest api/benchmark_test.py
+
+Volumes come from BENCHMARK_MEMBERS / _PAPERS / _SHIFTS, the JSON report goes
+to BENCHMARK_REPORT and BENCHMARK_BASELINE names a previous report to compare
+with. ``manage.py test`` does not collect this module.
+"""
+import json
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from api.benchmarks import (  # noqa: E402
+    DEFAULT_VOLUMES, benchmark_database, check_report, run_benchmarks, write_report,
+)
+
+
+def test_endpoints_within_budget():
+    volumes = {key: int(os.environ.get(f'BENCHMARK_{key.upper()}', default)) for key, default in DEFAULT_VOLUMES.items()}
+    baseline = None
+    if os.environ.get('BENCHMARK_BASELINE'):
+        with open(os.environ['BENCHMARK_BASELINE']) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    with benchmark_database():
+        report = run_benchmarks(volumes, repeat=int(os.environ.get('BENCHMARK_REPEAT', 20)))
+    write_report(report, os.environ.get('BENCHMARK_REPORT', 'benchmark-report.json'))
+
+    failures = check_report(report, baseline)
+    assert not failures, "Benchmark budgets exceeded:\n" + "\n".join(failures)
@@ -0,0 +1,350 @@
+"""
+Endpoint benchmarks shared by ``manage.py benchmark_endpoints`` and
+``pytest api/benchmark_test.py``.
+
+Every case is requested a few times untimed, once under query capture, once
+under tracemalloc and then ``repeat`` times on the clock. The report is
+compared against the declared budgets and, optionally, a previous report.
+
+``gunicorn`` and ``load_test`` drive a real server instead, for the
+throughput comparisons (``benchmark_server_modes``, ``benchmark_auth``).
+"""
+import http.client
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment,
+)
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import Analysis, Member, Shift
+
+DEFAULT_VOLUMES = {'members': 5000, 'papers': 300, 'shifts': 6000}
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+SERVERS = {
+    'wsgi': ['config.wsgi:application'],
+    'asgi': ['--worker-class', 'uvicorn_worker.UvicornWorker', 'config.asgi:application'],
+}
+STARTUP_TIMEOUT = 60
+READY_PATH = '/api/get-lhc-status/'
+
+# Budgets at DEFAULT_VOLUMES with the default database cache (every cache
+# call is a query there; Redis only lowers the counts). Query counts are
+# exact and include the conditional GET validator (a paginated list reuses
+# its count); latency and memory leave headroom for slower machines.
+# Authenticated cases have no user lookup (JWT_AUTH_MODE=stateless).
+BUDGETS = {
+    'members list': {'queries': 4, 'p95_ms': 250, 'peak_mb': 2},
+    'members search': {'queries': 4, 'p95_ms': 300, 'peak_mb': 2},
+    # Cached counts: the generation and the facet entry on top of the list.
+    'members facets': {'queries': 6, 'p95_ms': 250, 'peak_mb': 2},
+    'members cursor': {'queries': 3, 'p95_ms': 250, 'peak_mb': 2},
+    'member detail': {'queries': 4, 'p95_ms': 60, 'peak_mb': 1},
+    'members export': {'queries': 1, 'p95_ms': 400, 'peak_mb': 5},
+    'analyses list': {'queries': 3, 'p95_ms': 400, 'peak_mb': 5},
+    'analyses search': {'queries': 3, 'p95_ms': 400, 'peak_mb': 5},
+    'analysis detail': {'queries': 3, 'p95_ms': 60, 'peak_mb': 1},
+    'analyses export': {'queries': 1, 'p95_ms': 250, 'peak_mb': 1},
+    # Unpaginated unless ?pagination=cursor: renders every shift.
+    'shifts list': {'queries': 2, 'p95_ms': 800, 'peak_mb': 20},
+    'shifts by date': {'queries': 2, 'p95_ms': 50, 'peak_mb': 1},
+    'shifts calendar': {'queries': 3, 'p95_ms': 150, 'peak_mb': 5},
+    'institutes list': {'queries': 2, 'p95_ms': 40, 'peak_mb': 1},
+    'stats': {'queries': 2, 'p95_ms': 20, 'peak_mb': 1},
+    'telemetry latest': {'queries': 2, 'p95_ms': 20, 'peak_mb': 1},
+    'telemetry since': {'queries': 2, 'p95_ms': 30, 'peak_mb': 1},
+    # 50 samples over 5 sensors: a lock and a ring write per sensor, each a few
+    # queries on the database cache, plus the ring reads in one get_many.
+    'telemetry batch': {'queries': 64, 'p95_ms': 80, 'peak_mb': 1},
+    'lhc status get': {'queries': 1, 'p95_ms': 20, 'peak_mb': 1},
+    'lhc status update': {'queries': 11, 'p95_ms': 40, 'peak_mb': 1},
+    # Dominated by password hashing.
+    'token obtain': {'queries': 1, 'p95_ms': 1500, 'peak_mb': 1},
+}
+
+
+def benchmark_cases():
+    """``(name, method, path, payload, authenticated)`` for every API route benchmarked."""
+    member = Member.objects.order_by('id').first()
+    paper = Analysis.objects.order_by('id').first()
+    shift = Shift.objects.order_by('id').first()
+    shift_date = shift.date if shift else None
+    samples = [{"value": 10 + i, "energy": 6800, "sensorId": f"BPM-{i % 5}"} for i in range(50)]
+    return [
+        ('members list', 'get', '/api/members/', None, False),
+        ('members search', 'get', f'/api/members/?search={member.last_name[:4]}', None, False),
+        ('members facets', 'get', '/api/members/?facets=all', None, False),
+        ('members cursor', 'get', '/api/members/?pagination=cursor&page_size=50', None, False),
+        ('member detail', 'get', f'/api/members/{member.id}/', None, False),
+        ('members export', 'get', '/api/members/export/', None, False),
+        ('analyses list', 'get', '/api/analyses/', None, False),
+        ('analyses search', 'get', '/api/analyses/?search=cms', None, False),
+        ('analysis detail', 'get', f'/api/analyses/{paper.id}/', None, False),
+        ('analyses export', 'get', '/api/analyses/export/', None, False),
+        ('shifts list', 'get', '/api/shifts/', None, False),
+        ('shifts by date', 'get', f'/api/shifts/?date={shift_date}', None, False),
+        ('shifts calendar', 'get', '/api/shifts/calendar/', None, False),
+        ('institutes list', 'get', '/api/institutes/', None, False),
+        ('stats', 'get', '/api/stats/', None, False),
+        ('telemetry latest', 'get', '/api/lhc-telemetry/', None, False),
+        ('telemetry since', 'get', '/api/lhc-telemetry/?since=0', None, False),
+        ('telemetry batch', 'post', '/api/lhc-telemetry/', samples, True),
+        ('lhc status get', 'get', '/api/get-lhc-status/', None, False),
+        ('lhc status update', 'post', '/api/update-lhc-status/', {"status": "STABLE BEAMS"}, True),
+        ('token obtain', 'post', '/api/token/', {"username": "benchmark", "password": BENCHMARK_PASSWORD}, False),
+    ]
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    """A throwaway test database, as ``manage.py test`` creates: seeding wipes tables."""
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def seed_benchmark_data(volumes, seed):
+    """Seeds ``volumes`` through ``seed_glance``; returns the ``benchmark`` user."""
+    call_command('seed_glance', seed=seed, stdout=StringIO(), **volumes)
+    # seed_glance leaves auth_user alone, so a --keepdb run finds the user again.
+    user, _ = User.objects.get_or_create(username='benchmark')
+    user.set_password(BENCHMARK_PASSWORD)
+    user.save()
+    return user
+
+
+def run_benchmarks(volumes=None, seed=42, repeat=20, warmup=2, only=None):
+    """Seeds ``volumes`` through ``seed_glance`` and measures every case; returns the report."""
+    volumes = {**DEFAULT_VOLUMES, **(volumes or {})}
+    user = seed_benchmark_data(volumes, seed)
+    # Server errors are recorded as failed cases instead of aborting the run.
+    client = Client(raise_request_exception=False)
+    auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+    endpoints = {}
+    for name, method, path, payload, authenticated in benchmark_cases():
+        if only and name not in only:
+            continue
+
+        def request():
+            if method == 'post':
+                response = client.post(path, payload, content_type='application/json',
+                                       **(auth if authenticated else {}))
+            else:
+                response = client.get(path)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            return response
+
+        for _ in range(warmup):
+            request()
+        # The query log is a bounded deque; a full one would read as zero new queries.
+        reset_queries()
+        with CaptureQueriesContext(connection) as captured:
+            response = request()
+        tracemalloc.start()
+        request()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            request()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        endpoints[name] = {
+            'method': method.upper(),
+            'path': path,
+            'status': response.status_code,
+            'queries': len(captured.captured_queries),
+            'p50_ms': round(_percentile(timings, 50), 2),
+            'p95_ms': round(_percentile(timings, 95), 2),
+            'peak_mb': round(peak / 1e6, 2),
+        }
+
+    return {
+        'commit': _git_commit(),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'database': connection.vendor,
+        'volumes': volumes,
+        'repeat': repeat,
+        'endpoints': endpoints,
+    }
+
+
+def check_report(report, baseline=None):
+    """
+    Returns the budget violations of ``report``: failed requests, budgets
+    exceeded and, against a ``baseline`` report, query counts that grew.
+    """
+    failures = []
+    for name, result in report['endpoints'].items():
+        if result['status'] >= 400:
+            failures.append(f"{name}: HTTP {result['status']}")
+        for metric, limit in BUDGETS.get(name, {}).items():
+            if result[metric] > limit:
+                failures.append(f"{name}: {metric} {result[metric]} over budget {limit}")
+        previous = (baseline or {}).get('endpoints', {}).get(name)
+        if previous and result['queries'] > previous['queries']:
+            failures.append(f"{name}: queries {previous['queries']} -> {result['queries']} since "
+                            f"{baseline.get('commit') or 'baseline'}")
+    return failures
+
+
+def write_report(report, path):
+    with open(path, 'w') as report_file:
+        json.dump(report, report_file, indent=2)
+
+
+@contextmanager
+def gunicorn(mode, workers, env=None):
+    """Runs gunicorn in ``mode`` against the current (test) database; yields its port."""
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as metrics_dir:
+        env = {
+            **os.environ,
+            'SERVER_MODE': mode,
+            'POSTGRES_DB': connection.settings_dict['NAME'],
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'),
+            'PROMETHEUS_MULTIPROC_DIR': metrics_dir,
+            **(env or {}),
+        }
+        env.pop('ASYNC_VIEWS', None)
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+             '--log-level', 'warning', *SERVERS[mode]],
+            cwd=settings.BASE_DIR, env=env,
+        )
+        try:
+            _wait_until_ready(port, process)
+            yield port
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def load_test(port, requests, clients, total, headers=None):
+    """
+    ``clients`` threads with one keep-alive connection each share ``total``
+    ``(method, path, body)`` requests, round robin. Client ``i`` sends
+    ``headers[i % len(headers)]``, e.g. one bearer token per client.
+    """
+    remaining = iter(range(total))
+    lock = threading.Lock()
+    latencies = defaultdict(list)
+    errors = []
+
+    def client(client_headers):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        while True:
+            with lock:
+                index = next(remaining, None)
+            if index is None:
+                break
+            method, path, body = requests[index % len(requests)]
+            request_headers = dict(client_headers)
+            if body is not None:
+                body = json.dumps(body)
+                request_headers['Content-Type'] = 'application/json'
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=request_headers)
+                response = conn.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException) as exc:
+                errors.append(f"{method} {path}: {exc}")
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                continue
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status >= 400:
+                errors.append(f"{method} {path}: HTTP {response.status}")
+            latencies[f"{method} {path}"].append(elapsed)
+        conn.close()
+
+    headers = headers or [{}]
+    threads = [threading.Thread(target=client, args=(headers[i % len(headers)],)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+
+    timings = [ms for values in latencies.values() for ms in values]
+    return {
+        'requests': total,
+        'errors': len(errors),
+        'error_samples': sorted(set(errors))[:5],
+        'seconds': round(seconds, 2),
+        'rps': round(len(timings) / seconds, 1),
+        'p50_ms': round(_percentile(timings, 50), 2),
+        'p95_ms': round(_percentile(timings, 95), 2),
+        'p99_ms': round(_percentile(timings, 99), 2),
+        'paths': {path: {'p50_ms': round(_percentile(values, 50), 2),
+                         'p95_ms': round(_percentile(values, 95), 2)}
+                  for path, values in latencies.items()},
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(port, process):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f"gunicorn exited with status {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', READY_PATH)
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise CommandError(f"gunicorn did not answer {READY_PATH} within {STARTUP_TIMEOUT}s")
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
@@ -0,0 +1,66 @@
+"""
+Shared version counters: the dashboard generation (stats.py) and the
+eligibility index version (eligibility.py).
+
+Readers only compare them for equality, in ETags and cache keys, so a
+value must never come back. A counter that was evicted or never set starts
+again from the current time in microseconds, not from 1.
+
+They live in the default cache. The database and file caches increment with
+a get followed by a set, so two concurrent bumps can both return the same
+value. Callers that must see every bump (``atomic=True``) then count in a
+``Counter`` row instead, incremented under a row lock.
+"""
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import BaseCache
+from django.db import transaction
+
+from .models import Counter
+
+
+def _fresh():
+    return time.time_ns() // 1000
+
+
+def _in_database(atomic):
+    return atomic and type(caches['default']).incr is BaseCache.incr
+
+
+def read_counter(key, atomic=False):
+    if _in_database(atomic):
+        value = Counter.objects.filter(key=key).values_list('value', flat=True).first()
+        return value if value is not None else bump_counter(key, atomic)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, _fresh(), None)
+        value = cache.get(key)
+    return value
+
+
+async def aread_counter(key):
+    value = await cache.aget(key)
+    if value is None:
+        await cache.aadd(key, _fresh(), None)
+        value = await cache.aget(key)
+    return value
+
+
+def bump_counter(key, atomic=False):
+    """Increments ``key`` and returns the new value."""
+    if _in_database(atomic):
+        with transaction.atomic():
+            counter, created = Counter.objects.select_for_update().get_or_create(
+                key=key, defaults={'value': _fresh()})
+            if not created:
+                counter.value += 1
+                counter.save(update_fields=['value'])
+        return counter.value
+    try:
+        return cache.incr(key)
+    except ValueError:
+        value = _fresh()
+        if cache.add(key, value, None):
+            return value
+        return cache.incr(key)  # another worker restarted it first
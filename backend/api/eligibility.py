@@ -0,0 +1,301 @@
+"""
+Per-process bitmap index over members for "who is eligible" questions
+(``GET /api/members/eligible/``).
+
+Bit ``n`` of every bitset stands for member id ``n``. The bitsets are plain
+Python ints, so AND/OR/NOT across the whole directory are single C-level
+operations. There is one bitset per ``cern_status``, institute (grouped by
+country at query time), qualification name, ``is_active`` and
+``is_mo_qualified``, built in three queries. Shift dates are loaded lazily,
+one indexed query per date asked about.
+
+The receivers in signals.py apply committed changes to this process's
+index. Every change also bumps a shared version (counters.py, always
+atomic), so the other workers rebuild on their next query. Bulk writes (imports, rosters,
+seeding) only bump it.
+"""
+import threading
+from collections.abc import Sequence
+from datetime import date
+
+from django.db import transaction
+
+from .counters import bump_counter, read_counter
+from .models import Institute, Member, Qualification, Shift
+
+ELIGIBILITY_VERSION_KEY = 'eligibility_index_version'
+# Bytes of a bitset counted at a time while skipping to the start of a slice.
+CHUNK_BYTES = 64
+# Shift dates kept loaded; the oldest loaded one is dropped beyond this.
+MAX_SHIFT_DATES = 400
+
+BOOLEANS = {'true': True, '1': True, 'false': False, '0': False}
+
+
+def _boolean(value):
+    return BOOLEANS[value.lower()]
+
+
+CRITERIA = {
+    'cern_status': str,
+    'country': str,
+    'qualification': str,
+    'is_active': _boolean,
+    'is_mo_qualified': _boolean,
+    'shift_on': date.fromisoformat,
+}
+MODES = ('any', 'all', 'not')
+
+
+def bitset(ids):
+    """The bitset of ``ids``, filled in a bytearray and converted once."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    bits = bytearray(max(ids) // 8 + 1)
+    for member_id in ids:
+        bits[member_id >> 3] |= 1 << (member_id & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class MemberIds(Sequence):
+    """
+    The ids in a bitset, ascending. Slicing skips whole chunks by their
+    popcount and only walks the set bits of the chunks holding the slice.
+    """
+
+    def __init__(self, bits):
+        self.bits = bits
+        self.size = bits.bit_count()
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            positions = range(*index.indices(self.size))
+            if not positions:
+                return []
+            first = min(positions[0], positions[-1])
+            ids = self._ids(first, max(positions[0], positions[-1]) + 1)
+            return [ids[position - first] for position in positions]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        return self._ids(index, index + 1)[0]
+
+    def _ids(self, start, stop):
+        """The ids ranked ``start`` (inclusive) to ``stop`` (exclusive)."""
+        data = self.bits.to_bytes((self.bits.bit_length() + 7) // 8, 'little')
+        ids, skip = [], start
+        for offset in range(0, len(data), CHUNK_BYTES):
+            chunk = int.from_bytes(data[offset:offset + CHUNK_BYTES], 'little')
+            count = chunk.bit_count()
+            if skip >= count:
+                skip -= count
+                continue
+            while chunk:
+                low = chunk & -chunk
+                chunk ^= low
+                if skip:
+                    skip -= 1
+                    continue
+                ids.append(offset * 8 + low.bit_length() - 1)
+                if len(ids) == stop - start:
+                    return ids
+        return ids
+
+
+def parse_eligibility_query(params):
+    """
+    Reads ``<criterion>=a,b`` (any of), ``<criterion>__all=a,b`` and
+    ``<criterion>__not=a,b`` (none of) from query ``params`` into
+    ``(criterion, mode, values)`` terms; ``free_on=D`` is ``shift_on__not=D``.
+    A repeated parameter adds its values to the same term. Other parameters
+    are ignored. Raises ValueError for unreadable values.
+    """
+    terms = []
+    for key in params:
+        criterion, _, mode = key.partition('__')
+        if criterion == 'free_on' and not mode:
+            criterion, mode = 'shift_on', 'not'
+        if criterion not in CRITERIA or (mode or 'any') not in MODES:
+            continue
+        raw = [value.strip() for item in params.getlist(key) for value in item.split(',') if value.strip()]
+        try:
+            values = [CRITERIA[criterion](value) for value in raw]
+        except (KeyError, ValueError):
+            raise ValueError(f"Invalid value for '{key}': booleans are true/false, dates YYYY-MM-DD.") from None
+        if values:
+            terms.append((criterion, mode or 'any', values))
+    return terms
+
+
+class EligibilityIndex:
+    """The bitsets of one process, rebuilt whenever the shared version moves past them."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.version = None
+            self.members = 0
+            self.statuses = {}
+            self.institutes = {}
+            self.countries = {}
+            self.qualifications = {}
+            self.active = 0
+            self.mo_qualified = 0
+            self.shift_dates = {}
+
+    def evaluate(self, terms):
+        """The bitset of members matching every ``(criterion, mode, values)`` term."""
+        version = read_counter(ELIGIBILITY_VERSION_KEY, atomic=True)
+        with self._lock:
+            if self.version != version:
+                self._rebuild(version)
+            result = self.members
+            for criterion, mode, values in terms:
+                bitsets = [self._bits(criterion, value) for value in values]
+                if mode == 'all':
+                    for bits in bitsets:
+                        result &= bits
+                else:
+                    matched = 0
+                    for bits in bitsets:
+                        matched |= bits
+                    result = result & ~matched if mode == 'not' else result & matched
+            return result
+
+    def _bits(self, criterion, value):
+        if criterion == 'cern_status':
+            return self.statuses.get(value, 0)
+        if criterion == 'qualification':
+            return self.qualifications.get(value, 0)
+        if criterion == 'is_active':
+            return self.active if value else self.members & ~self.active
+        if criterion == 'is_mo_qualified':
+            return self.mo_qualified if value else self.members & ~self.mo_qualified
+        if criterion == 'shift_on':
+            return self._shift_date(value)
+        bits = 0
+        for institute_id, country in self.countries.items():
+            if country == value:
+                bits |= self.institutes.get(institute_id, 0)
+        return bits
+
+    def _shift_date(self, shift_date):
+        bits = self.shift_dates.get(shift_date)
+        if bits is None:
+            bits = bitset(Shift.objects.filter(date=shift_date).values_list('member_id', flat=True))
+            if len(self.shift_dates) >= MAX_SHIFT_DATES:
+                del self.shift_dates[next(iter(self.shift_dates))]
+            self.shift_dates[shift_date] = bits
+        return bits
+
+    def _rebuild(self, version):
+        self.clear()
+        groups = {'statuses': {}, 'institutes': {}}
+        ids, active, mo_qualified = [], [], []
+        for member_id, status, institute_id, is_active, is_mo_qualified in Member.objects.values_list(
+                'id', 'cern_status', 'institute_id', 'is_active', 'is_mo_qualified'):
+            ids.append(member_id)
+            groups['statuses'].setdefault(status, []).append(member_id)
+            groups['institutes'].setdefault(institute_id, []).append(member_id)
+            if is_active:
+                active.append(member_id)
+            if is_mo_qualified:
+                mo_qualified.append(member_id)
+        qualified = {}
+        for member_id, name in Qualification.objects.values_list('member_id', 'name'):
+            qualified.setdefault(name, []).append(member_id)
+
+        self.members, self.active, self.mo_qualified = bitset(ids), bitset(active), bitset(mo_qualified)
+        self.statuses = {status: bitset(group) for status, group in groups['statuses'].items()}
+        self.institutes = {institute: bitset(group) for institute, group in groups['institutes'].items()}
+        self.qualifications = {name: bitset(group) for name, group in qualified.items()}
+        self.countries = dict(Institute.objects.values_list('id', 'country'))
+        self.version = version
+
+    # Incremental updates, run by the signals once the change has committed.
+
+    def member_saved(self, member_id, status, institute_id, is_active, is_mo_qualified):
+        bit = 1 << member_id
+        with self._lock:
+            if self.version is not None:
+                self._unset(bit, self.statuses, self.institutes)
+                self.members |= bit
+                self.statuses[status] = self.statuses.get(status, 0) | bit
+                self.institutes[institute_id] = self.institutes.get(institute_id, 0) | bit
+                self.active = self.active | bit if is_active else self.active & ~bit
+                self.mo_qualified = self.mo_qualified | bit if is_mo_qualified else self.mo_qualified & ~bit
+            self._bumped()
+
+    def member_deleted(self, member_id):
+        bit = 1 << member_id
+        with self._lock:
+            if self.version is not None:
+                self._unset(bit, self.statuses, self.institutes, self.qualifications, self.shift_dates)
+                self.members &= ~bit
+                self.active &= ~bit
+                self.mo_qualified &= ~bit
+            self._bumped()
+
+    def institute_saved(self, institute_id, country):
+        with self._lock:
+            if self.version is not None:
+                self.countries[institute_id] = country
+            self._bumped()
+
+    def qualifications_changed(self, member_id):
+        """Re-reads the qualification names ``member_id`` holds (one may be held twice)."""
+        bit = 1 << member_id
+        with self._lock:
+            if self.version is not None:
+                self._unset(bit, self.qualifications)
+                for name in Qualification.objects.filter(member_id=member_id).values_list('name', flat=True):
+                    self.qualifications[name] = self.qualifications.get(name, 0) | bit
+            self._bumped()
+
+    def shift_booked(self, member_id, shift_date, booked):
+        # One shift per member and day, so a booking sets or clears exactly one bit.
+        with self._lock:
+            if shift_date in self.shift_dates:
+                bits = self.shift_dates[shift_date]
+                self.shift_dates[shift_date] = bits | (1 << member_id) if booked else bits & ~(1 << member_id)
+            self._bumped()
+
+    def shifts_moved(self):
+        """An edited shift may have left a date we no longer know; loaded dates are read again."""
+        with self._lock:
+            self.shift_dates.clear()
+            self._bumped()
+
+    def _unset(self, bit, *groups):
+        for group in groups:
+            for key, bits in group.items():
+                if bits & bit:
+                    group[key] = bits & ~bit
+
+    def _bumped(self):
+        # Keep the local index only when no other process changed anything since it was built.
+        version = bump_eligibility_version()
+        if self.version is not None and version != self.version + 1:
+            self.version = None
+        elif self.version is not None:
+            self.version = version
+
+
+def bump_eligibility_version():
+    return bump_counter(ELIGIBILITY_VERSION_KEY, atomic=True)
+
+
+def invalidate_eligibility_index():
+    """For bulk writes that bypass the signals: every process rebuilds once they commit."""
+    transaction.on_commit(bump_eligibility_version)
+
+
+eligibility_index = EligibilityIndex()
@@ -0,0 +1,194 @@
+import csv
+import io
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connection, transaction
+
+from .eligibility import invalidate_eligibility_index
+from .models import Institute, Member, build_search_document
+from .signals import touch_analyses_of
+from .stats import invalidate_dashboard_stats
+
+# Same headers as MemberViewSet.export, so an export can be edited and re-imported.
+IMPORT_COLUMNS = {
+    'CERN_ID': 'cern_id',
+    'First Name': 'first_name',
+    'Last Name': 'last_name',
+    'Institute': 'institute',
+    'Status': 'cern_status',
+    'MO_Qualified': 'is_mo_qualified',
+    'Email': 'email',
+}
+REQUIRED_COLUMNS = ['CERN_ID', 'First Name', 'Last Name', 'Institute', 'Email']
+# Column order of a validated row, and of the staging table.
+ROW_FIELDS = ['cern_id', 'first_name', 'last_name', 'institute_id', 'email',
+              'cern_status', 'is_mo_qualified', 'search_document']
+UPDATE_FIELDS = ROW_FIELDS[1:]
+# Defaulted on insert when their column is absent, but never overwritten then.
+OPTIONAL_FIELDS = {'cern_status', 'is_mo_qualified'}
+
+IMPORT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+STATUSES = {value for value, _ in Member.STATUS_CHOICES}
+BOOLEAN_VALUES = {'yes': True, 'y': True, 'true': True, '1': True,
+                  'no': False, 'n': False, 'false': False, '0': False, '': False}
+MAX_LENGTHS = {name: Member._meta.get_field(name).max_length for name in ('cern_id', 'first_name', 'last_name', 'email')}
+HEADERS = {field: header for header, field in IMPORT_COLUMNS.items()}
+
+
+class InvalidImportFile(ValueError):
+    """The file as a whole cannot be imported (bad header or encoding)."""
+
+
+def import_members(lines, chunk_size=IMPORT_CHUNK_SIZE, method=None):
+    """
+    Upserts members on ``cern_id`` from CSV ``lines`` (any iterable of str).
+
+    Rows are validated in chunks and loaded with ``COPY`` into a staging
+    table plus one ``INSERT ... ON CONFLICT`` per chunk on PostgreSQL, or
+    with ``bulk_create(update_conflicts=True)`` elsewhere (``method`` forces
+    ``'copy'`` or ``'bulk'``). Invalid rows are skipped and reported by CSV
+    line; the whole import runs in one transaction. Existing members keep
+    their status and M&O flag when the file has no column for them.
+    """
+    method = method or ('copy' if connection.vendor == 'postgresql' else 'bulk')
+    load = _copy_chunk if method == 'copy' else _bulk_chunk
+    result = {"created": 0, "updated": 0, "rejected": 0, "errors": []}
+
+    with transaction.atomic():
+        reader = csv.reader(lines)
+        columns = _read_header(reader)
+        update_fields = [field for field in UPDATE_FIELDS if field in columns or field not in OPTIONAL_FIELDS]
+        institutes = _institute_map()
+        seen = set()
+        numbered = ((reader.line_num, row) for row in reader)
+        try:
+            while chunk := list(islice(numbered, chunk_size)):
+                rows = []
+                for line, row in chunk:
+                    try:
+                        rows.append(_parse_row(row, columns, institutes, seen))
+                    except ValueError as exc:
+                        result["rejected"] += 1
+                        if len(result["errors"]) < MAX_REPORTED_ERRORS:
+                            result["errors"].append({"line": line, "detail": str(exc)})
+                if rows:
+                    created, updated = load(rows, update_fields)
+                    result["created"] += created
+                    result["updated"] += updated
+                    if updated:  # as the Member post_save signal would
+                        touch_analyses_of(Member.objects.filter(cern_id__in=[row[0] for row in rows]))
+        except (csv.Error, UnicodeDecodeError) as exc:
+            raise InvalidImportFile(f"Line {reader.line_num}: {exc}") from None
+
+        if result["created"] or result["updated"]:
+            # Bulk loading bypasses the signals that normally expire the dashboard cache
+            invalidate_dashboard_stats()
+            invalidate_eligibility_index()
+    return result
+
+
+def _read_header(reader):
+    try:
+        header = [name.strip() for name in next(reader)]
+    except StopIteration:
+        raise InvalidImportFile("The file is empty.") from None
+    except (csv.Error, UnicodeDecodeError) as exc:
+        raise InvalidImportFile(f"Line 1: {exc}") from None
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise InvalidImportFile(f"Missing column(s): {', '.join(missing)}.")
+    return {IMPORT_COLUMNS[name]: index for index, name in enumerate(header) if name in IMPORT_COLUMNS}
+
+
+def _institute_map():
+    """One query: institute code or name (case-insensitive) -> (id, name, code)."""
+    rows = list(Institute.objects.values_list('id', 'name', 'code'))
+    institutes = {name.casefold(): (pk, name, code) for pk, name, code in rows}
+    institutes.update((code.casefold(), (pk, name, code)) for pk, name, code in rows)  # codes win over names
+    return institutes
+
+
+def _parse_row(row, columns, institutes, seen):
+    width = len(row)
+    values = {field: row[index].strip() if index < width else '' for field, index in columns.items()}
+
+    cern_id = values['cern_id']
+    if not cern_id:
+        raise ValueError("CERN_ID is required.")
+    if cern_id in seen:
+        raise ValueError(f"CERN_ID {cern_id} appears more than once in the file.")
+    for field, max_length in MAX_LENGTHS.items():
+        if len(values[field]) > max_length:
+            raise ValueError(f"{HEADERS[field]} must be at most {max_length} characters.")
+    first_name, last_name = values['first_name'], values['last_name']
+    if not first_name or not last_name:
+        raise ValueError("First Name and Last Name are required.")
+
+    institute = institutes.get(values['institute'].casefold())
+    if institute is None:
+        raise ValueError(f"Unknown institute {values['institute']!r}.")
+    email = values['email']
+    try:
+        validate_email(email)
+    except ValidationError:
+        raise ValueError(f"Invalid email {email!r}.") from None
+    cern_status = values.get('cern_status', '').upper() or 'USER'
+    if cern_status not in STATUSES:
+        raise ValueError(f"Status must be one of {', '.join(sorted(STATUSES))}.")
+    mo_qualified = values.get('is_mo_qualified', '').lower()
+    if mo_qualified not in BOOLEAN_VALUES:
+        raise ValueError("MO_Qualified must be Yes or No.")
+
+    seen.add(cern_id)
+    institute_id, institute_name, institute_code = institute
+    return (cern_id, first_name, last_name, institute_id, email, cern_status, BOOLEAN_VALUES[mo_qualified],
+            build_search_document(first_name, last_name, cern_id, email, institute_name, institute_code))
+
+
+def _copy_chunk(rows, update_fields):
+    table = connection.ops.quote_name(Member._meta.db_table)
+    columns = ', '.join(ROW_FIELDS)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+    writer.writerows((*row[:6], 't' if row[6] else 'f', row[7]) for row in rows)
+    buffer.seek(0)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS member_import_staging ("
+            "cern_id text, first_name text, last_name text, institute_id bigint, email text, "
+            "cern_status text, is_mo_qualified boolean, search_document text) ON COMMIT DROP"
+        )
+        cursor.execute("TRUNCATE member_import_staging")
+        _copy_from(cursor, f"COPY member_import_staging ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.execute(
+            f"WITH upserted AS ("
+            f" INSERT INTO {table} ({columns}, is_active, updated_at)"
+            f" SELECT {columns}, TRUE, now() FROM member_import_staging"
+            f" ON CONFLICT (cern_id) DO UPDATE SET "
+            + ', '.join(f"{field} = EXCLUDED.{field}" for field in [*update_fields, 'updated_at'])
+            + " RETURNING (xmax = 0) AS created"
+            ") SELECT count(*) FILTER (WHERE created), count(*) FILTER (WHERE NOT created) FROM upserted"
+        )
+        return cursor.fetchone()
+
+
+def _copy_from(cursor, sql, buffer):
+    raw = cursor.cursor
+    if hasattr(raw, 'copy_expert'):  # psycopg2
+        raw.copy_expert(sql, buffer)
+    else:  # psycopg 3
+        with raw.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+
+def _bulk_chunk(rows, update_fields):
+    existing = set(Member.objects.filter(cern_id__in=[row[0] for row in rows]).values_list('cern_id', flat=True))
+    Member.objects.bulk_create(
+        [Member(**dict(zip(ROW_FIELDS, row))) for row in rows],
+        update_conflicts=True, unique_fields=['cern_id'], update_fields=[*update_fields, 'updated_at'],
+    )
+    return len(rows) - len(existing), len(existing)
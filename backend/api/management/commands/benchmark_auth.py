@@ -0,0 +1,71 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.benchmarks import DEFAULT_VOLUMES, SERVERS, benchmark_database, gunicorn, load_test, seed_benchmark_data
+from api.models import Shift
+
+
+def authenticated_requests():
+    """What the shift manager and the beam status callers send, all with a bearer token."""
+    shift = Shift.objects.order_by('id').first()
+    return [
+        ('POST', '/api/update-lhc-status/', {"status": "STABLE BEAMS"}),
+        ('PATCH', f'/api/shifts/{shift.id}/', {"location": shift.location}),
+        ('GET', f'/api/shifts/?date={shift.date}', None),
+        ('POST', '/api/lhc-telemetry/', [{"value": 10, "energy": 6800, "sensor": "BPM-1"}]),
+    ]
+
+
+class Command(BaseCommand):
+    help = ("Seeds a throwaway test database, starts gunicorn once per JWT_AUTH_MODE and compares "
+            "authenticated requests per second (one access token per client)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--auth-modes', nargs='+', choices=list(settings.JWT_AUTHENTICATION_CLASSES),
+                            default=['database', 'stateless'])
+        parser.add_argument('--server-mode', choices=list(SERVERS), default='wsgi')
+        parser.add_argument('--workers', type=int, default=1, help="gunicorn worker processes")
+        parser.add_argument('--clients', type=int, default=16, help="Concurrent keep-alive clients")
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per mode, over all clients")
+        parser.add_argument('--members', type=int, default=DEFAULT_VOLUMES['members'])
+        parser.add_argument('--papers', type=int, default=DEFAULT_VOLUMES['papers'])
+        parser.add_argument('--shifts', type=int, default=DEFAULT_VOLUMES['shifts'])
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--report', help="Also write the results as JSON here")
+        parser.add_argument('--keepdb', action='store_true', help="Keep the test database between runs")
+
+    def handle(self, *args, **options):
+        volumes = {key: options[key] for key in DEFAULT_VOLUMES}
+        results = {}
+        with benchmark_database(keepdb=options['keepdb']):
+            if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+                raise CommandError("The server needs a database it can share; use PostgreSQL.")
+            user = seed_benchmark_data(volumes, options['seed'])
+            requests = authenticated_requests()
+            headers = [{'Authorization': f'Bearer {AccessToken.for_user(user)}'} for _ in range(options['clients'])]
+            for mode in options['auth_modes']:
+                with gunicorn(options['server_mode'], options['workers'], {'JWT_AUTH_MODE': mode}) as port:
+                    self.stdout.write(f"{mode}: gunicorn on port {port} ({options['workers']} worker(s))")
+                    load_test(port, requests, options['clients'], options['clients'] * 2, headers)  # warm-up
+                    results[mode] = load_test(port, requests, options['clients'], options['requests'], headers)
+                    for error in results[mode].pop('error_samples'):
+                        self.stderr.write(f"  {error}")
+
+        self.stdout.write(f"{'auth mode':>9} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'errors':>6}")
+        for mode, result in results.items():
+            self.stdout.write(f"{mode:>9} | {result['rps']:>8.1f} | {result['p50_ms']:>8.1f} | "
+                              f"{result['p95_ms']:>8.1f} | {result['errors']:>6}")
+        if {'database', 'stateless'} <= results.keys():
+            self.stdout.write(f"stateless/database throughput: "
+                              f"{results['stateless']['rps'] / results['database']['rps']:.2f}x")
+        if options['report']:
+            with open(options['report'], 'w') as report_file:
+                json.dump({'server_mode': options['server_mode'], 'workers': options['workers'],
+                           'clients': options['clients'], 'volumes': volumes,
+                           'requests': [f"{method} {path}" for method, path, _ in requests],
+                           'modes': results}, report_file, indent=2)
+            self.stdout.write(f"Report written to {options['report']}")
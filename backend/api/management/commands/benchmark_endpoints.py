@@ -0,0 +1,50 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks import DEFAULT_VOLUMES, benchmark_database, check_report, run_benchmarks, write_report
+
+
+class Command(BaseCommand):
+    help = ("Seeds a throwaway test database and records p50/p95 latency, query counts and peak memory "
+            "for every API route, failing when a budget regresses")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--members', type=int, default=DEFAULT_VOLUMES['members'])
+        parser.add_argument('--papers', type=int, default=DEFAULT_VOLUMES['papers'])
+        parser.add_argument('--shifts', type=int, default=DEFAULT_VOLUMES['shifts'])
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--only', nargs='+', help="Benchmark only these cases, e.g. 'members list'")
+        parser.add_argument('--report', default='benchmark-report.json', help="Where to write the JSON report")
+        parser.add_argument('--baseline', help="A previous report; fail if any query count grew since")
+        parser.add_argument('--keepdb', action='store_true', help="Keep the test database between runs")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as baseline_file:
+                    baseline = json.load(baseline_file)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline: {exc}")
+
+        volumes = {key: options[key] for key in DEFAULT_VOLUMES}
+        with benchmark_database(keepdb=options['keepdb']):
+            report = run_benchmarks(volumes, seed=options['seed'], repeat=options['repeat'], only=options['only'])
+        write_report(report, options['report'])
+
+        previous = (baseline or {}).get('endpoints', {})
+        self.stdout.write(f"{'endpoint':>20} | {'queries':>7} | {'p50 ms':>8} | {'p95 ms':>8} | {'peak MB':>7} |")
+        for name, result in report['endpoints'].items():
+            delta = ''
+            if name in previous:
+                delta = f" p95 {result['p95_ms'] - previous[name]['p95_ms']:+.1f} ms"
+            self.stdout.write(f"{name:>20} | {result['queries']:>7} | {result['p50_ms']:>8.1f} | "
+                              f"{result['p95_ms']:>8.1f} | {result['peak_mb']:>7.2f} |{delta}")
+        self.stdout.write(f"Report written to {options['report']}")
+
+        failures = check_report(report, baseline)
+        if failures:
+            raise CommandError("Benchmark budgets exceeded:\n  " + "\n  ".join(failures))
+        self.stdout.write(self.style.SUCCESS("All endpoints within budget."))
@@ -0,0 +1,51 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+
+from api.models import Institute, Member
+
+
+class Command(BaseCommand):
+    help = "Measures peak memory and throughput of the streaming member CSV export at increasing row counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 50_000, 100_000])
+        parser.add_argument('--gzip', action='store_true', help="Benchmark ?compress=gzip output")
+
+    def handle(self, *args, **options):
+        url = '/api/members/export/' + ('?compress=gzip' if options['gzip'] else '')
+        client = Client()
+
+        # Everything runs inside one rolled-back transaction so the benchmark
+        # rows never reach the real directory.
+        with transaction.atomic():
+            institute = Institute.objects.create(name="Benchmark Institute", country="Switzerland", code="BENCH")
+            created = 0
+            for target in sorted(options['rows']):
+                self.stdout.write(f"Seeding up to {target:,} benchmark members...")
+                Member.objects.bulk_create(
+                    (Member(first_name="Bench", last_name=f"Member{i:07d}", cern_id=f"B{i:07d}",
+                            institute=institute, email=f"bench{i}@cern.ch")
+                     for i in range(created, target)),
+                    batch_size=5000
+                )
+                created = target
+                self._measure(client, url, Member.objects.count())
+            transaction.set_rollback(True)
+
+    def _measure(self, client, url, total):
+        tracemalloc.start()
+        started = time.perf_counter()
+        response = client.get(url)
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{total:>9,} rows | {size / 1e6:8.1f} MB out | peak {peak / 1e6:6.1f} MB | "
+            f"{elapsed:6.2f}s | {total / elapsed:10,.0f} rows/s"
+        ))
@@ -0,0 +1,66 @@
+import csv
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api.imports import import_members
+from api.models import Institute
+from api.serializers import MemberSerializer
+
+HEADER = ['CERN_ID', 'First Name', 'Last Name', 'Institute', 'Status', 'MO_Qualified', 'Email']
+
+
+class Command(BaseCommand):
+    help = "Compares member CSV import throughput: COPY + upsert, bulk_create upsert and per-row serializer saves"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+        parser.add_argument('--per-row-sample', type=int, default=1000,
+                            help="Rows saved one by one through MemberSerializer for the baseline")
+
+    def handle(self, *args, **options):
+        methods = ['copy', 'bulk'] if connection.vendor == 'postgresql' else ['bulk']
+        for rows in options['rows']:
+            lines = self._csv(rows)
+            for method in methods:
+                # The first import inserts every row, the second updates them all.
+                self._measure(rows, [(f"{method} insert", lambda: import_members(lines, method=method)),
+                                     (f"{method} upsert", lambda: import_members(lines, method=method))])
+
+        sample = options['per_row_sample']
+        self._measure(sample, [("per-row serializer", lambda: self._per_row(sample))])
+
+    def _measure(self, rows, steps):
+        # Each scenario runs in a rolled-back transaction, so benchmark rows
+        # never reach the real directory.
+        with transaction.atomic():
+            Institute.objects.create(name="Benchmark Institute", country="Switzerland", code="BENCH")
+            for label, run in steps:
+                started = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - started
+                self.stdout.write(self.style.SUCCESS(
+                    f"{label:>20} | {rows:>9,} rows | {elapsed:7.2f}s | {rows / elapsed:10,.0f} rows/s"
+                ))
+            transaction.set_rollback(True)
+
+    def _per_row(self, rows):
+        institute = Institute.objects.get(code="BENCH")
+        for i in range(rows):
+            serializer = MemberSerializer(data={
+                'first_name': "Bench", 'last_name': f"Member{i:07d}", 'cern_id': f"B{i:07d}",
+                'institute': institute.pk, 'email': f"bench{i}@cern.ch", 'cern_status': 'USER',
+            })
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+
+    def _csv(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(HEADER)
+        for i in range(rows):
+            writer.writerow([f"B{i:07d}", "Bench", f"Member{i:07d}", "BENCH", "USER", "Yes" if i % 3 else "No",
+                             f"bench{i}@cern.ch"])
+        return buffer.getvalue().splitlines()
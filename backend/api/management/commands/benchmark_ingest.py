@@ -0,0 +1,47 @@
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIClient
+
+
+class Command(BaseCommand):
+    help = "Compares telemetry ingest throughput of single-sample posts against JSON array and NDJSON batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=2000)
+        parser.add_argument('--batch-sizes', type=int, nargs='+', default=[10, 100, 500])
+
+    def handle(self, *args, **options):
+        total = options['samples']
+        client = APIClient()
+
+        with transaction.atomic():
+            client.force_authenticate(user=User.objects.create_user(username='benchmark-ingest'))
+            samples = [{"sensorId": "BENCH-INGEST", "value": 1.1e11 + i, "energy": 6800.0} for i in range(total)]
+
+            started = time.perf_counter()
+            for sample in samples:
+                client.post('/api/lhc-telemetry/', sample, format='json')
+            self._report("single", total, time.perf_counter() - started)
+
+            for size in options['batch_sizes']:
+                started = time.perf_counter()
+                for i in range(0, total, size):
+                    client.post('/api/lhc-telemetry/', samples[i:i + size], format='json')
+                self._report(f"array x{size}", total, time.perf_counter() - started)
+
+                body = [
+                    "\n".join(json.dumps(sample) for sample in samples[i:i + size])
+                    for i in range(0, total, size)
+                ]
+                started = time.perf_counter()
+                for chunk in body:
+                    client.post('/api/lhc-telemetry/', chunk, content_type='application/x-ndjson')
+                self._report(f"ndjson x{size}", total, time.perf_counter() - started)
+            transaction.set_rollback(True)
+
+    def _report(self, label, total, elapsed):
+        self.stdout.write(self.style.SUCCESS(f"{label:>12} | {elapsed:6.2f}s | {total / elapsed:10,.0f} samples/s"))
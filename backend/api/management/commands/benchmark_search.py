@@ -0,0 +1,75 @@
+import random
+import time
+from functools import reduce
+from operator import or_
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from api.models import Institute, Member
+
+FIRST_NAMES = ["Anna", "Lukas", "Marie", "Paolo", "Chen", "Yuki", "Omar", "Sofia", "Jonas", "Priya"]
+LAST_NAMES = ["Schmidt", "Rossi", "Dubois", "Novak", "Kowalski", "Tanaka", "Garcia", "Olsen", "Murphy", "Singh"]
+TERMS = ["rossi", "fermi", "10042", "uni tokyo", "zzz-no-match"]
+LEGACY_FIELDS = ['first_name', 'last_name', 'cern_id', 'email', 'institute__name', 'institute__code']
+
+
+class Command(BaseCommand):
+    help = "Compares the OR'd icontains member search against the indexed search_document lookup"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--members', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        with transaction.atomic():
+            institutes = [
+                Institute.objects.create(name=name, country="Benchmark", code=code)
+                for name, code in [("Fermilab", "US-FNAL"), ("University of Tokyo", "JP-TOK"),
+                                   ("CERN", "CERN"), ("INFN Pisa", "IT-PISA")]
+            ]
+            self.stdout.write(f"Seeding {options['members']:,} benchmark members...")
+            batch = []
+            for i in range(options['members']):
+                member = Member(first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                                cern_id=f"S{i:07d}", email=f"user{i}@cern.ch", institute=rng.choice(institutes))
+                member.search_document = member.build_search_document(member.institute)
+                batch.append(member)
+                if len(batch) == 5000:
+                    Member.objects.bulk_create(batch)
+                    batch = []
+            Member.objects.bulk_create(batch)
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE api_member")
+
+            for term in TERMS:
+                legacy = self._time(self._legacy(term), options['repeat'])
+                indexed = self._time(self._indexed(term), options['repeat'])
+                self.stdout.write(self.style.SUCCESS(
+                    f"{term!r:>16} | icontains {legacy * 1000:8.1f} ms | search_document {indexed * 1000:8.1f} ms "
+                    f"| x{legacy / indexed:5.1f}"
+                ))
+            transaction.set_rollback(True)
+
+    def _legacy(self, term):
+        queryset = Member.objects.all()
+        for word in term.split():
+            queryset = queryset.filter(reduce(or_, (Q(**{f'{f}__icontains': word}) for f in LEGACY_FIELDS)))
+        return queryset.order_by('last_name')
+
+    def _indexed(self, term):
+        queryset = Member.objects.all()
+        for word in term.split():
+            queryset = queryset.filter(search_document__contains=word)
+        return queryset.order_by('last_name')
+
+    def _time(self, queryset, repeat):
+        # What a directory page costs: the total count plus the first 20 rows.
+        started = time.perf_counter()
+        for _ in range(repeat):
+            queryset.count()
+            list(queryset[:20])
+        return (time.perf_counter() - started) / repeat
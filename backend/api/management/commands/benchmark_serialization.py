@@ -0,0 +1,86 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from api.benchmarks import DEFAULT_VOLUMES, benchmark_database, seed_benchmark_data
+from api.renderers import ORJSONRenderer
+from api.views import AnalysisViewSet, MemberViewSet, ShiftViewSet
+
+LISTS = {
+    'members': (MemberViewSet, '/api/members/?page_size=1000'),
+    'analyses': (AnalysisViewSet, '/api/analyses/?page_size=1000'),
+    'shifts': (ShiftViewSet, '/api/shifts/'),
+}
+# (FAST_LIST_SERIALIZATION, renderer)
+MODES = {
+    'serializer+json': (False, JSONRenderer),
+    'serializer+orjson': (False, ORJSONRenderer),
+    'values+json': (True, JSONRenderer),
+    'values+orjson': (True, ORJSONRenderer),
+}
+
+
+class Command(BaseCommand):
+    help = ("Seeds a throwaway test database and measures rows per second of one worker serializing and "
+            "rendering the member, analysis and shift lists, model serializers against values_list() rows "
+            "and the stdlib JSON encoder against orjson")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lists', nargs='+', choices=list(LISTS), default=list(LISTS))
+        parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+        parser.add_argument('--repeat', type=int, default=10, help="Timed requests per list and mode")
+        parser.add_argument('--members', type=int, default=DEFAULT_VOLUMES['members'])
+        parser.add_argument('--papers', type=int, default=DEFAULT_VOLUMES['papers'])
+        parser.add_argument('--shifts', type=int, default=DEFAULT_VOLUMES['shifts'])
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--report', help="Also write the results as JSON here")
+        parser.add_argument('--keepdb', action='store_true', help="Keep the test database between runs")
+
+    def handle(self, *args, **options):
+        volumes = {key: options[key] for key in DEFAULT_VOLUMES}
+        results = {}
+        with benchmark_database(keepdb=options['keepdb']):
+            seed_benchmark_data(volumes, options['seed'])
+            for name in options['lists']:
+                results[name] = {mode: self.measure(*LISTS[name], *MODES[mode], options['repeat'])
+                                 for mode in options['modes']}
+
+        self.stdout.write(f"{'list':>8} | {'mode':>17} | {'rows':>6} | {'p50 ms':>8} | {'rows/s':>9} | {'KB':>7}")
+        for name, modes in results.items():
+            for mode, result in modes.items():
+                self.stdout.write(f"{name:>8} | {mode:>17} | {result['rows']:>6} | {result['p50_ms']:>8.1f} | "
+                                  f"{result['rows_per_s']:>9,.0f} | {result['bytes'] / 1024:>7.0f}")
+            if {'serializer+json', 'values+orjson'} <= modes.keys():
+                self.stdout.write(f"{name}: values+orjson/serializer+json rows/s: "
+                                  f"{modes['values+orjson']['rows_per_s'] / modes['serializer+json']['rows_per_s']:.2f}x")
+        if options['report']:
+            with open(options['report'], 'w') as report_file:
+                json.dump({'volumes': volumes, 'repeat': options['repeat'], 'lists': results}, report_file, indent=2)
+            self.stdout.write(f"Report written to {options['report']}")
+
+    def measure(self, viewset, path, fast, renderer, repeat):
+        """One list request, serialized and rendered in this process: a single sync worker's share."""
+        view = viewset.as_view({'get': 'list'}, renderer_classes=[renderer])
+        request = APIRequestFactory().get(path)
+
+        def render():
+            response = view(request)
+            response.render()
+            return response
+
+        with override_settings(FAST_LIST_SERIALIZATION=fast):
+            response = render()  # warm-up
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                render()
+                timings.append(time.perf_counter() - started)
+        data = response.data
+        rows = len(data['results'] if isinstance(data, dict) else data)
+        p50 = sorted(timings)[len(timings) // 2]
+        return {'rows': rows, 'p50_ms': round(p50 * 1000, 2), 'rows_per_s': round(rows / p50),
+                'bytes': len(response.content)}
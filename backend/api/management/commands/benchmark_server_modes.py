@@ -0,0 +1,70 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.benchmarks import DEFAULT_VOLUMES, SERVERS, benchmark_database, gunicorn, load_test, seed_benchmark_data
+from api.models import Shift
+
+
+def dashboard_paths():
+    """The polled read endpoints, as a dashboard tab hits them."""
+    shift = Shift.objects.order_by('id').first()
+    return [
+        '/api/members/',
+        '/api/analyses/',
+        '/api/stats/',
+        f'/api/shifts/?date={shift.date}' if shift else '/api/shifts/',
+        '/api/institutes/',
+        '/api/lhc-telemetry/',
+        '/api/get-lhc-status/',
+    ]
+
+
+class Command(BaseCommand):
+    help = ("Seeds a throwaway test database, starts gunicorn once per SERVER_MODE (sync workers on "
+            "config.wsgi, uvicorn workers on config.asgi) and compares throughput under concurrent clients")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='+', choices=list(SERVERS), default=list(SERVERS))
+        parser.add_argument('--workers', type=int, default=1, help="gunicorn worker processes per mode")
+        parser.add_argument('--clients', type=int, default=32, help="Concurrent keep-alive clients")
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per mode, over all clients")
+        parser.add_argument('--members', type=int, default=DEFAULT_VOLUMES['members'])
+        parser.add_argument('--papers', type=int, default=DEFAULT_VOLUMES['papers'])
+        parser.add_argument('--shifts', type=int, default=DEFAULT_VOLUMES['shifts'])
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--report', help="Also write the results as JSON here")
+        parser.add_argument('--keepdb', action='store_true', help="Keep the test database between runs")
+
+    def handle(self, *args, **options):
+        volumes = {key: options[key] for key in DEFAULT_VOLUMES}
+        results = {}
+        with benchmark_database(keepdb=options['keepdb']):
+            if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+                raise CommandError("The servers need a database they can share; use PostgreSQL.")
+            seed_benchmark_data(volumes, options['seed'])
+            paths = dashboard_paths()
+            for mode in options['modes']:
+                with gunicorn(mode, options['workers']) as port:
+                    self.stdout.write(f"{mode}: gunicorn on port {port} ({options['workers']} worker(s))")
+                    self.load(port, paths, options['clients'], options['clients'] * 2)  # warm-up
+                    results[mode] = self.load(port, paths, options['clients'], options['requests'])
+
+        self.stdout.write(f"{'mode':>5} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'errors':>6}")
+        for mode, result in results.items():
+            self.stdout.write(f"{mode:>5} | {result['rps']:>8.1f} | {result['p50_ms']:>8.1f} | "
+                              f"{result['p95_ms']:>8.1f} | {result['p99_ms']:>8.1f} | {result['errors']:>6}")
+        if len(results) == 2:
+            self.stdout.write(f"asgi/wsgi throughput: {results['asgi']['rps'] / results['wsgi']['rps']:.2f}x")
+        if options['report']:
+            with open(options['report'], 'w') as report_file:
+                json.dump({'workers': options['workers'], 'clients': options['clients'], 'volumes': volumes,
+                           'paths': paths, 'modes': results}, report_file, indent=2)
+            self.stdout.write(f"Report written to {options['report']}")
+
+    def load(self, port, paths, clients, total):
+        result = load_test(port, [('GET', path, None) for path in paths], clients, total)
+        for error in result.pop('error_samples'):
+            self.stderr.write(f"  {error}")
+        return result
@@ -0,0 +1,99 @@
+import json
+from datetime import date
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Shift
+
+# Tables small enough that a sequential scan is the right plan.
+SMALL_TABLES = {'api_institute', 'django_content_type', 'django_session', 'auth_user', 'glance_cache',
+                'telemetry_cache', 'facets_cache', 'api_counter'}
+
+
+def endpoint_checks():
+    shift = Shift.objects.order_by('id').first()
+    member_id, shift_date = (shift.member_id, shift.date) if shift else (0, date.today())
+    return [
+        ('members list', '/api/members/?page_size=50'),
+        ('members active', '/api/members/?is_active=true'),
+        ('members by status', '/api/members/?cern_status=STAFF'),
+        ('members M&O', '/api/members/?is_mo_qualified=true'),
+        ('members by country', '/api/members/?institute__country=Switzerland'),
+        ('members cursor', '/api/members/?pagination=cursor&page_size=50'),
+        ('analyses list', '/api/analyses/'),
+        ('analyses by group', '/api/analyses/?group=CMS'),
+        ('analyses by phase', '/api/analyses/?phase=3'),
+        ('shifts member+date', f'/api/shifts/?member={member_id}&date={shift_date}'),
+        ('shifts by date', f'/api/shifts/?date={shift_date}'),
+        ('shifts cursor', '/api/shifts/?pagination=cursor&page_size=50'),
+    ]
+
+
+class Command(BaseCommand):
+    help = ("Runs EXPLAIN on every query issued by the hot list endpoints and fails if one can only be "
+            "answered by a sequential scan of a large table")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true', help="Run seed_glance first")
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            call_command('seed_glance', stdout=self.stdout)
+
+        client = Client()
+        failures = []
+        for label, url in endpoint_checks():
+            with CaptureQueriesContext(connection) as captured:
+                response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f"{label}: GET {url} returned {response.status_code}")
+
+            for query in captured.captured_queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                scanned = sorted(set(self.seq_scans(sql)) - SMALL_TABLES)
+                if scanned:
+                    failures.append((label, scanned, sql))
+                    self.stdout.write(self.style.ERROR(f"SEQ SCAN  {label}: {', '.join(scanned)}"))
+                    self.stdout.write(f"          {sql[:300]}")
+            if not any(f[0] == label for f in failures):
+                self.stdout.write(self.style.SUCCESS(f"ok        {label} ({len(captured)} queries)"))
+
+        if failures:
+            raise CommandError(f"{len(failures)} endpoint queries need a sequential scan")
+
+    def seq_scans(self, sql):
+        """
+        Tables the query can only read by scanning them whole. On PostgreSQL
+        sequential scans are disabled for the EXPLAIN, so any left over mean
+        no index can serve the query (rather than the planner preferring a
+        scan on a small or unrepresentative dataset).
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                return list(_pg_seq_scans(plan[0]['Plan']))
+            if connection.vendor == 'sqlite':
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                tables = set(connection.introspection.table_names(cursor))
+                return [
+                    detail.split()[1] for *_, detail in cursor.fetchall()
+                    if detail.startswith('SCAN ') and 'USING' not in detail and detail.split()[1] in tables
+                ]
+        raise CommandError(f"Unsupported database vendor: {connection.vendor}")
+
+
+def _pg_seq_scans(node):
+    if node.get('Node Type') == 'Seq Scan':
+        yield node['Relation Name']
+    for child in node.get('Plans', []):
+        yield from _pg_seq_scans(child)
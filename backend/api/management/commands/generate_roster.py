@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from api.models import Shift
+from api.rosters import ROSTER_CHANGED, generate_roster, parse_roster_options, save_roster
+
+
+class Command(BaseCommand):
+    help = ("Fills a date range x shift types x locations grid with active members holding a qualification, "
+            "balanced across institutes, and books it with one bulk insert")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', required=True, help="First day (YYYY-MM-DD)")
+        parser.add_argument('--to', dest='end', required=True, help="Last day (YYYY-MM-DD), inclusive")
+        parser.add_argument('--qualification', required=True, help="e.g. 'DQM Shifter'")
+        parser.add_argument('--location', dest='locations', action='append', required=True,
+                            help="Repeat for each location")
+        parser.add_argument('--type', dest='types', action='append', choices=[value for value, _ in Shift.TYPE_CHOICES],
+                            help="Repeat for each shift type (default: all)")
+        parser.add_argument('--per-slot', type=int, default=1, help="Members per date, type and location")
+        parser.add_argument('--dry-run', action='store_true', help="Solve and report without booking")
+
+    def handle(self, *args, **options):
+        try:
+            roster_options = parse_roster_options({
+                'from': options['start'], 'to': options['end'], 'qualification': options['qualification'],
+                'locations': options['locations'], 'types': options['types'], 'per_slot': options['per_slot'],
+            })
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        started = time.perf_counter()
+        shifts, unfilled = generate_roster(**roster_options)
+        solved = time.perf_counter() - started
+        if not options['dry_run']:
+            try:
+                save_roster(shifts)
+            except IntegrityError:
+                raise CommandError(ROSTER_CHANGED)
+
+        for slot in unfilled[:10]:
+            self.stderr.write(f"{slot['date']} {slot['type']} at {slot['location']}: {slot['missing']} seat(s) unfilled")
+        if len(unfilled) > 10:
+            self.stderr.write(f"... and {len(unfilled) - 10} more unfilled slots")
+        booked = "planned (dry run)" if options['dry_run'] else "booked"
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(shifts):,} shifts {booked}, {len(unfilled):,} slots short; solved in {solved:.2f}s, "
+            f"{time.perf_counter() - started:.2f}s in total"
+        ))
@@ -0,0 +1,33 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.imports import IMPORT_CHUNK_SIZE, InvalidImportFile, import_members
+
+
+class Command(BaseCommand):
+    help = "Upserts members on CERN_ID from a CSV with the member export's columns"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file, or - for stdin")
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument('--method', choices=['copy', 'bulk'],
+                            help="Force COPY + upsert (PostgreSQL) or the bulk_create fallback")
+
+    def handle(self, *args, **options):
+        try:
+            if options['path'] == '-':
+                result = import_members(sys.stdin, options['chunk_size'], options['method'])
+            else:
+                with open(options['path'], newline='', encoding='utf-8-sig') as csv_file:
+                    result = import_members(csv_file, options['chunk_size'], options['method'])
+        except (OSError, InvalidImportFile) as exc:
+            raise CommandError(str(exc))
+
+        for error in result['errors']:
+            self.stderr.write(f"line {error['line']}: {error['detail']}")
+        if result['rejected'] > len(result['errors']):
+            self.stderr.write(f"... and {result['rejected'] - len(result['errors'])} more rejected rows")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['created']:,} created, {result['updated']:,} updated, {result['rejected']:,} rejected"
+        ))
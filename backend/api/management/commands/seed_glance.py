@@ -1,284 +1,364 @@
-from django.core.management.base import BaseCommand
-from api.models import Institute, Member, Shift, Qualification, Analysis
 import random
-from datetime import timedelta, date
+import re
+import time
+from array import array
+from datetime import date, timedelta
+from itertools import islice
+from math import ceil
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from api.eligibility import invalidate_eligibility_index
+from api.models import Institute, Member, Shift, Qualification, Analysis
+from api.stats import invalidate_dashboard_stats
 
 try:
     from faker import Faker
 except ImportError:
     Faker = None
 
+# --- Real Institutes ---
+
+# A. CERN Member States (The Core Funders)
+MEMBER_STATES = [
+    ("HEPHY Vienna", "Austria", "AT-VIE"),
+    ("Université Libre de Bruxelles", "Belgium", "BE-ULB"),
+    ("Vrije Universiteit Brussel", "Belgium", "BE-VUB"),
+    ("University of Mons", "Belgium", "BE-MONS"),
+    ("Sofia University", "Bulgaria", "BG-SOF"),
+    ("Charles University Prague", "Czech Republic", "CZ-PRG"),
+    ("Niels Bohr Institute", "Denmark", "DK-NBI"),
+    ("NICPB Tallinn", "Estonia", "EE-TAL"),
+    ("Helsinki Institute of Physics", "Finland", "FI-HEL"),
+    ("CEA Saclay", "France", "FR-CEA"),
+    ("Institut Pluridisciplinaire Hubert Curien", "France", "FR-IPHC"),
+    ("LLR École Polytechnique", "France", "FR-LLR"),
+    ("DESY Hamburg", "Germany", "DE-DESY"),
+    ("RWTH Aachen University", "Germany", "DE-RWTH"),
+    ("Karlsruhe Institute of Technology", "Germany", "DE-KIT"),
+    ("University of Athens", "Greece", "GR-ATH"),
+    ("University of Ioannina", "Greece", "GR-IOA"),
+    ("Wigner RCP Budapest", "Hungary", "HU-WIG"),
+    ("Weizmann Institute", "Israel", "IL-WEIZ"),
+    ("Technion", "Israel", "IL-TECH"),
+    ("INFN Rome", "Italy", "IT-ROMA"),
+    ("INFN Bologna", "Italy", "IT-BOL"),
+    ("INFN Pisa", "Italy", "IT-PISA"),
+    ("INFN Torino", "Italy", "IT-TOR"),
+    ("NIKHEF Amsterdam", "Netherlands", "NL-NIK"),
+    ("University of Oslo", "Norway", "NO-OSL"),
+    ("University of Warsaw", "Poland", "PL-WAR"),
+    ("LIP Lisbon", "Portugal", "PT-LIP"),
+    ("IFIN-HH Bucharest", "Romania", "RO-BUCH"),
+    ("University of Belgrade", "Serbia", "RS-BEL"),
+    ("Slovak Academy of Sciences", "Slovakia", "SK-SAS"),
+    ("Jozef Stefan Institute", "Slovenia", "SI-LJU"),
+    ("CIEMAT Madrid", "Spain", "ES-MAD"),
+    ("Instituto de Física de Cantabria", "Spain", "ES-IFCA"),
+    ("KTH Stockholm", "Sweden", "SE-KTH"),
+    ("Uppsala University", "Sweden", "SE-UPP"),
+    ("ETH Zurich", "Switzerland", "CH-ETH"),
+    ("University of Zurich", "Switzerland", "CH-UZH"),
+    ("Paul Scherrer Institute", "Switzerland", "CH-PSI"),
+    ("Imperial College London", "United Kingdom", "UK-IMP"),
+    ("University of Bristol", "United Kingdom", "UK-BRI"),
+    ("Brunel University", "United Kingdom", "UK-BRU"),
+    ("Rutherford Appleton Laboratory", "United Kingdom", "UK-RAL"),
+]
+
+# B. Associate Member States & Cooperating States
+ASSOCIATE_STATES = [
+    ("CBPF Rio de Janeiro", "Brazil", "BR-RIO"),
+    ("Universidade do Estado do Rio de Janeiro", "Brazil", "BR-UERJ"),
+    ("University of Split", "Croatia", "HR-SPL"),
+    ("University of Cyprus", "Cyprus", "CY-NIC"),
+    ("Tata Institute (TIFR)", "India", "IN-TIFR"),
+    ("Panjab University", "India", "IN-PAN"),
+    ("University College Dublin", "Ireland", "IE-UCD"),
+    ("Riga Technical University", "Latvia", "LV-RIG"),
+    ("Vilnius University", "Lithuania", "LT-VIL"),
+    ("NCP Islamabad", "Pakistan", "PK-NCP"),
+    ("METU Ankara", "Türkiye", "TR-ANK"),
+    ("Bogazici University", "Türkiye", "TR-BOG"),
+    ("Kharkiv Inst. of Physics", "Ukraine", "UA-KHAR"),
+]
+
+# C. Major Partners (USA is huge in CMS, plus China, Japan, Korea)
+PARTNERS = [
+    ("CERN", "Switzerland", "CERN"),  # Host
+    ("IHEP Beijing", "China", "CN-IHEP"),
+    ("Peking University", "China", "CN-PKU"),
+    ("University of Tokyo", "Japan", "JP-TOK"),
+    ("Kyungpook National University", "South Korea", "KR-KNU"),
+    ("Seoul National University", "South Korea", "KR-SNU"),
+    ("Fermilab", "USA", "US-FNAL"),  # Major Hub
+    ("MIT", "USA", "US-MIT"),
+    ("Caltech", "USA", "US-CALT"),
+    ("Princeton University", "USA", "US-PRI"),
+    ("University of Wisconsin Madison", "USA", "US-WIS"),
+    ("UCSD", "USA", "US-UCSD"),
+    ("Cornell University", "USA", "US-COR"),
+    ("Florida State University", "USA", "US-FSU"),
+]
+
+ALL_INSTITUTES = MEMBER_STATES + ASSOCIATE_STATES + PARTNERS
+HUB_CODES = {'CERN', 'US-FNAL'}
+
+# REALISTIC CERN CONTRACT TYPES
+STATUSES = [
+    'USER', 'USER', 'USER', 'USER',
+    'STAFF',
+    'FELLOW', 'FELLOW',
+    'DOCTORAL STUDENT', 'DOCTORAL STUDENT',
+    'PJAS',
+    'TECHNICAL STUDENT'
+]
+# PhD holders (Staff, Fellow, Users, PJAS) are billable. Students are not.
+MO_STATUSES = {'STAFF', 'FELLOW', 'USER', 'PJAS'}
+
+SHIFT_TYPES = ['MORNING', 'EVENING', 'NIGHT']
+# REALISTIC CMS SHIFT LOCATIONS
+LOCATIONS = [
+    'P5 Control Room',  # Point 5 (Cessy) - The Detector
+    'CMS Centre (Meyrin)',  # Main Campus Control Room
+    'Fermilab ROC',  # Remote Ops Center (Chicago)
+    'DESY ROC',  # Remote Ops Center (Germany)
+    'Remote (Zoom)',  # Data Quality / Offline
+    'Site 40 Lab'  # Hardware Integration
+]
+# Shifts fall in a window from 30 days ago to 60 days ahead.
+SHIFT_OFFSETS = range(-30, 61)
+
+QUALIFICATIONS = [
+    "LHC Control Room Operator",
+    "Radiation Safety Level 2",
+    "CMS Guide",
+    "Python Developer Certification",
+    "Cryogenics Expert",
+    "Detector on Call",
+    "DQM Shifter"
+]
+
+GROUPS = ['ATLAS', 'CMS', 'ALICE', 'LHCb', 'TOTEM', 'LHCf', 'MOEDAL', 'FASER', 'SND']
+PAPER_STATUSES = ["Draft", "Editor Review", "CWR (Collaboration Wide Review)", "Submitted", "Accepted"]
+# REALISTIC  JOURNALS
+JOURNALS = [
+    "JHEP",  # Journal of High Energy Physics (Standard)
+    "Phys. Rev. D",  # Physical Review D (Standard)
+    "Phys. Rev. Lett.",  # Letters (High Impact)
+    "Eur. Phys. J. C",  # EPJC (Standard)
+    "Nature Physics",  # Very High Impact
+    "Nature"  # Dream Goal
+]
+
+# Used when Faker is not installed.
+FALLBACK_FIRST_NAMES = ["Anna", "Lukas", "Marie", "Paolo", "Chen", "Yuki", "Omar", "Sofia", "Jonas", "Priya"]
+FALLBACK_LAST_NAMES = ["Schmidt", "Rossi", "Dubois", "Novak", "Kowalski", "Tanaka", "Garcia", "Olsen", "Murphy", "Singh"]
+FALLBACK_TITLES = ["Measurement of the Higgs Boson Cross Section",
+                   "Search for Supersymmetry in Multijet Final States",
+                   "Observation of Rare B Meson Decays"]
+
+NAME_POOL_SIZE = 2000
+TITLE_POOL_SIZE = 500
+# Share of members (the first ones created) holding qualifications and authoring papers.
+SENIOR_SHARE = 0.4
 
-class Command(BaseCommand):
-    help = "Seeds the database with 5,000 members from realistic CMS institutes (excluding Russia) and operational data"
-
-    def handle(self, *args, **kwargs):
-        self.stdout.write("Initializing Seeder...")
-
-        if Faker:
-            fake = Faker()
-        else:
-            class Fake:
-                def first_name(self): return "Physicist"
-
-                def last_name(self): return "Name"
-
-                def email(self): return "email@cern.ch"
-
-                def date_between(self, start_date, end_date): return date.today()
-
-                def sentence(self, nb_words=6): return "Measurement of the Higgs Boson Cross Section"
-
-                def company(self): return "University of Physics"
-
-                def lexify(self, text): return "PHYS"
 
-                def country(self): return "Switzerland"
-
-                def unique(self): return self
-
-                def random_number(self, digits=6): return 123456
-
-                def year(self): return 2025
-
-                def date_this_decade(self): return date.today()
+class Command(BaseCommand):
+    help = "Seeds the database with members from realistic CMS institutes (excluding Russia) and operational data"
 
-            fake = Fake()
+    def add_arguments(self, parser):
+        parser.add_argument('--members', type=int, default=5000)
+        parser.add_argument('--papers', type=int, default=300)
+        parser.add_argument('--shifts', type=int, default=6000, help="Total shifts, spread over active members")
+        parser.add_argument('--seed', type=int, default=None, help="Seed for a reproducible data set")
+        parser.add_argument('--batch-size', type=int, default=5000)
 
-        # --- 1. Create Real Institutes ---
+    def handle(self, *args, **options):
+        self.stdout.write("Initializing Seeder...")
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.today = date.today()
+        if options['members'] < 1:
+            raise CommandError("--members must be at least 1.")
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            institutes = self.create_institutes()
+            self.clear()
+            member_ids, active_ids = self.create_members(institutes, options['members'], options['seed'])
+            senior_ids = member_ids[:max(1, int(len(member_ids) * SENIOR_SHARE))]
+            self.create_shifts(active_ids, options['shifts'])
+            self.create_qualifications(senior_ids)
+            self.create_papers(senior_ids, options['papers'])
+
+            # bulk_create bypasses the model signals that normally expire the dashboard cache
+            invalidate_dashboard_stats()
+            invalidate_eligibility_index()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully seeded {len(member_ids):,} members from {len(institutes)} institutes "
+            f"in {time.perf_counter() - started:.1f}s!"
+        ))
+
+    def create_institutes(self):
         self.stdout.write("Creating Institutes...")
-
-        # A. CERN Member States (The Core Funders)
-        member_states = [
-            ("HEPHY Vienna", "Austria", "AT-VIE"),
-            ("Université Libre de Bruxelles", "Belgium", "BE-ULB"),
-            ("Vrije Universiteit Brussel", "Belgium", "BE-VUB"),
-            ("University of Mons", "Belgium", "BE-MONS"),
-            ("Sofia University", "Bulgaria", "BG-SOF"),
-            ("Charles University Prague", "Czech Republic", "CZ-PRG"),
-            ("Niels Bohr Institute", "Denmark", "DK-NBI"),
-            ("NICPB Tallinn", "Estonia", "EE-TAL"),
-            ("Helsinki Institute of Physics", "Finland", "FI-HEL"),
-            ("CEA Saclay", "France", "FR-CEA"),
-            ("Institut Pluridisciplinaire Hubert Curien", "France", "FR-IPHC"),
-            ("LLR École Polytechnique", "France", "FR-LLR"),
-            ("DESY Hamburg", "Germany", "DE-DESY"),
-            ("RWTH Aachen University", "Germany", "DE-RWTH"),
-            ("Karlsruhe Institute of Technology", "Germany", "DE-KIT"),
-            ("University of Athens", "Greece", "GR-ATH"),
-            ("University of Ioannina", "Greece", "GR-IOA"),
-            ("Wigner RCP Budapest", "Hungary", "HU-WIG"),
-            ("Weizmann Institute", "Israel", "IL-WEIZ"),
-            ("Technion", "Israel", "IL-TECH"),
-            ("INFN Rome", "Italy", "IT-ROMA"),
-            ("INFN Bologna", "Italy", "IT-BOL"),
-            ("INFN Pisa", "Italy", "IT-PISA"),
-            ("INFN Torino", "Italy", "IT-TOR"),
-            ("NIKHEF Amsterdam", "Netherlands", "NL-NIK"),
-            ("University of Oslo", "Norway", "NO-OSL"),
-            ("University of Warsaw", "Poland", "PL-WAR"),
-            ("LIP Lisbon", "Portugal", "PT-LIP"),
-            ("IFIN-HH Bucharest", "Romania", "RO-BUCH"),
-            ("University of Belgrade", "Serbia", "RS-BEL"),
-            ("Slovak Academy of Sciences", "Slovakia", "SK-SAS"),
-            ("Jozef Stefan Institute", "Slovenia", "SI-LJU"),
-            ("CIEMAT Madrid", "Spain", "ES-MAD"),
-            ("Instituto de Física de Cantabria", "Spain", "ES-IFCA"),
-            ("KTH Stockholm", "Sweden", "SE-KTH"),
-            ("Uppsala University", "Sweden", "SE-UPP"),
-            ("ETH Zurich", "Switzerland", "CH-ETH"),
-            ("University of Zurich", "Switzerland", "CH-UZH"),
-            ("Paul Scherrer Institute", "Switzerland", "CH-PSI"),
-            ("Imperial College London", "United Kingdom", "UK-IMP"),
-            ("University of Bristol", "United Kingdom", "UK-BRI"),
-            ("Brunel University", "United Kingdom", "UK-BRU"),
-            ("Rutherford Appleton Laboratory", "United Kingdom", "UK-RAL"),
-        ]
-
-        # B. Associate Member States & Cooperating States
-        associate_states = [
-            ("CBPF Rio de Janeiro", "Brazil", "BR-RIO"),
-            ("Universidade do Estado do Rio de Janeiro", "Brazil", "BR-UERJ"),
-            ("University of Split", "Croatia", "HR-SPL"),
-            ("University of Cyprus", "Cyprus", "CY-NIC"),
-            ("Tata Institute (TIFR)", "India", "IN-TIFR"),
-            ("Panjab University", "India", "IN-PAN"),
-            ("University College Dublin", "Ireland", "IE-UCD"),
-            ("Riga Technical University", "Latvia", "LV-RIG"),
-            ("Vilnius University", "Lithuania", "LT-VIL"),
-            ("NCP Islamabad", "Pakistan", "PK-NCP"),
-            ("METU Ankara", "Türkiye", "TR-ANK"),
-            ("Bogazici University", "Türkiye", "TR-BOG"),
-            ("Kharkiv Inst. of Physics", "Ukraine", "UA-KHAR"),
-        ]
-
-        # C. Major Partners (USA is huge in CMS, plus China, Japan, Korea)
-        partners = [
-            ("CERN", "Switzerland", "CERN"),  # Host
-            ("IHEP Beijing", "China", "CN-IHEP"),
-            ("Peking University", "China", "CN-PKU"),
-            ("University of Tokyo", "Japan", "JP-TOK"),
-            ("Kyungpook National University", "South Korea", "KR-KNU"),
-            ("Seoul National University", "South Korea", "KR-SNU"),
-            ("Fermilab", "USA", "US-FNAL"),  # Major Hub
-            ("MIT", "USA", "US-MIT"),
-            ("Caltech", "USA", "US-CALT"),
-            ("Princeton University", "USA", "US-PRI"),
-            ("University of Wisconsin Madison", "USA", "US-WIS"),
-            ("UCSD", "USA", "US-UCSD"),
-            ("Cornell University", "USA", "US-COR"),
-            ("Florida State University", "USA", "US-FSU"),
-        ]
-
-        all_institutes_data = member_states + associate_states + partners
-
         institutes = []
-        for name, country, code in all_institutes_data:
+        for name, country, code in ALL_INSTITUTES:
             # We use get_or_create to avoid duplicates if running seed multiple times without flush
             inst, _ = Institute.objects.get_or_create(name=name, country=country, code=code)
             institutes.append(inst)
-
-        # --- 2. Clear existing data ---
+        return institutes
+
+    def clear(self):
+        """
+        Empties the seeded tables with the backend's flush SQL (TRUNCATE on
+        PostgreSQL) and restarts their ids, instead of a cascading delete()
+        that loads every row to send its signals.
+        """
         self.stdout.write("Clearing old data...")
-        Shift.objects.all().delete()
-        Qualification.objects.all().delete()
-        Analysis.objects.all().delete()
-        Member.objects.all().delete()
-
-        # --- 3. Bulk Create 5,000 Members ---
-        self.stdout.write("Generating 5,000 members...")
-        members_to_create = []
-
-        # REALISTIC CERN CONTRACT TYPES
-        statuses = [
-            'USER', 'USER', 'USER', 'USER',
-            'STAFF',
-            'FELLOW', 'FELLOW',
-            'DOCTORAL STUDENT', 'DOCTORAL STUDENT',
-            'PJAS',
-            'TECHNICAL STUDENT'
-        ]
-
-        for i in range(5000):
-            # Weighted random: CERN and Fermilab have more people
-            if random.random() < 0.15:
-                # Pick from CERN or Fermilab (known codes)
-                inst = next((x for x in institutes if x.code in ['CERN', 'US-FNAL']), institutes[0])
-            else:
-                inst = random.choice(institutes)
-
-            status = random.choice(statuses)
-
-            # Logic for M&O Qualified:
-            # PhD holders (Staff, Fellow, Users, PJAS) are billable. Students are not.
-            if status in ['STAFF', 'FELLOW', 'USER', 'PJAS']:
-                is_mo = random.choice([True, True, True, False])  # 75% chance
-            else:
-                is_mo = False
-
-            members_to_create.append(Member(
-                first_name=fake.first_name(),
-                last_name=fake.last_name(),
-                cern_id=f"10{i:04d}",
-                institute=inst,
-                email=fake.email(),
-                is_active=random.choice([True, True, True, False]),
-                cern_status=status,
-                is_mo_qualified=is_mo,
-                contract_end_date=fake.date_between(start_date='+1y', end_date='+5y')
-            ))
-
-        Member.objects.bulk_create(members_to_create)
-
-        # --- 4. Create Shifts (For first 1500 active members) ---
-        self.stdout.write("Generating shifts...")
-        active_members = list(Member.objects.filter(is_active=True)[:1500])
-        shift_types = ['MORNING', 'EVENING', 'NIGHT']
-
-        # REALISTIC CMS SHIFT LOCATIONS
-        locations = [
-            'P5 Control Room',  # Point 5 (Cessy) - The Detector
-            'CMS Centre (Meyrin)',  # Main Campus Control Room
-            'Fermilab ROC',  # Remote Ops Center (Chicago)
-            'DESY ROC',  # Remote Ops Center (Germany)
-            'Remote (Zoom)',  # Data Quality / Offline
-            'Site 40 Lab'  # Hardware Integration
-        ]
-
-        shifts_to_create = []
-        for member in active_members:
-            # Assign 0 to 8 shifts per person
-            for _ in range(random.randint(0, 8)):
-                shifts_to_create.append(Shift(
-                    member=member,
-                    date=fake.date_between(start_date='-30d', end_date='+60d'),
-                    type=random.choice(shift_types),
-                    location=random.choice(locations)
-                ))
-        Shift.objects.bulk_create(shifts_to_create)
-
-        # --- 5. Create Qualifications ---
-        self.stdout.write("Generating qualifications...")
-        quals_list = [
-            "LHC Control Room Operator",
-            "Radiation Safety Level 2",
-            "CMS Guide",
-            "Python Developer Certification",
-            "Cryogenics Expert",
-            "Detector on Call",
-            "DQM Shifter"
-        ]
-
-        quals_to_create = []
-        for member in Member.objects.all()[:2000]:
-            for _ in range(random.randint(1, 3)):
-                quals_to_create.append(Qualification(
-                    member=member,
-                    name=random.choice(quals_list),
-                    date_earned=fake.date_between(start_date='-5y', end_date='today')
-                ))
-        Qualification.objects.bulk_create(quals_to_create)
-
-        # --- 6. Create Analyses (Papers) ---
-        self.stdout.write("Generating scientific papers...")
-        groups = ['ATLAS', 'CMS', 'ALICE', 'LHCb', 'TOTEM', 'LHCf', 'MOEDAL', 'FASER', 'SND']
-        statuses = ["Draft", "Editor Review", "CWR (Collaboration Wide Review)", "Submitted", "Accepted"]
-
-        # REALISTIC  JOURNALS
-        journals = [
-            "JHEP",  # Journal of High Energy Physics (Standard)
-            "Phys. Rev. D",  # Physical Review D (Standard)
-            "Phys. Rev. Lett.",  # Letters (High Impact)
-            "Eur. Phys. J. C",  # EPJC (Standard)
-            "Nature Physics",  # Very High Impact
-            "Nature"  # Dream Goal
-        ]
-
-        analyses_to_create = []
-        for i in range(300):
-            group = random.choice(groups)
-            year = random.choice([2022, 2023, 2024, 2025])
-            ref_code = f"{group}-{year}-{i:04d}"
-
-            analyses_to_create.append(Analysis(
-                title=fake.sentence(nb_words=10).replace(".", ""),
-                ref_code=ref_code,
-                group=group,
-                phase=random.choice([0, 1, 2, 3]),
-                status_text=random.choice(statuses),
-                target_journal=random.choice(journals),
-                creation_date=fake.date_between(start_date='-2y', end_date='today')
-            ))
-
-        Analysis.objects.bulk_create(analyses_to_create)
-
-        # --- 7. Assign Authors ---
-        self.stdout.write("Assigning authors to papers...")
-        all_members_list = list(Member.objects.all()[:2000])
-        saved_analyses = Analysis.objects.all()
-
-        for paper in saved_analyses:
-            authors = random.sample(all_members_list, k=random.randint(5, 50))
-            paper.authors.set(authors)
-
-        self.stdout.write(self.style.SUCCESS(f'Successfully seeded 5,000 members from {len(institutes)} institutes!'))
\ No newline at end of file
+        models = [Analysis.authors.through, Shift, Qualification, Analysis, Member]
+        tables = [model._meta.db_table for model in models]
+        sql = connection.ops.sql_flush(no_style(), tables, reset_sequences=True, allow_cascade=True)
+        if connection.vendor == 'postgresql':
+            # TRUNCATE refuses tables with deferred FK checks still pending in
+            # this transaction (e.g. seeding twice in one atomic block).
+            sql.insert(0, "SET CONSTRAINTS ALL IMMEDIATE")
+        connection.ops.execute_sql_flush(sql)
+
+    def create_members(self, institutes, count, seed):
+        first_names, last_names, titles = self.name_pools(seed)
+        self.titles = titles
+        hubs = [inst for inst in institutes if inst.code in HUB_CODES] or institutes
+        rng, today = self.rng, self.today
+
+        def members():
+            for i in range(count):
+                # Weighted random: CERN and Fermilab have more people
+                inst = rng.choice(hubs) if rng.random() < 0.15 else rng.choice(institutes)
+                status = rng.choice(STATUSES)
+                first_name, first_slug = rng.choice(first_names)
+                last_name, last_slug = rng.choice(last_names)
+                member = Member(
+                    first_name=first_name,
+                    last_name=last_name,
+                    cern_id=f"10{i:04d}",
+                    institute=inst,
+                    email=f"{first_slug}.{last_slug}.{i}@cern.ch",
+                    is_active=rng.random() < 0.75,
+                    cern_status=status,
+                    is_mo_qualified=status in MO_STATUSES and rng.random() < 0.75,
+                    contract_end_date=today + timedelta(days=rng.randint(365, 5 * 365)),
+                )
+                # bulk_create skips Member.save(), which normally fills this in
+                member.search_document = member.build_search_document(inst)
+                yield member
+
+        # Only the ids are kept, so memory stays flat at a million members.
+        member_ids, active_ids = array('q'), array('q')
+
+        def collect(batch):
+            for member in batch:
+                member_ids.append(member.pk)
+                if member.is_active:
+                    active_ids.append(member.pk)
+
+        self.insert(Member, members(), f"{count:,} members", collect)
+        return member_ids, active_ids
+
+    def create_shifts(self, active_ids, total):
+        if total <= 0 or not active_ids:
+            return
+        # Spread the shifts evenly over the first active members, about four each.
+        booked = min(len(active_ids), ceil(total / 4))
+        per_member, extra = divmod(total, booked)
+        if per_member + (extra > 0) > len(SHIFT_OFFSETS):
+            raise CommandError(f"--shifts {total} needs more active members (one shift per member per day).")
+        rng, today = self.rng, self.today
+
+        def shifts():
+            for index, member_id in enumerate(active_ids[:booked]):
+                for offset in rng.sample(SHIFT_OFFSETS, k=per_member + (index < extra)):
+                    yield Shift(member_id=member_id, date=today + timedelta(days=offset),
+                                type=rng.choice(SHIFT_TYPES), location=rng.choice(LOCATIONS))
+
+        self.insert(Shift, shifts(), f"{total:,} shifts")
+
+    def create_qualifications(self, senior_ids):
+        rng, today = self.rng, self.today
+
+        def qualifications():
+            for member_id in senior_ids:
+                for _ in range(rng.randint(1, 3)):
+                    yield Qualification(member_id=member_id, name=rng.choice(QUALIFICATIONS),
+                                        date_earned=today - timedelta(days=rng.randint(0, 5 * 365)))
+
+        self.insert(Qualification, qualifications(), "qualifications")
+
+    def create_papers(self, senior_ids, count):
+        rng, today = self.rng, self.today
+
+        def papers():
+            for i in range(count):
+                group = rng.choice(GROUPS)
+                year = rng.choice([2022, 2023, 2024, 2025])
+                paper = Analysis(
+                    title=rng.choice(self.titles),
+                    ref_code=f"{group}-{year}-{i:04d}",
+                    group=group,
+                    phase=rng.choice([0, 1, 2, 3]),
+                    status_text=rng.choice(PAPER_STATUSES),
+                    target_journal=rng.choice(JOURNALS),
+                    creation_date=today - timedelta(days=rng.randint(0, 2 * 365)),
+                )
+                paper.search_document = paper.build_search_document()
+                yield paper
+
+        paper_ids = array('q')
+        self.insert(Analysis, papers(), f"{count:,} scientific papers",
+                    lambda batch: paper_ids.extend(paper.pk for paper in batch))
+
+        # One through-table insert per batch instead of authors.set() per paper.
+        Authorship = Analysis.authors.through
+
+        def authorships():
+            for paper_id in paper_ids:
+                for member_id in rng.sample(senior_ids, k=min(len(senior_ids), rng.randint(5, 50))):
+                    yield Authorship(analysis_id=paper_id, member_id=member_id)
+
+        self.insert(Authorship, authorships(), "author links")
+
+    def insert(self, model, objects, label, on_batch=None):
+        """Bulk-creates ``objects`` (any iterable) in batches of ``--batch-size``."""
+        self.stdout.write(f"Generating {label}...")
+        started, created = time.perf_counter(), 0
+        while batch := list(islice(objects, self.batch_size)):
+            model.objects.bulk_create(batch)
+            if on_batch:
+                on_batch(batch)
+            created += len(batch)
+        self.stdout.write(f"  {created:,} rows in {time.perf_counter() - started:.1f}s")
+
+    def name_pools(self, seed):
+        """
+        Pre-generates names and titles once; members then pick from the pools
+        instead of calling Faker per field.
+        """
+        if Faker is None:
+            first_names, last_names, titles = FALLBACK_FIRST_NAMES, FALLBACK_LAST_NAMES, FALLBACK_TITLES
+        else:
+            if seed is not None:
+                Faker.seed(seed)
+            fake = Faker()
+            first_names = sorted({fake.first_name() for _ in range(NAME_POOL_SIZE)})
+            last_names = sorted({fake.last_name() for _ in range(NAME_POOL_SIZE)})
+            titles = [fake.sentence(nb_words=10).replace(".", "") for _ in range(TITLE_POOL_SIZE)]
+        return ([(name, _slug(name)) for name in first_names],
+                [(name, _slug(name)) for name in last_names],
+                titles)
+
+
+def _slug(name):
+    return re.sub(r'[^a-z0-9]', '', name.lower()) or 'member'
@@ -0,0 +1,71 @@
+"""
+Prometheus metrics for the API, exposed at ``/api/metrics``.
+
+With ``PROMETHEUS_MULTIPROC_DIR`` set (entrypoint.sh does for gunicorn),
+every worker writes its own mmap'd files without cross-process locking and
+the exposition view merges them at scrape time. Without it the metrics are
+those of the serving process.
+"""
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+REQUESTS = Counter('glance_http_requests_total', "HTTP requests by route, method and status",
+                   ['route', 'method', 'status'])
+LATENCY = Histogram('glance_http_request_duration_seconds', "HTTP request latency by route and method",
+                    ['route', 'method'])
+CACHE_LOOKUPS = Counter('glance_cache_lookups_total', "Shared cache reads by key and hit/miss", ['key', 'result'])
+TELEMETRY_SAMPLES = Counter('glance_telemetry_samples_total', "LHC telemetry samples received", ['result'])
+
+
+def record_cache_lookup(key, hit):
+    CACHE_LOOKUPS.labels(key=key, result='hit' if hit else 'miss').inc()
+
+
+class MetricsMiddleware:
+    """Counts and times every request, labelled by its URL name from config/urls.py."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.record(request, response, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, started)
+        return response
+
+    def record(self, request, response, started):
+        # The URL name keeps label cardinality bounded, unlike the raw path.
+        match = request.resolver_match
+        route = match.view_name if match else 'unmatched'
+        method = request.method if request.method in METHODS else 'other'
+        LATENCY.labels(route, method).observe(time.perf_counter() - started)
+        REQUESTS.labels(route, method, response.status_code).inc()
+
+
+def metrics_view(request):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,69 @@
+from django.db import migrations, models
+
+
+def _document(*values):
+    return ' '.join(str(value) for value in values if value).lower()
+
+
+def backfill_search_documents(apps, schema_editor):
+    Member = apps.get_model('api', 'Member')
+    Analysis = apps.get_model('api', 'Analysis')
+
+    batch = []
+    for member in Member.objects.select_related('institute').iterator(chunk_size=2000):
+        member.search_document = _document(member.first_name, member.last_name, member.cern_id, member.email,
+                                           member.institute.name, member.institute.code)
+        batch.append(member)
+        if len(batch) == 2000:
+            Member.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    Member.objects.bulk_update(batch, ['search_document'])
+
+    papers = list(Analysis.objects.all())
+    for paper in papers:
+        paper.search_document = _document(paper.title, paper.ref_code, paper.group, paper.target_journal,
+                                          paper.status_text)
+    Analysis.objects.bulk_update(papers, ['search_document'], batch_size=2000)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # pg_trgm GIN indexes make the '%term%' LIKE behind directory search an
+    # index scan. Other databases (SQLite in tests) keep the plain column.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS api_member_search_trgm ON api_member USING gin (search_document gin_trgm_ops)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS api_analysis_search_trgm ON api_analysis USING gin (search_document gin_trgm_ops)"
+    )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS api_member_search_trgm")
+    schema_editor.execute("DROP INDEX IF EXISTS api_analysis_search_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_alter_analysis_ref_code_alter_institute_code_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='search_document',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='analysis',
+            name='search_document',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
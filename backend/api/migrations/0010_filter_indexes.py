@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='institute',
+            index=models.Index(fields=['country'], name='institute_country_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['cern_status', 'last_name'], name='member_status_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(fields=['institute', 'last_name'], name='member_institute_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(condition=models.Q(is_active=True), fields=['last_name', 'id'],
+                               name='member_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='member',
+            index=models.Index(condition=models.Q(is_mo_qualified=True), fields=['last_name', 'id'],
+                               name='member_mo_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shift',
+            index=models.Index(fields=['member', 'date'], name='shift_member_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analysis',
+            index=models.Index(fields=['group', '-creation_date'], name='analysis_group_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analysis',
+            index=models.Index(fields=['phase', '-creation_date'], name='analysis_phase_date_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+# Conflicts listed in the error or the deletion report; the rest are only counted.
+MAX_LISTED = 20
+
+
+def check_duplicate_shifts(apps, schema_editor):
+    # Stops on two bookings of one member on the same day, listing them, unless
+    # DEDUPLICATE_SHIFTS is set: then the earliest booking of each day is kept
+    # and the others are deleted and reported.
+    Shift = apps.get_model('api', 'Shift')
+    duplicates = list(
+        Shift.objects.values('member_id', 'date').annotate(count=Count('id')).filter(count__gt=1)
+        .order_by('date', 'member_id')
+    )
+    if not duplicates:
+        return
+    lines, extra = [], []
+    for n, pair in enumerate(duplicates):
+        ids = list(Shift.objects.filter(member_id=pair['member_id'], date=pair['date'])
+                   .order_by('id').values_list('id', flat=True))
+        extra += ids[1:]
+        if n < MAX_LISTED:
+            lines.append(f"  member {pair['member_id']} on {pair['date']}: shifts {', '.join(map(str, ids))}")
+    if len(duplicates) > MAX_LISTED:
+        lines.append(f"  ... and {len(duplicates) - MAX_LISTED} more")
+
+    if not settings.DEDUPLICATE_SHIFTS:
+        raise RuntimeError(
+            f"{len(duplicates)} (member, date) pairs have more than one shift; keep one shift per member and "
+            f"day, or run migrate with DEDUPLICATE_SHIFTS=1 to keep the first of each:\n" + "\n".join(lines)
+        )
+    for start in range(0, len(extra), 1000):
+        Shift.objects.filter(id__in=extra[start:start + 1000]).delete()
+    print(f"\n  Deleted {len(extra)} shifts booked on a day their member already had a shift "
+          f"({len(duplicates)} days, the first shift of each kept):\n" + "\n".join(lines))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_shifts, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='shift',
+            name='shift_member_date_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='shift',
+            constraint=models.UniqueConstraint(fields=['member', 'date'], name='unique_shift_per_member_day'),
+        ),
+    ]
@@ -0,0 +1,290 @@
+import csv
+import hashlib
+import io
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .metrics import record_cache_lookup
+from .pagination import keyset_requested
+from .querysets import plan_queryset
+from .stats import current_generation
+from .values import ValuesSerializer
+
+
+class QueryPlannedMixin:
+    """
+    Builds the viewset queryset from the serializer's declared fields so
+    nested relations are joined or prefetched instead of loaded per row.
+    """
+
+    def get_queryset(self):
+        serializer = self.get_serializer()
+        return plan_queryset(self.prepare_queryset(super().get_queryset(), serializer), serializer)
+
+    def prepare_queryset(self, queryset, serializer):
+        """
+        Hook for annotations and hand-tuned prefetches; anything prefetched
+        here is left alone by the planner.
+        """
+        return queryset
+
+
+class SparseFieldsMixin:
+    """
+    Passes ``?fields=a,b,c`` through to the serializer on reads, which also
+    keeps the query planner from joining relations that are not rendered.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        request = getattr(self, 'request', None)
+        if request is not None and request.method == 'GET':
+            fields = request.query_params.get('fields')
+            if fields:
+                kwargs.setdefault('fields', [f.strip() for f in fields.split(',') if f.strip()])
+        return super().get_serializer(*args, **kwargs)
+
+
+class FacetMixin:
+    """
+    ``?facets=a,b`` (or ``?facets=all``) adds ``facets`` to a list response:
+    the values of each requested ``facet_fields`` entry with their counts
+    under the current search and filters, most frequent first.
+
+    All requested fields are counted in one ``GROUP BY`` over their
+    combinations and folded per field in Python. The result is cached under
+    the normalised filter parameters and the data generation (see stats.py),
+    so a change to any row gives new counts. Searches make the keys
+    unbounded, so they go to the size-bounded ``facets`` cache.
+    """
+    facet_fields = []
+    facet_cache = 'facets'
+    facet_timeout = 60 * 10
+    # Parameters that page or shape the response without changing which rows match.
+    unfiltered_params = {'facets', 'fields', 'format', 'page', 'page_size', 'pagination', 'cursor', 'count',
+                         'ordering'}
+
+    def list(self, request, *args, **kwargs):
+        fields = self.requested_facets()
+        response = super().list(request, *args, **kwargs)
+        if fields and response.status_code == 200:
+            response.data['facets'] = self.get_facets(fields)
+        return response
+
+    def requested_facets(self):
+        requested = self.request.query_params.get('facets', '')
+        if requested.strip() == 'all':
+            return list(self.facet_fields)
+        fields = list(dict.fromkeys(field.strip() for field in requested.split(',') if field.strip()))
+        unknown = [field for field in fields if field not in self.facet_fields]
+        if unknown:
+            raise ValidationError({'facets': f"Unknown facet {', '.join(unknown)}; choose from "
+                                             f"{', '.join(self.facet_fields)} or 'all'."})
+        return fields
+
+    def get_facets(self, fields):
+        cache = caches[self.facet_cache]
+        key = self.facet_cache_key(fields)
+        facets = cache.get(key)
+        record_cache_lookup('facets', facets is not None)
+        if facets is None:
+            # The bare queryset: the serializer's joins and annotations do not change the counts.
+            facets = count_facets(self.filter_queryset(self.queryset.all()), fields)
+            cache.set(key, facets, self.facet_timeout)
+        return facets
+
+    def facet_cache_key(self, fields):
+        params = {}
+        for name, values in self.request.query_params.lists():
+            if name in self.unfiltered_params:
+                continue
+            values = [' '.join(value.split()) for value in values if value.strip()]
+            if name == 'search':  # case-insensitive, every term must match in any order
+                values = sorted({term for value in values for term in value.lower().replace(',', ' ').split()})
+            if values:
+                params[name] = sorted(values)
+        digest = hashlib.sha1(json.dumps([sorted(params.items()), fields]).encode()).hexdigest()
+        return f'facets:{self.queryset.model._meta.label_lower}:{current_generation()}:{digest}'
+
+
+def count_facets(queryset, fields):
+    """``{field: [{value, count}, ...]}`` from one grouped query over every combination of ``fields``."""
+    counts = {field: {} for field in fields}
+    for row in queryset.order_by().values(*fields).annotate(facet_count=Count('*')):
+        for field in fields:
+            counts[field][row[field]] = counts[field].get(row[field], 0) + row['facet_count']
+    return {
+        field: [{'value': value, 'count': count}
+                for value, count in sorted(values.items(), key=lambda item: (-item[1], str(item[0])))]
+        for field, values in counts.items()
+    }
+
+
+class ConditionalGetMixin:
+    """
+    Answers ``If-None-Match`` / ``If-Modified-Since`` on ``list`` and
+    ``retrieve`` with a 304 before anything is serialized.
+
+    A list's validator is ``max(updated_at)`` plus the row count of the
+    filtered queryset, one aggregate whose count the page-number paginator
+    reuses instead of its own ``COUNT``. Cursor pages skip it: they never
+    scan the whole result. Nested data must touch its parent's
+    ``updated_at`` (see signals.py) for the validator to cover it.
+
+    With ``values_serialization`` the rows are read with ``values_list()``
+    and serialized by a ``ValuesSerializer`` when it covers every field.
+    """
+    modified_field = 'updated_at'
+    values_serialization = False
+
+    def list(self, request, *args, **kwargs):
+        if keyset_requested(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        etag = self.list_etag(queryset.order_by().aggregate(**self.list_version()))
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return self._conditional(not_modified, etag)
+
+        values_serializer = self.get_values_serializer(queryset)
+        if values_serializer is not None:
+            queryset = values_serializer.rows(queryset)
+        page = self.paginate_queryset(queryset)
+        rows = queryset if page is None else page
+        if values_serializer is not None:
+            data = values_serializer.to_representation(rows)
+        else:
+            data = self.get_serializer(rows, many=True).data
+        response = Response(data) if page is None else self.get_paginated_response(data)
+        return self._conditional(response, etag)
+
+    def get_values_serializer(self, queryset):
+        """The ``ValuesSerializer`` for this list, or None to serialize model instances."""
+        if not (self.values_serialization and settings.FAST_LIST_SERIALIZATION):
+            return None
+        return ValuesSerializer.compile(self.get_serializer(), queryset)
+
+    def list_version(self):
+        # COUNT(*) rather than COUNT(pk): the updated_at index alone can answer both.
+        return {'last': Max(self.modified_field), 'count': Count('*')}
+
+    def list_etag(self, version):
+        """The validator for a ``list_version()`` aggregate; keeps its count for the paginator."""
+        self.conditional_count = version['count']
+        last = version['last'].timestamp() if version['last'] else 0
+        return f'"{version["count"]}-{last:.6f}-{self.request.accepted_renderer.format}"'
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = {self.lookup_field: kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).order_by()
+        last = queryset.filter(**lookup).values_list(self.modified_field, flat=True).first()
+        if last is None:  # let the usual lookup raise the 404
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = f'"{last.timestamp():.6f}-{request.accepted_renderer.format}"'
+        last_modified = int(last.timestamp())
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is None:
+            return self._conditional(super().retrieve(request, *args, **kwargs), etag, last_modified)
+        return self._conditional(not_modified, etag, last_modified)
+
+    def _conditional(self, response, etag, last_modified=None):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # Clients may keep the copy but must revalidate it before every use.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class CsvExportMixin:
+    """
+    Adds a streaming ``export`` action. Rows are read with a server-side
+    cursor over ``values_list()`` and written out chunk by chunk, so memory
+    stays flat however many rows match. ``?compress=gzip`` gzips the stream.
+    Under ASGI the chunks are produced through an async iterator; Django would
+    otherwise read a sync one into a list before sending anything.
+
+    ``export_columns`` is a list of ``(header, lookup)`` or
+    ``(header, lookup, formatter)`` tuples.
+    """
+    export_filename = 'export.csv'
+    export_columns = []
+    export_chunk_size = 2000
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        queryset = self.filter_queryset(self.get_export_queryset())
+        filename = self.export_filename
+        content = self.iter_csv(queryset)
+
+        if request.query_params.get('compress') == 'gzip':
+            content = _gzip_stream(content)
+            filename += '.gz'
+            content_type = 'application/gzip'
+        else:
+            content_type = 'text/csv'
+        if isinstance(request._request, ASGIRequest):
+            content = _async_stream(content)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    def get_export_queryset(self):
+        # The unplanned queryset: values_list() needs no joins beyond the
+        # lookups it names.
+        return self.queryset.all()
+
+    def iter_csv(self, queryset):
+        columns = [(c[0], c[1], c[2] if len(c) > 2 else None) for c in self.export_columns]
+        formatters = [(i, fmt) for i, (_, _, fmt) in enumerate(columns) if fmt]
+        rows = queryset.values_list(*[lookup for _, lookup, _ in columns]).iterator(
+            chunk_size=self.export_chunk_size
+        )
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([header for header, _, _ in columns])
+        pending = 0
+        for row in rows:
+            if formatters:
+                row = list(row)
+                for i, fmt in formatters:
+                    row[i] = fmt(row[i])
+            writer.writerow(row)
+            pending += 1
+            if pending == self.export_chunk_size:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        yield buffer.getvalue().encode()
+
+
+async def _async_stream(chunks):
+    """``chunks`` for an ASGI response, each ``next()`` (and its cursor read) run in the sync thread."""
+    chunks = iter(chunks)
+    done = object()
+    while (chunk := await sync_to_async(next)(chunks, done)) is not done:
+        yield chunk
+
+
+def _gzip_stream(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -1,10 +1,20 @@
 from django.db import models
 
 
+def build_search_document(*values):
+    return ' '.join(str(value) for value in values if value).lower()
+
+
 class Institute(models.Model):
     name = models.CharField(max_length=100)
     country = models.CharField(max_length=50)
     code = models.CharField(max_length=20)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['country'], name='institute_country_idx'),
+        ]
 
     def __str__(self):
         return self.code
@@ -32,9 +42,43 @@ class Member(models.Model):
 
     contract_end_date = models.DateField(null=True, blank=True)
 
+    # Also touched when an embedded shift, qualification or the institute
+    # changes, so it validates the whole serialized member (see signals).
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Lower-cased copy of the directory search fields (incl. the institute),
+    # kept in sync on save and trigram-indexed on PostgreSQL (migration 0008).
+    search_document = models.TextField(default='', editable=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the directory (ordering last_name, id)
+            models.Index(fields=['last_name', 'id'], name='member_keyset_idx'),
+            # Directory filters, each paired with the default ordering
+            models.Index(fields=['cern_status', 'last_name'], name='member_status_name_idx'),
+            models.Index(fields=['institute', 'last_name'], name='member_institute_name_idx'),
+            models.Index(fields=['last_name', 'id'], condition=models.Q(is_active=True),
+                         name='member_active_name_idx'),
+            models.Index(fields=['last_name', 'id'], condition=models.Q(is_mo_qualified=True),
+                         name='member_mo_name_idx'),
+            # Conditional GET validator: max(updated_at) + count as an index-only scan
+            models.Index(fields=['updated_at'], name='member_updated_idx'),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+    def build_search_document(self, institute=None):
+        institute = institute or self.institute
+        return build_search_document(self.first_name, self.last_name, self.cern_id, self.email,
+                                     institute.name, institute.code)
+
+    def save(self, *args, **kwargs):
+        self.search_document = self.build_search_document()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'search_document'}
+        super().save(*args, **kwargs)
+
 
 class Shift(models.Model):
     TYPE_CHOICES = [('MORNING', 'Morning'), ('EVENING', 'Evening'), ('NIGHT', 'Night')]
@@ -42,12 +86,24 @@ class Shift(models.Model):
     date = models.DateField()
     type = models.CharField(max_length=10, choices=TYPE_CHOICES)
     location = models.CharField(max_length=100)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id'], name='shift_keyset_idx'),
+            models.Index(fields=['updated_at'], name='shift_updated_idx'),
+        ]
+        constraints = [
+            # One shift per member per day; its index also serves per-member rosters
+            models.UniqueConstraint(fields=['member', 'date'], name='unique_shift_per_member_day'),
+        ]
 
 
 class Qualification(models.Model):
     member = models.ForeignKey(Member, related_name='qualifications', on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
     date_earned = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
 
 
 class Analysis(models.Model):
@@ -79,5 +135,30 @@ class Analysis(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     authors = models.ManyToManyField(Member, related_name='papers')
 
+    search_document = models.TextField(default='', editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-creation_date', 'id'], name='analysis_keyset_idx'),
+            models.Index(fields=['group', '-creation_date'], name='analysis_group_date_idx'),
+            models.Index(fields=['phase', '-creation_date'], name='analysis_phase_date_idx'),
+            models.Index(fields=['updated_at'], name='analysis_updated_idx'),
+        ]
+
     def __str__(self):
-        return self.ref_code
\ No newline at end of file
+        return self.ref_code
+
+    def build_search_document(self):
+        return build_search_document(self.title, self.ref_code, self.group, self.target_journal, self.status_text)
+
+    def save(self, *args, **kwargs):
+        self.search_document = self.build_search_document()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'search_document'}
+        super().save(*args, **kwargs)
+
+
+class Counter(models.Model):
+    """A version number bumped by row-locked UPDATEs; see counters.py."""
+    key = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField()
@@ -0,0 +1,200 @@
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage, Paginator as DjangoPaginator
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on the view's ``keyset_ordering`` (e.g.
+    ``['last_name', 'id']``). The cursor holds the last row's key values, so
+    every page is a ``WHERE (key) > (cursor) ... LIMIT n`` that walks the
+    matching composite index: O(page) at any depth, no OFFSET.
+
+    The total is opt-in through ``?count=exact`` or ``?count=estimate``
+    (planner estimate on PostgreSQL, exact elsewhere).
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = list(view.keyset_ordering)
+        self.page_size = self.get_page_size(request)
+        self.count = self.get_count(queryset, request.query_params.get(self.count_query_param))
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(queryset.model, request.query_params.get(self.cursor_query_param))
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = self.position_of(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data,
+        })
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_count(self, queryset, mode):
+        if mode == 'exact':
+            return queryset.count()
+        if mode == 'estimate':
+            return estimate_count(queryset)
+        return None
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def after(self, position):
+        """``(f1, f2, ...) > (v1, v2, ...)`` honouring each field's direction."""
+        clauses = []
+        for i, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {f.lstrip('-'): position[f.lstrip('-')] for f in self.ordering[:i]}
+            clauses.append(Q(**equal, **{f'{name}__{lookup}': position[name]}))
+        return reduce(or_, clauses)
+
+    def position_of(self, obj):
+        return {field.lstrip('-'): getattr(obj, field.lstrip('-')) for field in self.ordering}
+
+    def encode_cursor(self, position):
+        payload = json.dumps(position, default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, model, raw):
+        if not raw:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(raw.encode()))
+            return {
+                name: model._meta.get_field(name).to_python(position[name])
+                for name in (field.lstrip('-') for field in self.ordering)
+            }
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise NotFound("Invalid cursor.")
+
+
+def estimate_count(queryset):
+    """Planner row estimate on PostgreSQL (no scan); exact COUNT elsewhere."""
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def keyset_requested(request):
+    params = request.query_params
+    return params.get('pagination') == 'cursor' or bool(params.get(KeysetPagination.cursor_query_param))
+
+
+class KeysetOptInMixin:
+    """
+    Lets a page-number paginator switch to ``KeysetPagination`` when the
+    request asks for it with ``?pagination=cursor`` or carries a ``cursor``.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = KeysetPagination() if keyset_requested(request) else None
+        if self.keyset is not None:
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class StandardResultsSetPagination(KeysetOptInMixin, PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # ConditionalGetMixin has already counted the rows for its validator.
+        self.known_count = getattr(view, 'conditional_count', None)
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        paginator = DjangoPaginator(object_list, per_page)
+        if self.known_count is not None:
+            paginator.count = self.known_count
+        return paginator
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, fetching the page with the async ORM."""
+        if keyset_requested(request):
+            return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+        self.keyset = None
+        self.request = request
+        self.known_count = getattr(view, 'conditional_count', None)
+        if self.known_count is None:
+            self.known_count = await queryset.acount()
+
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        return list(self.page)
+
+
+class BitsetPagination(PageNumberPagination):
+    """Page numbers over a ``MemberIds`` sequence: the count is a popcount, only the page is decoded."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class OptionalKeysetPagination(KeysetPagination):
+    """Unpaginated unless the client opts into cursor pagination."""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not keyset_requested(request):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        if not keyset_requested(request):
+            return None
+        return await sync_to_async(super().paginate_queryset)(queryset, request, view)
@@ -0,0 +1,16 @@
+from django.contrib.auth.models import User
+from rest_framework.permissions import BasePermission
+
+
+class IsAdminUserFromDatabase(BasePermission):
+    """
+    ``IsAdminUser`` against the live account rather than the token: under
+    stateless authentication the claims are as old as the token, so a revoked
+    or demoted admin would otherwise keep access until it expires.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        return User.objects.filter(pk=user.pk, is_active=True, is_staff=True).exists()
@@ -0,0 +1,177 @@
+"""
+Opt-in per-request profiling, enabled with ``REQUEST_PROFILING=1``.
+
+Every request reports its SQL (query count, total time, slowest queries),
+view time and render time as a ``Server-Timing`` header and as one JSON
+line on the ``api.profiling`` logger. A sampled fraction of the requests on
+``REQUEST_PROFILING_PATHS`` also runs under cProfile, dumped to
+``REQUEST_PROFILING_DIR`` for ``python -m pstats`` or snakeviz.
+
+The phases are split where the view hands its response over to be rendered,
+so serialization counts as view time whichever path builds the data (model
+serializers or the values_list() rows). Works under WSGI and ASGI; for async
+views, cProfile only sees the event loop thread, not the thread running
+their ORM calls (those are in the ``db`` figure). Streaming responses (the
+CSV exports) are measured up to their first byte.
+"""
+import cProfile
+import heapq
+import json
+import logging
+import os
+import random
+import re
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current_profile = ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    """Timings of one request; also the ``execute_wrapper`` that times its SQL."""
+
+    def __init__(self, slow_query_limit):
+        self.queries = 0
+        self.sql = 0.0
+        self.view_started = self.view_finished = None
+        self.view_sql = 0.0  # self.sql when the view started, then the view's share of it
+        self.slowest = []  # min-heap of (seconds, sql)
+        self.slow_query_limit = slow_query_limit
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.sql += elapsed
+            if self.slow_query_limit:
+                heapq.heappush(self.slowest, (elapsed, sql))
+                if len(self.slowest) > self.slow_query_limit:
+                    heapq.heappop(self.slowest)
+
+
+class RequestProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.sample_rate = settings.REQUEST_PROFILING_SAMPLE_RATE
+        self.paths = tuple(settings.REQUEST_PROFILING_PATHS)
+        self.profile_dir = settings.REQUEST_PROFILING_DIR
+        self.slow_query_limit = settings.REQUEST_PROFILING_SLOW_QUERIES
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = RequestProfile(self.slow_query_limit)
+        token = _current_profile.set(profile)
+        profiler = self._start_profiler(request)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                _time_queries(stack, profile)
+                response = self.get_response(request)
+        finally:
+            if profiler:
+                profiler.disable()
+            _current_profile.reset(token)
+        return self._report(request, response, profile, profiler, started)
+
+    async def __acall__(self, request):
+        profile = RequestProfile(self.slow_query_limit)
+        token = _current_profile.set(profile)
+        profiler = self._start_profiler(request)
+        started = time.perf_counter()
+        stack = ExitStack()
+        try:
+            # Connections belong to the thread that runs the ORM calls, not to the event loop.
+            await sync_to_async(_time_queries)(stack, profile)
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            if profiler:
+                profiler.disable()
+            _current_profile.reset(token)
+        return self._report(request, response, profile, profiler, started)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.view_started, profile.view_sql = time.perf_counter(), profile.sql
+
+    def process_template_response(self, request, response):
+        # Called once the view has returned, just before DRF renders the body.
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.view_finished, profile.view_sql = time.perf_counter(), profile.sql - profile.view_sql
+        return response
+
+    def _report(self, request, response, profile, profiler, started):
+        finished = time.perf_counter()
+        view = render = 0.0
+        if profile.view_finished:
+            view = profile.view_finished - profile.view_started - profile.view_sql
+            render = finished - profile.view_finished
+        timings = {
+            'db': (profile.sql, f'{profile.queries} queries'),
+            'view': (view, None),
+            'render': (render, None),
+            'total': (finished - started, None),
+        }
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={seconds * 1000:.1f}' + (f';desc="{desc}"' if desc else '')
+            for name, (seconds, desc) in timings.items()
+        )
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': profile.queries,
+            **{f'{name}_ms': round(seconds * 1000, 2) for name, (seconds, _) in timings.items()},
+            'slow_queries': [{'ms': round(seconds * 1000, 2), 'sql': sql[:500]}
+                             for seconds, sql in sorted(profile.slowest, reverse=True)],
+        }
+        if profiler:
+            record['profile'] = self._dump(profiler, request)
+        logger.info(json.dumps(record))
+        return response
+
+    def _start_profiler(self, request):
+        if not self.sample_rate or (self.paths and not request.path.startswith(self.paths)):
+            return None
+        if random.random() >= self.sample_rate:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # another profiler is already active in this thread
+            return None
+        return profiler
+
+    def _dump(self, profiler, request):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+        path = os.path.join(self.profile_dir, f'{time.time():.6f}-{request.method}-{slug}.prof')
+        profiler.dump_stats(path)
+        return path
+
+
+def _time_queries(stack, profile):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(profile))
@@ -0,0 +1,69 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import RelatedField
+
+
+def plan_queryset(queryset, serializer):
+    """
+    Adds the select_related / prefetch_related calls needed to render
+    ``serializer`` for every row of ``queryset`` without per-row queries.
+    """
+    select, prefetch = [], {}
+    _collect(queryset.model, serializer, '', select, prefetch)
+    for lookup in queryset._prefetch_related_lookups:
+        # Prefetches declared on the viewset queryset win over planned ones.
+        prefetch.pop(getattr(lookup, 'prefetch_to', lookup), None)
+    if select:
+        queryset = queryset.select_related(*dict.fromkeys(select))
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch.values())
+    return queryset
+
+
+def _collect(model, serializer, prefix, select, prefetch):
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        if isinstance(field, RelatedField) and field.use_pk_only_optimization():
+            # PrimaryKeyRelatedField only reads the local ``<name>_id`` column.
+            continue
+
+        path, target, to_many = _walk(model, field.source_attrs, prefix, select)
+        if path is None:
+            continue
+
+        if isinstance(field, serializers.ListSerializer) and to_many:
+            child_qs = target._default_manager.all()
+            prefetch[path] = Prefetch(path, queryset=plan_queryset(child_qs, field.child))
+        elif to_many:
+            # A nested serializer's Prefetch for the same path takes precedence.
+            prefetch.setdefault(path, path)
+        elif isinstance(field, serializers.BaseSerializer):
+            _collect(target, field, path, select, prefetch)
+
+
+def _walk(model, attrs, prefix, select):
+    """
+    Follows ``attrs`` across model relations, recording every forward FK hop
+    in ``select``. Stops at the first to-many relation, which needs a prefetch.
+
+    Returns ``(lookup_path, related_model, to_many)``; ``lookup_path`` is None
+    when the source never touches a relation.
+    """
+    path = None
+    for attr in attrs:
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not model_field.is_relation:
+            break
+
+        path = f"{prefix}__{attr}" if prefix else attr
+        prefix = path
+        model = model_field.related_model
+        if model_field.many_to_many or model_field.one_to_many:
+            return path, model, True
+        select.append(path)
+    return path, model, False
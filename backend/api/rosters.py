@@ -0,0 +1,301 @@
+from array import array
+from datetime import date, timedelta
+from heapq import heapify, heappop, heappush, heapreplace
+
+from django.db import transaction
+from django.db.models import Count, Max, Min
+
+from .eligibility import BOOLEANS, invalidate_eligibility_index
+from .models import Member, Qualification, Shift
+from .signals import touch_members
+from .stats import invalidate_dashboard_stats
+
+SHIFT_CONFLICT = "Conflict: Member already has a shift on this date."
+ROSTER_CHANGED = "Roster changed concurrently, please retry."
+SHIFT_TYPES = {value for value, _ in Shift.TYPE_CHOICES}
+LOCATION_MAX_LENGTH = Shift._meta.get_field('location').max_length
+CALENDAR_MAX_DAYS = 366
+MAX_PER_SLOT = 20
+
+
+def plan_roster(items):
+    """
+    Validates a roster and finds its conflicts with set-based queries: one
+    for the referenced members, one for existing shifts on the same
+    (member, date) pairs. Returns ``(results, rows)``: ``results`` has the
+    rejection for each refused index (None for accepted ones) and ``rows``
+    the ``(index, Shift)`` pairs ready for ``bulk_create``.
+    """
+    results = [None] * len(items)
+    parsed = []
+    for index, item in enumerate(items):
+        try:
+            parsed.append((index, _parse_shift(item)))
+        except ValueError as exc:
+            results[index] = {"index": index, "status": "invalid", "detail": str(exc)}
+
+    member_ids = {row['member_id'] for _, row in parsed}
+    known_members = set(Member.objects.filter(id__in=member_ids).values_list('id', flat=True))
+    booked = set(
+        Shift.objects.filter(member_id__in=member_ids, date__in={row['date'] for _, row in parsed})
+        .values_list('member_id', 'date')
+    )
+
+    rows = []
+    for index, row in parsed:
+        key = (row['member_id'], row['date'])
+        if row['member_id'] not in known_members:
+            results[index] = {"index": index, "status": "invalid", "detail": "Unknown member."}
+        elif key in booked:
+            results[index] = {"index": index, "status": "conflict", "detail": SHIFT_CONFLICT}
+        else:
+            booked.add(key)  # also catches duplicates within the roster
+            rows.append((index, Shift(**row)))
+    return results, rows
+
+
+def _parse_shift(item):
+    if not isinstance(item, dict):
+        raise ValueError("Each shift must be an object.")
+    try:
+        member_id = int(item.get('member'))
+    except (TypeError, ValueError):
+        raise ValueError("'member' must be a member id.") from None
+    try:
+        shift_date = date.fromisoformat(str(item.get('date')))
+    except ValueError:
+        raise ValueError("'date' must be an ISO date (YYYY-MM-DD).") from None
+    if item.get('type') not in SHIFT_TYPES:
+        raise ValueError(f"'type' must be one of {', '.join(sorted(SHIFT_TYPES))}.")
+    location = item.get('location')
+    if not _is_location(location):
+        raise ValueError(f"'location' must be a non-empty string of at most {LOCATION_MAX_LENGTH} characters.")
+    return {'member_id': member_id, 'date': shift_date, 'type': item['type'], 'location': location}
+
+
+def _is_location(value):
+    return isinstance(value, str) and bool(value.strip()) and len(value) <= LOCATION_MAX_LENGTH
+
+
+def save_roster(shifts):
+    """Inserts ``shifts`` in one ``bulk_create``; raises IntegrityError if a slot was taken meanwhile."""
+    with transaction.atomic():
+        Shift.objects.bulk_create(shifts)
+        touch_members({shift.member_id for shift in shifts})
+        invalidate_eligibility_index()
+    invalidate_dashboard_stats()
+
+
+def parse_roster_options(data):
+    """Validates a roster generator request; returns ``generate_roster``'s keyword arguments."""
+    try:
+        start = date.fromisoformat(str(data.get('from')))
+        end = date.fromisoformat(str(data.get('to')))
+    except ValueError:
+        raise ValueError("'from' and 'to' must be ISO dates (YYYY-MM-DD).") from None
+    if end < start or (end - start).days >= CALENDAR_MAX_DAYS:
+        raise ValueError(f"'to' must be on or after 'from' and at most {CALENDAR_MAX_DAYS} days later.")
+    qualification = data.get('qualification')
+    if not isinstance(qualification, str) or not qualification.strip():
+        raise ValueError("'qualification' must name the qualification every shifter needs.")
+    locations = data.get('locations')
+    if not isinstance(locations, list) or not locations or not all(_is_location(value) for value in locations):
+        raise ValueError(f"'locations' must be a list of non-empty strings of at most "
+                         f"{LOCATION_MAX_LENGTH} characters.")
+    types = data.get('types') or [value for value, _ in Shift.TYPE_CHOICES]
+    if not isinstance(types, list) or not all(value in SHIFT_TYPES for value in types):
+        raise ValueError(f"'types' must be a list of {', '.join(sorted(SHIFT_TYPES))}.")
+    per_slot = data.get('per_slot', 1)
+    if isinstance(per_slot, bool) or not isinstance(per_slot, int) or not 1 <= per_slot <= MAX_PER_SLOT:
+        raise ValueError(f"'per_slot' must be a whole number from 1 to {MAX_PER_SLOT}.")
+    return {'start': start, 'end': end, 'qualification': qualification,
+            'locations': list(dict.fromkeys(locations)), 'types': list(dict.fromkeys(types)), 'per_slot': per_slot}
+
+
+def parse_dry_run(data):
+    """``dry_run`` as a JSON boolean or a form/query string from ``BOOLEANS``; absent means False."""
+    value = data.get('dry_run', False)
+    if not isinstance(value, bool):
+        value = BOOLEANS.get(str(value).lower())
+        if value is None:
+            raise ValueError("'dry_run' must be true or false.")
+    return value
+
+
+def generate_roster(start, end, qualification, locations, types, per_slot=1):
+    """
+    Fills every (date, type, location) slot from ``start`` to ``end`` with
+    ``per_slot`` active members holding ``qualification`` (earned by that
+    day, contract not yet ended). Shifts already booked count towards their
+    slot, keep their member off that day and add to the load being balanced.
+
+    Each seat goes to the institute with the lowest load per qualified member,
+    and within it to the least loaded free member (see ``CandidatePool``).
+    Reads three queries, writes nothing; returns ``(shifts, unfilled)``: the
+    unsaved ``Shift`` rows and the slots left short, with how many seats.
+    """
+    candidates = (
+        Member.objects.filter(is_active=True, qualifications__name=qualification)
+        .values_list('id', 'institute_id', 'contract_end_date')
+        .annotate(qualified_since=Min('qualifications__date_earned'))
+        .order_by('id')
+    )
+    pool = CandidatePool(candidates, start)
+    booked = Shift.objects.filter(
+        date__range=(start, end),
+        member_id__in=Qualification.objects.filter(name=qualification).values('member_id'),
+    ).values_list('member_id', 'date')
+    pool.add_booked(booked)
+    slots = Shift.objects.filter(date__range=(start, end), type__in=types, location__in=locations)
+    covered = {
+        (shift_date, shift_type, location): count
+        for shift_date, shift_type, location, count in
+        slots.values_list('date', 'type', 'location').annotate(count=Count('id')).order_by()
+    }
+
+    shifts, unfilled = [], []
+    for day in range((end - start).days + 1):
+        shift_date = start + timedelta(days=day)
+        pool.start_day(day)
+        for shift_type in types:
+            for location in locations:
+                missing = per_slot - covered.get((shift_date, shift_type, location), 0)
+                while missing > 0:
+                    member_id = pool.assign(day)
+                    if member_id is None:
+                        break
+                    shifts.append(Shift(member_id=member_id, date=shift_date, type=shift_type, location=location))
+                    missing -= 1
+                if missing > 0:
+                    unfilled.append({"date": shift_date, "type": shift_type, "location": location,
+                                     "missing": missing})
+    return shifts, unfilled
+
+
+class CandidatePool:
+    """
+    The qualified members as parallel arrays indexed by position, with a
+    min-heap of ``(load, member id, position)`` per institute and one of
+    ``(load / qualified members, institute id, institute)`` over the
+    institutes. An assignment pops the two heap tops instead of scanning
+    every candidate, so each seat costs O(log n).
+
+    Loads only change for the member and institute just popped, so no heap
+    entry goes stale. Members who cannot work the current day (booked,
+    not yet qualified) are held aside and pushed back by ``start_day``;
+    ended contracts are dropped for good, since days only move forward.
+    """
+
+    def __init__(self, candidates, start):
+        self.start = start
+        self.member_ids = array('q')
+        self.first_day = array('i')  # first day index the member is qualified
+        self.last_day = array('i')  # last day index before the contract ends
+        self.institute_of = array('i')
+        institutes = {}
+        for member_id, institute_id, contract_end, qualified_since in candidates:
+            self.member_ids.append(member_id)
+            self.first_day.append(max((qualified_since - start).days, 0))
+            self.last_day.append((contract_end - start).days if contract_end else CALENDAR_MAX_DAYS)
+            self.institute_of.append(institutes.setdefault(institute_id, len(institutes)))
+        size = len(self.member_ids)
+        self.positions = {member_id: position for position, member_id in enumerate(self.member_ids)}
+        self.loads = array('i', bytes(4 * size))
+        self.booked_on = array('i', [-1]) * size
+        self.institute_ids = array('q', institutes)
+        self.institute_sizes = array('i', bytes(4 * len(institutes)))
+        for institute in self.institute_of:
+            self.institute_sizes[institute] += 1
+        self.institute_loads = array('i', bytes(4 * len(institutes)))
+        self.booked_days = {}
+        self.members = None
+        self.institutes = None
+        self.held = []
+        self.exhausted = []
+
+    def add_booked(self, shifts):
+        """Counts existing ``(member_id, date)`` shifts; call before the first ``start_day``."""
+        for member_id, shift_date in shifts:
+            position = self.positions.get(member_id)
+            if position is None:
+                continue
+            self.booked_days.setdefault((shift_date - self.start).days, []).append(position)
+            self.loads[position] += 1
+            self.institute_loads[self.institute_of[position]] += 1
+
+    def start_day(self, day):
+        if self.members is None:
+            self.members = [[] for _ in self.institute_ids]
+            for position, institute in enumerate(self.institute_of):
+                self.members[institute].append((self.loads[position], self.member_ids[position], position))
+            for heap in self.members:
+                heapify(heap)
+            self.institutes = [self._institute_entry(institute) for institute in range(len(self.institute_ids))]
+            heapify(self.institutes)
+        for institute, entry in self.held:
+            heappush(self.members[institute], entry)
+        for entry in self.exhausted:
+            heappush(self.institutes, entry)
+        self.held, self.exhausted = [], []
+        for position in self.booked_days.pop(day, ()):
+            self.booked_on[position] = day
+
+    def assign(self, day):
+        """Books a member for ``day`` and returns their id, or None when nobody is left."""
+        while self.institutes:
+            institute = self.institutes[0][2]
+            position = self._take(institute, day)
+            if position is None:
+                self.exhausted.append(heappop(self.institutes))
+                continue
+            self.loads[position] += 1
+            self.booked_on[position] = day
+            self.held.append((institute, (self.loads[position], self.member_ids[position], position)))
+            self.institute_loads[institute] += 1
+            heapreplace(self.institutes, self._institute_entry(institute))
+            return self.member_ids[position]
+        return None
+
+    def _take(self, institute, day):
+        heap = self.members[institute]
+        while heap:
+            entry = heappop(heap)
+            position = entry[2]
+            if day > self.last_day[position]:
+                continue
+            if self.booked_on[position] == day or day < self.first_day[position]:
+                self.held.append((institute, entry))
+                continue
+            return position
+        return None
+
+    def _institute_entry(self, institute):
+        return (self.institute_loads[institute] / self.institute_sizes[institute],
+                self.institute_ids[institute], institute)
+
+
+def calendar_version(queryset):
+    """
+    Returns ``(max_id, count)`` of the shifts in ``queryset``; an aggregate
+    the (date, id) index answers without reading the shift rows.
+    """
+    summary = queryset.order_by().aggregate(max_id=Max('id'), count=Count('id'))
+    return summary['max_id'] or 0, summary['count']
+
+
+def build_calendar(queryset):
+    """
+    Buckets shifts as ``{date: {type: [{member_id, name, institute_code}]}}``
+    from a single joined ``values_list`` query.
+    """
+    rows = queryset.order_by('date', 'type', 'member__last_name', 'member_id').values_list(
+        'date', 'type', 'member_id', 'member__first_name', 'member__last_name', 'member__institute__code',
+    )
+    calendar = {}
+    for shift_date, shift_type, member_id, first_name, last_name, institute_code in rows:
+        calendar.setdefault(shift_date.isoformat(), {}).setdefault(shift_type, []).append({
+            "member_id": member_id,
+            "name": f"{first_name} {last_name}",
+            "institute_code": institute_code,
+        })
+    return calendar
@@ -0,0 +1,28 @@
+from django.db import connection
+from rest_framework import filters
+
+
+class DocumentSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` over the model's denormalised ``search_document`` column
+    instead of OR'd ``icontains`` lookups across joined fields. Every term
+    must match. On PostgreSQL the match is served by the pg_trgm GIN index
+    and results are ranked by trigram word similarity.
+    """
+    document_field = 'search_document'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = [term.lower() for term in self.get_search_terms(request)]
+        if not terms:
+            return queryset
+
+        for term in terms:
+            queryset = queryset.filter(**{f'{self.document_field}__contains': term})
+
+        if connection.vendor == 'postgresql':
+            from django.contrib.postgres.search import TrigramWordSimilarity
+
+            queryset = queryset.annotate(
+                search_rank=TrigramWordSimilarity(' '.join(terms), self.document_field)
+            ).order_by('-search_rank', *queryset.query.order_by)
+        return queryset
@@ -2,6 +2,20 @@ from rest_framework import serializers
 from .models import Institute, Member, Shift, Analysis, Qualification
 
 
+class SparseFieldsMixin:
+    """
+    Accepts a ``fields`` kwarg restricting the rendered fields, so list views
+    can skip expensive nested relations they do not display.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
 class InstituteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Institute
@@ -26,9 +40,12 @@ class ShiftSerializer(serializers.ModelSerializer):
     class Meta:
         model = Shift
         fields = ['id', 'date', 'type', 'location', 'member']
+        # The (member, date) constraint is enforced by the database; ShiftViewSet
+        # turns the IntegrityError into a conflict instead of pre-querying.
+        validators = []
 
 
-class MemberSerializer(serializers.ModelSerializer):
+class MemberSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     institute_name = serializers.CharField(source='institute.name', read_only=True)
     institute_country = serializers.CharField(source='institute.country', read_only=True)
 
@@ -43,8 +60,8 @@ class MemberSerializer(serializers.ModelSerializer):
                   'is_mo_qualified', 'shifts', 'qualifications']
 
 
-class AnalysisSerializer(serializers.ModelSerializer):
-    author_count = serializers.IntegerField(source='authors.count', read_only=True)
+class AnalysisSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    author_count = serializers.SerializerMethodField()
     phase_name = serializers.CharField(source='get_phase_display', read_only=True)
     group_name = serializers.CharField(source='get_group_display', read_only=True)
     authors = SimpleAuthorSerializer(many=True, read_only=True)
@@ -53,4 +70,10 @@ class AnalysisSerializer(serializers.ModelSerializer):
         model = Analysis
         fields = ['id', 'ref_code', 'title', 'group', 'group_name',
                   'phase', 'phase_name', 'status_text', 'target_journal',
-                  'creation_date', 'author_count', 'authors']
\ No newline at end of file
+                  'creation_date', 'author_count', 'authors']
+
+    def get_author_count(self, obj) -> int:
+        # AnalysisViewSet annotates the count; fall back for freshly saved rows.
+        if hasattr(obj, 'author_count'):
+            return obj.author_count
+        return obj.authors.count()
\ No newline at end of file
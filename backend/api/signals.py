@@ -0,0 +1,133 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .eligibility import eligibility_index
+from .models import Institute, Member, Shift, Analysis, Qualification
+from .stats import invalidate_dashboard_stats
+
+SEARCH_DOCUMENT_BATCH = 1000
+
+
+# Parents render their nested rows, so changing a row touches the parents'
+# updated_at and with it their conditional GET validators (ConditionalGetMixin).
+
+def touch_members(member_ids):
+    Member.objects.filter(pk__in=member_ids).update(updated_at=timezone.now())
+
+
+def touch_analyses_of(members):
+    # Analysis lists embed each author's name and institute.
+    Analysis.objects.filter(authors__in=members).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Institute)
+def refresh_member_search_documents(sender, instance, created, **kwargs):
+    # Members embed their institute's name and code in the search document.
+    if created:
+        return
+    # Streamed in batches, so a large institute is never held in memory at once.
+    now = timezone.now()
+    members = Member.objects.filter(institute=instance).only('first_name', 'last_name', 'cern_id', 'email')
+    batch = []
+    for member in members.iterator(chunk_size=SEARCH_DOCUMENT_BATCH):
+        member.search_document = member.build_search_document(instance)
+        member.updated_at = now
+        batch.append(member)
+        if len(batch) == SEARCH_DOCUMENT_BATCH:
+            Member.objects.bulk_update(batch, ['search_document', 'updated_at'])
+            batch = []
+    Member.objects.bulk_update(batch, ['search_document', 'updated_at'])
+    touch_analyses_of(Member.objects.filter(institute=instance))
+
+
+@receiver(post_save, sender=Member)
+def member_saved(sender, instance, created, **kwargs):
+    if not created:
+        touch_analyses_of([instance])
+
+
+@receiver(pre_delete, sender=Member)
+def member_deleted(sender, instance, **kwargs):
+    # Before the cascade removes the authorship rows.
+    touch_analyses_of([instance])
+
+
+@receiver([post_save, post_delete], sender=Shift)
+@receiver([post_save, post_delete], sender=Qualification)
+def nested_row_changed(sender, instance, **kwargs):
+    touch_members([instance.member_id])
+
+
+@receiver(m2m_changed, sender=Analysis.authors.through)
+def authors_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            Analysis.objects.filter(pk=instance.pk).update(updated_at=timezone.now())
+    elif action == 'pre_clear':
+        touch_analyses_of([instance])  # the cleared papers are unknown afterwards
+    elif action in ('post_add', 'post_remove') and pk_set:
+        Analysis.objects.filter(pk__in=pk_set).update(updated_at=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=Institute)
+@receiver([post_save, post_delete], sender=Member)
+@receiver([post_save, post_delete], sender=Shift)
+@receiver([post_save, post_delete], sender=Analysis)
+def dashboard_stats_changed(sender, **kwargs):
+    invalidate_dashboard_stats()
+
+
+# The eligibility bitmaps follow committed changes only (see api/eligibility.py).
+
+@receiver(post_save, sender=Member)
+def index_member(sender, instance, **kwargs):
+    transaction.on_commit(partial(eligibility_index.member_saved, instance.pk, instance.cern_status,
+                                  instance.institute_id, instance.is_active, instance.is_mo_qualified))
+
+
+@receiver(post_delete, sender=Member)
+def unindex_member(sender, instance, **kwargs):
+    transaction.on_commit(partial(eligibility_index.member_deleted, instance.pk))
+
+
+@receiver(post_save, sender=Institute)
+def index_institute(sender, instance, **kwargs):
+    transaction.on_commit(partial(eligibility_index.institute_saved, instance.pk, instance.country))
+
+
+@receiver(pre_save, sender=Qualification)
+def remember_qualification_holder(sender, instance, **kwargs):
+    # An edit may move the qualification from another member, whose bits change too.
+    instance._indexed_member_id = (
+        Qualification.objects.filter(pk=instance.pk).values_list('member_id', flat=True).first()
+        if instance.pk is not None else None
+    )
+
+
+@receiver(post_save, sender=Qualification)
+def index_qualification(sender, instance, **kwargs):
+    # Renames and new names are covered too: the member's names are read again.
+    for member_id in {instance.member_id, instance._indexed_member_id} - {None}:
+        transaction.on_commit(partial(eligibility_index.qualifications_changed, member_id))
+
+
+@receiver(post_delete, sender=Qualification)
+def unindex_qualification(sender, instance, **kwargs):
+    transaction.on_commit(partial(eligibility_index.qualifications_changed, instance.member_id))
+
+
+@receiver(post_save, sender=Shift)
+def index_shift(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(partial(eligibility_index.shift_booked, instance.member_id, instance.date, True))
+    else:
+        transaction.on_commit(eligibility_index.shifts_moved)
+
+
+@receiver(post_delete, sender=Shift)
+def unindex_shift(sender, instance, **kwargs):
+    transaction.on_commit(partial(eligibility_index.shift_booked, instance.member_id, instance.date, False))
@@ -0,0 +1,139 @@
+from collections import Counter
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .counters import aread_counter, bump_counter, read_counter
+from .metrics import record_cache_lookup
+from .models import Member, Shift, Analysis
+
+STATS_CACHE_KEY = 'dashboard_stats'
+STATS_GENERATION_KEY = 'dashboard_stats_generation'
+STATS_TIMEOUT = 60 * 60 * 24
+STATS_CACHE_KEYS = [STATS_CACHE_KEY, STATS_GENERATION_KEY]
+
+PHASE_LABELS = dict(Analysis.PHASE_CHOICES)
+
+
+def get_dashboard_stats():
+    """
+    Returns the dashboard payload from the cache, rebuilding it when the data
+    changed (generation bump) or the day rolled over (upcoming shifts).
+    """
+    today = date.today()
+    cached = cache.get_many(STATS_CACHE_KEYS)
+    generation = cached.get(STATS_GENERATION_KEY) or read_counter(STATS_GENERATION_KEY)
+    payload = _cached_payload(cached.get(STATS_CACHE_KEY), generation, today)
+    if payload is None:
+        payload = build_dashboard_stats(today)
+        cache.set(STATS_CACHE_KEY, {'generation': generation, 'date': today, 'payload': payload}, STATS_TIMEOUT)
+    return payload
+
+
+async def aget_dashboard_stats():
+    """``get_dashboard_stats`` for async views."""
+    today = date.today()
+    cached = await cache.aget_many(STATS_CACHE_KEYS)
+    generation = cached.get(STATS_GENERATION_KEY) or await aread_counter(STATS_GENERATION_KEY)
+    payload = _cached_payload(cached.get(STATS_CACHE_KEY), generation, today)
+    if payload is None:
+        payload = await sync_to_async(build_dashboard_stats)(today)
+        await cache.aset(STATS_CACHE_KEY, {'generation': generation, 'date': today, 'payload': payload},
+                         STATS_TIMEOUT)
+    return payload
+
+
+def _cached_payload(entry, generation, today):
+    """The cached payload, or None when it is stale."""
+    fresh = bool(entry) and entry['generation'] == generation and entry['date'] == today
+    record_cache_lookup(STATS_CACHE_KEY, fresh)
+    return entry['payload'] if fresh else None
+
+
+def current_generation():
+    """The data generation, bumped whenever a member, shift, paper or institute changes."""
+    return read_counter(STATS_GENERATION_KEY)
+
+
+async def acurrent_generation():
+    return await aread_counter(STATS_GENERATION_KEY)
+
+
+def invalidate_dashboard_stats():
+    _bump_generation()
+    # Bump again once the writing transaction commits, so a payload rebuilt
+    # from the pre-commit snapshot in the meantime is never served.
+    transaction.on_commit(_bump_generation)
+
+
+def _bump_generation():
+    bump_counter(STATS_GENERATION_KEY)
+
+
+def build_dashboard_stats(today):
+    """
+    Computes every dashboard metric and chart in three grouped queries, one
+    per table, folding the finer-grained groups together in Python.
+    """
+    members = Member.objects.order_by().values('institute__name', 'cern_status').annotate(
+        count=Count('id'),
+        mo_qualified=Count('id', filter=Q(is_mo_qualified=True)),
+    )
+    shifts = Shift.objects.order_by().values('location', 'member__institute__name').annotate(
+        count=Count('id'),
+        upcoming=Count('id', filter=Q(date__gte=today)),
+    )
+    papers = Analysis.objects.order_by().values('phase', 'status_text', 'target_journal').annotate(
+        count=Count('id'),
+    )
+
+    total_members = mo_qualified = 0
+    by_institute, by_contract = Counter(), Counter()
+    for row in members:
+        total_members += row['count']
+        mo_qualified += row['mo_qualified']
+        by_institute[row['institute__name']] += row['count']
+        by_contract[row['cern_status']] += row['count']
+
+    upcoming_shifts = 0
+    by_location, by_shift_institute = Counter(), Counter()
+    for row in shifts:
+        upcoming_shifts += row['upcoming']
+        by_location[row['location']] += row['count']
+        by_shift_institute[row['member__institute__name']] += row['count']
+
+    total_papers = 0
+    by_phase, by_status, by_journal = Counter(), Counter(), Counter()
+    for row in papers:
+        total_papers += row['count']
+        by_phase[row['phase']] += row['count']
+        by_status[row['status_text']] += row['count']
+        by_journal[row['target_journal']] += row['count']
+
+    return {
+        "metrics": {
+            "total_members": total_members,
+            "upcoming_shifts": upcoming_shifts,
+            "total_papers": total_papers,
+            "mo_qualified_count": mo_qualified,
+            "mo_percent": round((mo_qualified / total_members) * 100, 1) if total_members else 0
+        },
+        "charts": {
+            "top_institutes": _ranked(by_institute, 'institute__name', 10),
+            "shift_locations": _ranked(by_location, 'location'),
+            "top_shift_institutes": _ranked(by_shift_institute, 'member__institute__name', 8),
+            "journals": _ranked(by_journal, 'target_journal'),
+            "member_contracts": _ranked(by_contract, 'cern_status'),
+            "paper_phases": [
+                {'label': PHASE_LABELS.get(phase, 'Unknown'), 'count': by_phase[phase]} for phase in sorted(by_phase)
+            ],
+            "papers_status": _ranked(by_status, 'status_text', 5),
+        }
+    }
+
+
+def _ranked(counter, key, limit=None):
+    return [{key: value, 'count': count} for value, count in counter.most_common(limit)]
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+
+from asgiref.sync import sync_to_async
+
+from . import telemetry
+
+logger = logging.getLogger(__name__)
+
+STREAM_PATH = '/api/lhc-stream/'
+POLL_INTERVAL = 0.25
+# Longest wait between polls while the telemetry cache keeps failing.
+MAX_BACKOFF = 5
+KEEPALIVE_INTERVAL = 15
+QUEUE_SIZE = 256
+
+
+class Broadcaster:
+    """
+    Fans LHC status changes and telemetry samples out to every open stream in
+    this process. A single watcher task follows the shared telemetry cache,
+    so the cost is one cheap sequence read per tick however many clients are
+    connected, and writes made by any worker are picked up.
+    """
+
+    def __init__(self, poll_interval=POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.subscribers = set()
+        self._task = None
+
+    @asynccontextmanager
+    async def subscribe(self):
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        status = await sync_to_async(telemetry.get_beam_status)()
+        queue.put_nowait(('status', {'status': status}))
+        self.subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch())
+        try:
+            yield queue
+        finally:
+            self.subscribers.discard(queue)
+
+    def publish(self, event, data):
+        for queue in self.subscribers:
+            if queue.full():
+                # A stalled client loses its oldest events rather than
+                # holding memory for everyone.
+                queue.get_nowait()
+            queue.put_nowait((event, data))
+
+    async def _watch(self):
+        sequence = status = cursors = None
+        delay = self.poll_interval
+        while self.subscribers:
+            try:
+                if cursors is None:
+                    # Start from the current state: only what comes after it is pushed.
+                    sequence = await sync_to_async(telemetry.get_sequence)()
+                    status = await sync_to_async(telemetry.get_beam_status)()
+                    cursors = await sync_to_async(telemetry.newest_timestamps)()
+                else:
+                    sequence, status = await self._poll(sequence, status, cursors)
+            except Exception:
+                # Subscribers stay connected; the watcher retries with a growing pause.
+                logger.exception("LHC stream watcher failed, retrying")
+                delay = min(delay * 2, MAX_BACKOFF)
+            else:
+                delay = self.poll_interval
+            await asyncio.sleep(delay)
+
+    async def _poll(self, sequence, status, cursors):
+        current = await sync_to_async(telemetry.get_sequence)()
+        if current == sequence:
+            return sequence, status
+        new_status = await sync_to_async(telemetry.get_beam_status)()
+        if new_status != status:
+            status = new_status
+            self.publish('status', {'status': status})
+        for sample in await sync_to_async(telemetry.samples_after)(cursors):
+            sample['status'] = status
+            self.publish('sample', sample)
+            cursors[sample['sensorId']] = sample['timestamp']
+        return current, status
+
+
+broadcaster = Broadcaster()
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+async def lhc_event_stream(scope, receive, send):
+    """
+    Raw ASGI Server-Sent Events endpoint. It skips Django and DRF entirely:
+    the data is public (read-only) and a connection lasts for hours.
+    """
+    if scope['method'] != 'GET':
+        await send({'type': 'http.response.start', 'status': 405, 'headers': [(b'allow', b'GET')]})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ],
+    })
+
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    async with broadcaster.subscribe() as queue:
+        try:
+            while not disconnected.done():
+                next_event = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({next_event, disconnected}, timeout=KEEPALIVE_INTERVAL,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if next_event in done:
+                    body = format_event(*next_event.result())
+                else:
+                    next_event.cancel()
+                    if disconnected.done():
+                        break
+                    body = b': keep-alive\n\n'
+                await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+        finally:
+            disconnected.cancel()
+
+
+async def _wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
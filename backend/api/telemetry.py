@@ -0,0 +1,294 @@
+import math
+import struct
+import time
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .metrics import record_cache_lookup
+
+DEFAULT_BEAM_STATUS = 'STABLE BEAMS'
+DEFAULT_SENSOR = 'BCTDC-P5'
+BEAM_STATUS_KEY = 'beam_status'
+LAST_SAMPLE_KEY = 'last_lhc_data'
+SENSORS_KEY = 'telemetry_sensors'
+SEQUENCE_KEY = 'telemetry_sequence'
+SAMPLE_TIMEOUT = 30
+LOCK_TIMEOUT = 2
+
+
+def telemetry_cache():
+    """
+    The shared store behind the LHC endpoints. Configured through
+    ``CACHES['telemetry']`` so every worker reads the same state.
+    """
+    return caches['telemetry']
+
+
+def get_beam_status():
+    status = telemetry_cache().get(BEAM_STATUS_KEY)
+    record_cache_lookup(BEAM_STATUS_KEY, status is not None)
+    return DEFAULT_BEAM_STATUS if status is None else status
+
+
+async def aget_beam_status():
+    status = await telemetry_cache().aget(BEAM_STATUS_KEY)
+    record_cache_lookup(BEAM_STATUS_KEY, status is not None)
+    return DEFAULT_BEAM_STATUS if status is None else status
+
+
+def set_beam_status(status):
+    telemetry_cache().set(BEAM_STATUS_KEY, status, None)
+    _announce()
+
+
+def get_last_sample():
+    sample = telemetry_cache().get(LAST_SAMPLE_KEY)
+    record_cache_lookup(LAST_SAMPLE_KEY, sample is not None)
+    return sample
+
+
+async def aget_last_sample():
+    sample = await telemetry_cache().aget(LAST_SAMPLE_KEY)
+    record_cache_lookup(LAST_SAMPLE_KEY, sample is not None)
+    return sample
+
+
+def set_last_sample(sample):
+    telemetry_cache().set(LAST_SAMPLE_KEY, sample, SAMPLE_TIMEOUT)
+
+
+def get_sequence():
+    """
+    Counter bumped on every status change or new sample; stream watchers
+    compare it instead of re-reading the full state on each tick.
+    """
+    return telemetry_cache().get(SEQUENCE_KEY, 0)
+
+
+def _announce():
+    store = telemetry_cache()
+    try:
+        store.incr(SEQUENCE_KEY)
+    except ValueError:
+        store.set(SEQUENCE_KEY, 1, None)
+
+
+class SampleRing:
+    """
+    Fixed-capacity history of one sensor, kept as three parallel ``array('d')``
+    columns (timestamp, value, energy) so it packs into a few KB of bytes.
+    Timestamps are assigned on ingest and only grow, which keeps the logical
+    order sorted for ``since`` lookups.
+    """
+    _HEADER = struct.Struct('<II')
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.head = 0
+        self.count = 0
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.energies = array('d', bytes(8 * capacity))
+
+    def append(self, timestamp, value, energy):
+        self.timestamps[self.head] = timestamp
+        self.values[self.head] = value
+        self.energies[self.head] = energy
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def since(self, timestamp):
+        """Yields ``(timestamp, value, energy)`` newer than ``timestamp``, oldest first."""
+        start = (self.head - self.count) % self.capacity
+        first = bisect_right(range(self.count), timestamp,
+                             key=lambda i: self.timestamps[(start + i) % self.capacity])
+        for i in range(first, self.count):
+            slot = (start + i) % self.capacity
+            yield self.timestamps[slot], self.values[slot], self.energies[slot]
+
+    def to_bytes(self):
+        return (self._HEADER.pack(self.head, self.count)
+                + self.timestamps.tobytes() + self.values.tobytes() + self.energies.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data, capacity):
+        ring = cls(capacity)
+        head, count = cls._HEADER.unpack_from(data)
+        columns = data[cls._HEADER.size:]
+        stored = len(columns) // 24
+        if stored != capacity:
+            # Capacity setting changed since this ring was written: start over.
+            return ring
+        ring.head, ring.count = head, count
+        ring.timestamps = array('d', columns[:8 * stored])
+        ring.values = array('d', columns[8 * stored:16 * stored])
+        ring.energies = array('d', columns[16 * stored:])
+        return ring
+
+
+def _ring_key(sensor_id):
+    return f'telemetry_ring:{sensor_id}'
+
+
+def _capacity():
+    return settings.TELEMETRY_HISTORY_SIZE
+
+
+class TelemetryBusy(Exception):
+    """A sensor's ring stayed locked by another writer for ``LOCK_TIMEOUT`` seconds."""
+
+
+@contextmanager
+def _locked(keys):
+    """
+    Cross-worker lock on every key, built on the atomic ``add`` and taken in
+    sorted order. Appends are read-modify-write, so a writer that cannot get
+    the lock raises ``TelemetryBusy`` instead of writing without it.
+    """
+    store = telemetry_cache()
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    held = []
+    try:
+        for lock_key in sorted(f'{key}:lock' for key in keys):
+            while not store.add(lock_key, 1, LOCK_TIMEOUT):
+                if time.monotonic() >= deadline:
+                    raise TelemetryBusy("Telemetry history is busy; retry shortly.")
+                time.sleep(0.002)
+            held.append(lock_key)
+        yield
+    finally:
+        store.delete_many(held)
+
+
+def load_ring(sensor_id):
+    return _ring_from(telemetry_cache().get(_ring_key(sensor_id)))
+
+
+def _ring_from(data):
+    if data is None:
+        return SampleRing(_capacity())
+    return SampleRing.from_bytes(data, _capacity())
+
+
+def record_sample(sensor_id, value, energy, timestamp=None):
+    """Appends one reading to the sensor's ring; returns the stored timestamp."""
+    return record_samples([(sensor_id, value, energy, timestamp)])[0]
+
+
+def record_samples(readings):
+    """
+    Appends ``(sensor_id, value, energy, timestamp_or_None)`` readings, taking
+    each sensor's lock and rewriting its ring once per batch. Returns the
+    stored timestamps in input order; raises ``TelemetryBusy`` (nothing
+    stored) when a lock cannot be taken.
+    """
+    store = telemetry_cache()
+    by_sensor = {}
+    for index, reading in enumerate(readings):
+        by_sensor.setdefault(reading[0], []).append((index, reading))
+
+    stored = [None] * len(readings)
+    now = time.time()
+    keys = {sensor_id: _ring_key(sensor_id) for sensor_id in by_sensor}
+    # Every ring of the batch is locked first, so it is stored whole or not at all.
+    with _locked(keys.values()):
+        stored_rings = store.get_many(keys.values())
+        rings = {}
+        for sensor_id, batch in by_sensor.items():
+            ring = rings[keys[sensor_id]] = _ring_from(stored_rings.get(keys[sensor_id]))
+            for index, (_, value, energy, timestamp) in batch:
+                if timestamp is None:
+                    # Microsecond steps keep a batch in arrival order across sensors.
+                    timestamp = now + index * 1e-6
+                if ring.count:
+                    # Keep the ring strictly increasing even if clocks step back.
+                    timestamp = max(timestamp, ring.timestamps[(ring.head - 1) % ring.capacity] + 1e-6)
+                ring.append(timestamp, value, energy)
+                stored[index] = timestamp
+        store.set_many({key: ring.to_bytes() for key, ring in rings.items()}, None)
+
+    sensors = store.get(SENSORS_KEY) or []
+    if not by_sensor.keys() <= set(sensors):
+        store.set(SENSORS_KEY, sorted({*sensors, *by_sensor}), None)
+    if readings:
+        _announce()
+    return stored
+
+
+def parse_sample(item):
+    """
+    Lightweight schema check for one ingested reading. Returns
+    ``(sensor_id, value, energy, timestamp)`` or raises ``ValueError``.
+    """
+    if not isinstance(item, dict):
+        raise ValueError("sample must be a JSON object")
+    sensor_id = item.get('sensorId') or DEFAULT_SENSOR
+    if not isinstance(sensor_id, str) or len(sensor_id) > 64:
+        raise ValueError("'sensorId' must be a string of at most 64 characters")
+    return (sensor_id, _number(item, 'value', required=True), _number(item, 'energy', default=0.0),
+            _number(item, 'timestamp', default=None))
+
+
+def _number(item, name, required=False, default=None):
+    raw = item.get(name)
+    if raw is None:
+        if required:
+            raise ValueError(f"'{name}' is required")
+        return default
+    if isinstance(raw, bool):
+        raise ValueError(f"'{name}' must be a number")
+    try:
+        number = float(raw)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be a number") from None
+    if not math.isfinite(number):
+        raise ValueError(f"'{name}' must be finite")
+    return number
+
+
+def samples_since(timestamp, sensor_id=None):
+    """History newer than ``timestamp`` for one sensor, or all known sensors."""
+    sensors = [sensor_id] if sensor_id else telemetry_cache().get(SENSORS_KEY) or []
+    return _merge_since(timestamp, ((sensor, load_ring(sensor)) for sensor in sensors))
+
+
+async def asamples_since(timestamp, sensor_id=None):
+    """``samples_since`` for async views; every ring is read in one ``get_many``."""
+    store = telemetry_cache()
+    sensors = [sensor_id] if sensor_id else await store.aget(SENSORS_KEY) or []
+    stored = await store.aget_many([_ring_key(sensor) for sensor in sensors])
+    return _merge_since(timestamp, ((sensor, _ring_from(stored.get(_ring_key(sensor)))) for sensor in sensors))
+
+
+def newest_timestamps():
+    """The newest stored timestamp of each known sensor with history."""
+    rings = ((sensor, load_ring(sensor)) for sensor in telemetry_cache().get(SENSORS_KEY) or [])
+    return {sensor: ring.timestamps[(ring.head - 1) % ring.capacity] for sensor, ring in rings if ring.count}
+
+
+def samples_after(cursors):
+    """
+    History newer than each sensor's own timestamp in ``cursors`` (all of it
+    for sensors not in it), merged by timestamp. A sensor's stored timestamps
+    only grow, so a per-sensor cursor never skips a sample whatever the other
+    sensors' clocks say.
+    """
+    sensors = telemetry_cache().get(SENSORS_KEY) or []
+    return _merge_since(cursors, ((sensor, load_ring(sensor)) for sensor in sensors))
+
+
+def _merge_since(since, rings):
+    """``since`` is one timestamp for every ring, or a dict of them by sensor."""
+    samples = []
+    for sensor, ring in rings:
+        timestamp = since.get(sensor, -math.inf) if isinstance(since, dict) else since
+        samples.extend(
+            {'sensorId': sensor, 'timestamp': ts, 'value': value, 'energy': energy}
+            for ts, value, energy in ring.since(timestamp)
+        )
+    samples.sort(key=lambda sample: sample['timestamp'])
+    return samples
@@ -1,8 +1,44 @@
+import asyncio
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, AsyncRequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from prometheus_client import REGISTRY
 from django.contrib.auth.models import User  # <--- Added this
-from .models import Member, Institute, Analysis, Shift
+from . import async_views, streams, telemetry
+from .authentication import TokenCache, token_cache
+from .counters import bump_counter, read_counter
+from .eligibility import ELIGIBILITY_VERSION_KEY, MemberIds, eligibility_index
+from .models import Counter, Member, Institute, Analysis, Shift, Qualification
+from .serializers import AnalysisSerializer, MemberSerializer
+from .stats import STATS_GENERATION_KEY, current_generation
+from .values import ValuesSerializer
+
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'},
+    'telemetry': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-telemetry'},
+    'facets': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-facets'},
+}
 
 
 class DashboardIntegrationTests(APITestCase):
@@ -55,6 +91,34 @@ class DashboardIntegrationTests(APITestCase):
         pjas_data = next(item for item in charts['member_contracts'] if item['cern_status'] == "PJAS")
         self.assertEqual(pjas_data['count'], 2)
 
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_stats_are_cached_until_data_changes(self):
+        self.client.get('/api/stats/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/stats/')
+        self.assertEqual(response.data['metrics']['total_members'], 4)
+
+        Member.objects.create(first_name="Late", last_name="Joiner", cern_id="005", institute=self.cern,
+                              cern_status="STAFF", is_mo_qualified=True)
+        Shift.objects.create(member=Member.objects.get(cern_id="005"), date=date.today(), type="NIGHT",
+                             location="P5 Control Room")
+
+        # One grouped query per table
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/stats/')
+        self.assertEqual(response.data['metrics']['total_members'], 5)
+        self.assertEqual(response.data['metrics']['mo_qualified_count'], 4)
+        self.assertEqual(response.data['metrics']['upcoming_shifts'], 1)
+        self.assertEqual(response.data['charts']['top_institutes'][0], {'institute__name': "MIT", 'count': 3})
+        self.assertEqual(response.data['charts']['shift_locations'], [{'location': "P5 Control Room", 'count': 1}])
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_a_lost_generation_never_repeats_an_issued_etag(self):
+        etag = self.client.get('/api/stats/')['ETag']
+        cache.delete(STATS_GENERATION_KEY)  # evicted
+        self.assertNotEqual(self.client.get('/api/stats/')['ETag'], etag)
+        self.assertEqual(self.client.get('/api/stats/', HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
 
 class ShiftManagementTests(APITestCase):
     """
@@ -86,6 +150,64 @@ class ShiftManagementTests(APITestCase):
         self.assertEqual(Shift.objects.count(), 1)
         self.assertEqual(Shift.objects.first().location, "P5 Control Room (Cessy)")
 
+    def test_double_booking_is_rejected_by_the_database(self):
+        payload = {"member": self.member.id, "date": "2025-10-15", "type": "NIGHT", "location": "Remote"}
+        self.assertEqual(self.client.post(self.url, payload).status_code, status.HTTP_201_CREATED)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, {**payload, "type": "MORNING"})
+        # The unique constraint decides; there is no racy exists() pre-check.
+        self.assertFalse([q for q in ctx.captured_queries if q['sql'].startswith('SELECT') and '"api_shift"' in q['sql']])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], "Conflict: Member already has a shift on this date.")
+        self.assertEqual(Shift.objects.count(), 1)
+
+    def test_bulk_roster_reports_each_row(self):
+        other = Member.objects.create(first_name="Second", last_name="Worker", cern_id="998", institute=self.inst)
+        Shift.objects.create(member=self.member, date="2025-10-15", type="MORNING", location="Remote")
+        roster = [
+            {"member": self.member.id, "date": "2025-10-16", "type": "NIGHT", "location": "P5 Control Room"},
+            {"member": self.member.id, "date": "2025-10-15", "type": "NIGHT", "location": "P5 Control Room"},
+            {"member": other.id, "date": "2025-10-15", "type": "EVENING", "location": "Fermilab ROC"},
+            {"member": other.id, "date": "2025-10-15", "type": "NIGHT", "location": "Fermilab ROC"},
+            {"member": other.id, "date": "15/10/2025", "type": "NIGHT", "location": "Fermilab ROC"},
+            {"member": 424242, "date": "2025-10-17", "type": "NIGHT", "location": "Remote"},
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(f'{self.url}bulk/', roster, format='json')
+        self.assertEqual(sum(q['sql'].startswith('INSERT INTO "api_shift"') for q in ctx.captured_queries), 1)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([r['status'] for r in response.data['results']],
+                         ["created", "conflict", "created", "conflict", "invalid", "invalid"])
+        self.assertEqual(Shift.objects.count(), 3)
+
+    def test_calendar_buckets_by_date_and_type_with_etag(self):
+        shift = Shift.objects.create(member=self.member, date="2025-10-15", type="NIGHT", location="Remote")
+        Shift.objects.create(member=self.member, date="2025-11-15", type="NIGHT", location="Remote")
+        url = f'{self.url}calendar/?from=2025-10-01&to=2025-10-31'
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['days'], {"2025-10-15": {"NIGHT": [
+            {"member_id": self.member.id, "name": "Shift Worker", "institute_code": "FNAL"},
+        ]}})
+
+        etag = response['ETag']
+        with self.assertNumQueries(2):  # generation from the cache, max(id)/count aggregate
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        shift.type = "MORNING"
+        shift.save()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertIn("MORNING", changed.data['days']["2025-10-15"])
+
+        self.assertEqual(self.client.get(f'{self.url}calendar/?from=2025-10-31&to=2025-10-01').status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
     def test_delete_shift(self):
         """Test the 'X' button functionality"""
         shift = Shift.objects.create(member=self.member, date="2025-10-15", type="MORNING", location="Remote")
@@ -97,6 +219,90 @@ class ShiftManagementTests(APITestCase):
         self.assertEqual(Shift.objects.count(), 0)
 
 
+class RosterGeneratorTests(APITestCase):
+    """
+    Tests the qualification-aware roster generator.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='planner', password='pw', is_staff=True)
+        self.client.force_authenticate(user=self.user)
+        self.cern = Institute.objects.create(name="CERN", country="Switzerland", code="CERN")
+        self.fnal = Institute.objects.create(name="Fermilab", country="USA", code="FNAL")
+        self.shifters = [self.member(self.cern, n) for n in range(4)] + [self.member(self.fnal, n) for n in range(4, 6)]
+        for shifter in self.shifters:
+            Qualification.objects.create(member=shifter, name="DQM Shifter", date_earned=date(2020, 1, 1))
+        self.member(self.cern, 6)  # unqualified
+        for excluded in (self.member(self.cern, 7, is_active=False),
+                         self.member(self.cern, 8, contract_end_date=date(2025, 1, 1))):
+            Qualification.objects.create(member=excluded, name="DQM Shifter", date_earned=date(2020, 1, 1))
+        self.request = {"from": "2025-10-01", "to": "2025-10-03", "qualification": "DQM Shifter",
+                        "locations": ["P5 Control Room"], "types": ["MORNING", "NIGHT"]}
+
+    def member(self, institute, n, **fields):
+        return Member.objects.create(first_name="Shifter", last_name=str(n), cern_id=f"R{n}", institute=institute,
+                                     email=f"r{n}@cern.ch", **fields)
+
+    def test_fills_the_grid_balanced_by_institute_size(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/shifts/generate/', self.request, format='json')
+        self.assertEqual(sum(q['sql'].startswith('INSERT INTO "api_shift"') for q in ctx.captured_queries), 1)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['created'], response.data['unfilled']), (6, []))
+
+        shifts = Shift.objects.all()
+        self.assertEqual(len({(shift.member_id, shift.date) for shift in shifts}), 6)  # one shift per day
+        self.assertTrue({shift.member_id for shift in shifts} <= {shifter.id for shifter in self.shifters})
+        # Four CERN shifters to two from Fermilab: seats split 4:2, one each.
+        self.assertEqual(shifts.filter(member__institute=self.cern).count(), 4)
+        self.assertEqual(len({shift.member_id for shift in shifts}), 6)
+
+    def test_existing_shifts_fill_their_slot_and_block_their_member(self):
+        Shift.objects.create(member=self.shifters[0], date="2025-10-01", type="MORNING", location="P5 Control Room")
+        Shift.objects.create(member=self.shifters[1], date="2025-10-02", type="EVENING", location="Remote")
+        response = self.client.post('/api/shifts/generate/', {**self.request, "to": "2025-10-02"}, format='json')
+        self.assertEqual(response.data['created'], 3)
+        self.assertFalse(Shift.objects.filter(member=self.shifters[1], date="2025-10-02", type="NIGHT").exists())
+        self.assertEqual(Shift.objects.filter(date="2025-10-01", type="MORNING").count(), 1)
+
+    def test_unfilled_seats_are_reported_and_dry_run_books_nothing(self):
+        response = self.client.post('/api/shifts/generate/', {**self.request, "per_slot": 4, "dry_run": True},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['shifts']), 18)
+        self.assertEqual(response.data['unfilled'][:2], [
+            {"date": date(2025, 10, 1), "type": "NIGHT", "location": "P5 Control Room", "missing": 2},
+            {"date": date(2025, 10, 2), "type": "NIGHT", "location": "P5 Control Room", "missing": 2},
+        ])
+        self.assertFalse(Shift.objects.exists())
+
+        invalid = self.client.post('/api/shifts/generate/', {**self.request, "types": ["LUNCH"]}, format='json')
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_dry_run_parses_form_values(self):
+        response = self.client.post('/api/shifts/generate/', {**self.request, "dry_run": "false"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(response.data['dry_run'])
+        self.assertEqual(Shift.objects.count(), 6)
+
+        invalid = self.client.post('/api/shifts/generate/', {**self.request, "dry_run": "maybe"}, format='json')
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_generate_is_staff_only(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.post('/api/shifts/generate/', self.request, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Shift.objects.exists())
+
+    def test_generate_roster_command(self):
+        out = io.StringIO()
+        call_command('generate_roster', '--from', '2025-10-01', '--to', '2025-10-07', '--qualification',
+                     'DQM Shifter', '--location', 'P5 Control Room', '--type', 'NIGHT', stdout=out)
+        self.assertIn("7 shifts booked", out.getvalue())
+        self.assertEqual(Shift.objects.count(), 7)
+
+
 class AnalysisTrackerTests(APITestCase):
     """
     Tests the Scientific Paper tracking logic.
@@ -149,8 +355,993 @@ class MemberDirectoryTests(APITestCase):
         self.assertEqual(len(response.data['results']), 1)
         self.assertEqual(response.data['results'][0]['last_name'], "Doe")
 
+    def test_search_matches_every_term_across_joined_fields(self):
+        response = self.client.get('/api/members/?search=hans cern')
+        self.assertEqual([m['cern_id'] for m in response.data['results']], ["101"])
+
+        response = self.client.get('/api/members/?search=doe cern')
+        self.assertEqual(response.data['results'], [])
+
+    def test_search_follows_institute_rename(self):
+        for cern_id in ("103", "104"):
+            Member.objects.create(first_name="Kip", last_name="Thorne", cern_id=cern_id, institute=self.inst_us)
+        self.inst_us.name = "California Institute of Technology"
+        with mock.patch('api.signals.SEARCH_DOCUMENT_BATCH', 2):
+            self.inst_us.save()
+
+        response = self.client.get('/api/members/?search=california')
+        self.assertEqual(sorted(m['cern_id'] for m in response.data['results']), ["102", "103", "104"])
+
     def test_contract_filter(self):
         """Test filtering by the new contract types"""
         response = self.client.get('/api/members/?cern_status=STAFF')
         self.assertEqual(len(response.data['results']), 1)
-        self.assertEqual(response.data['results'][0]['first_name'], "Hans")
\ No newline at end of file
+        self.assertEqual(response.data['results'][0]['first_name'], "Hans")
+
+
+class FacetCountTests(APITestCase):
+    """
+    Tests ?facets= counts next to the directory and tracker results.
+    """
+
+    def setUp(self):
+        ch = Institute.objects.create(name="CERN", country="Switzerland", code="CERN")
+        us = Institute.objects.create(name="Caltech", country="USA", code="CALT")
+        for cern_id, institute, cern_status, active in [("1", ch, "STAFF", True), ("2", ch, "STAFF", False),
+                                                        ("3", us, "STAFF", True), ("4", us, "USER", True)]:
+            Member.objects.create(first_name="Facet", last_name=cern_id, cern_id=cern_id, institute=institute,
+                                  cern_status=cern_status, is_active=active)
+
+    def grouped_queries(self, captured):
+        return [q for q in captured.captured_queries if 'GROUP BY' in q['sql']]
+
+    def test_counts_every_facet_in_one_grouped_query_and_caches_them(self):
+        url = '/api/members/?is_active=true&facets=cern_status,institute__country'
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(len(self.grouped_queries(captured)), 1)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(response.data['facets'], {
+            'cern_status': [{'value': 'STAFF', 'count': 2}, {'value': 'USER', 'count': 1}],
+            'institute__country': [{'value': 'USA', 'count': 2}, {'value': 'Switzerland', 'count': 1}],
+        })
+
+        # Paging and parameter order do not change the key.
+        with CaptureQueriesContext(connection) as captured:
+            cached = self.client.get('/api/members/?facets=cern_status,institute__country&page_size=1&is_active=true')
+        self.assertEqual(self.grouped_queries(captured), [])
+        self.assertEqual(cached.data['facets'], response.data['facets'])
+
+        Member.objects.filter(cern_id="4").get().delete()
+        fresh = self.client.get(url)
+        self.assertEqual(fresh.data['facets']['cern_status'], [{'value': 'STAFF', 'count': 2}])
+
+    def test_facets_follow_search_and_reject_unknown_fields(self):
+        response = self.client.get('/api/members/?search=caltech&facets=all')
+        self.assertEqual(response.data['facets']['is_active'], [{'value': True, 'count': 2}])
+        self.assertEqual(self.client.get('/api/members/?facets=email').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn('facets', self.client.get('/api/members/').data)
+
+    @override_settings(CACHES={**LOCMEM_CACHES, 'facets': {**LOCMEM_CACHES['facets'], 'OPTIONS': {'MAX_ENTRIES': 3}}})
+    def test_searches_only_cull_other_facet_entries(self):
+        generation = current_generation()
+        for term in ("caltech", "cern", "facet", "zurich", "geneva", "pasadena"):
+            self.client.get(f'/api/members/?search={term}&facets=cern_status')
+        self.assertLessEqual(len(caches['facets']._cache), 3)
+        self.assertEqual(current_generation(), generation)
+
+    def test_analysis_facets(self):
+        Analysis.objects.create(title="A", ref_code="F1", group="CMS", phase=3, target_journal="JHEP")
+        Analysis.objects.create(title="B", ref_code="F2", group="CMS", phase=1)
+        response = self.client.get('/api/analyses/?facets=group,phase')
+        self.assertEqual(response.data['facets'], {
+            'group': [{'value': 'CMS', 'count': 2}],
+            'phase': [{'value': 1, 'count': 1}, {'value': 3, 'count': 1}],
+        })
+
+
+class EligibilityIndexTests(APITestCase):
+    """
+    Tests the bitmap index behind /api/members/eligible/.
+    """
+
+    def setUp(self):
+        eligibility_index.clear()
+        self.cern = Institute.objects.create(name="CERN", country="Switzerland", code="CERN")
+        self.epfl = Institute.objects.create(name="EPFL", country="Switzerland", code="EPFL")
+        self.fnal = Institute.objects.create(name="Fermilab", country="USA", code="FNAL")
+        self.cryo = self.member("1", self.cern, "STAFF", is_mo_qualified=True)
+        self.busy = self.member("2", self.epfl, "STAFF", is_mo_qualified=True)
+        self.member("3", self.cern, "STAFF", is_mo_qualified=True, is_active=False)
+        self.member("4", self.fnal, "STAFF", is_mo_qualified=True)
+        self.member("5", self.cern, "USER")
+        for member in Member.objects.all():
+            Qualification.objects.create(member=member, name="Cryogenics Expert", date_earned=date(2020, 1, 1))
+        Qualification.objects.create(member=self.cryo, name="DQM Shifter", date_earned=date(2020, 1, 1))
+        Shift.objects.create(member=self.busy, date="2025-10-01", type="NIGHT", location="P5")
+        self.query = ('/api/members/eligible/?is_active=true&is_mo_qualified=1&cern_status=STAFF'
+                      '&country=Switzerland&qualification=Cryogenics Expert')
+
+    def member(self, cern_id, institute, cern_status, **fields):
+        return Member.objects.create(first_name="Eligible", last_name=cern_id, cern_id=cern_id,
+                                     institute=institute, cern_status=cern_status, **fields)
+
+    def cern_ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [member['cern_id'] for member in response.data['results']]
+
+    def test_combines_criteria_with_bitwise_ops(self):
+        self.assertEqual(self.cern_ids(self.query), ["1", "2"])
+        self.assertEqual(self.cern_ids(self.query + '&free_on=2025-10-01'), ["1"])
+        self.assertEqual(self.cern_ids('/api/members/eligible/?cern_status=STAFF,USER&country__not=Switzerland'), ["4"])
+        self.assertEqual(self.cern_ids('/api/members/eligible/?qualification__all=Cryogenics Expert,DQM Shifter'),
+                         ["1"])
+        self.assertEqual(self.cern_ids('/api/members/eligible/?is_active=false'), ["3"])
+        self.assertEqual(self.cern_ids('/api/members/eligible/?cern_status=USER&cern_status=STAFF&country=USA'), ["4"])
+
+        response = self.client.get('/api/members/eligible/?free_on=1 October')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_member_ids_slice_across_chunks(self):
+        ids = [0, 7, 511, 512, 4000, 4097, 100000]
+        member_ids = MemberIds(sum(1 << n for n in ids))
+        self.assertEqual(len(member_ids), 7)
+        self.assertEqual(member_ids[2:5], ids[2:5])
+        self.assertEqual(member_ids[::-2], ids[::-2])
+        self.assertEqual((member_ids[-1], member_ids[3]), (100000, 512))
+        self.assertEqual(MemberIds(0)[:10], [])
+
+    def test_only_the_page_is_read_once_the_index_is_built(self):
+        self.client.get(self.query)
+        # Index version from the cache, then the page's member and its prefetched shifts and qualifications.
+        with self.assertNumQueries(4):
+            response = self.client.get(self.query + '&page_size=1&page=2')
+        self.assertEqual((response.data['count'], [m['cern_id'] for m in response.data['results']]), (2, ["2"]))
+
+    def test_committed_changes_update_the_index_in_place(self):
+        self.client.get(self.query)
+        built = eligibility_index.version
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cryo.cern_status = "FELLOW"
+            self.cryo.save()
+            Shift.objects.create(member=self.busy, date="2025-10-02", type="NIGHT", location="P5")
+            self.epfl.country = "France"
+            self.epfl.save()
+        self.assertEqual(self.cern_ids(self.query), [])
+        self.assertEqual(self.cern_ids('/api/members/eligible/?shift_on=2025-10-02'), ["2"])
+        # Applied bit by bit: the shared version moved along without a rebuild.
+        self.assertEqual(eligibility_index.version, read_counter(ELIGIBILITY_VERSION_KEY, atomic=True))
+        self.assertGreater(eligibility_index.version, built)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.busy.delete()
+        self.assertEqual(self.cern_ids('/api/members/eligible/?shift_on=2025-10-01,2025-10-02'), [])
+
+    def test_qualification_edits_patch_the_index(self):
+        self.assertEqual(self.cern_ids('/api/members/eligible/?qualification=DQM Shifter'), ["1"])
+        dqm = Qualification.objects.get(name="DQM Shifter")
+        with mock.patch.object(eligibility_index, '_rebuild') as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                dqm.member = self.busy  # moved to another member
+                dqm.save()
+            self.assertEqual(self.cern_ids('/api/members/eligible/?qualification=DQM Shifter'), ["2"])
+            with self.captureOnCommitCallbacks(execute=True):
+                dqm.name = "Run Coordinator"  # renamed
+                dqm.save()
+            self.assertEqual(self.cern_ids('/api/members/eligible/?qualification=DQM Shifter'), [])
+            self.assertEqual(self.cern_ids('/api/members/eligible/?qualification=Run Coordinator'), ["2"])
+        rebuild.assert_not_called()
+
+    def test_version_is_bumped_atomically_on_every_cache_backend(self):
+        # The database cache's incr is a get and a set, so the version is counted in a locked row.
+        self.client.get(self.query)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cryo.save()
+        self.assertEqual(Counter.objects.get(key=ELIGIBILITY_VERSION_KEY).value, eligibility_index.version)
+        self.assertIsNone(cache.get(ELIGIBILITY_VERSION_KEY))
+
+        with override_settings(CACHES=LOCMEM_CACHES):
+            version = bump_counter(ELIGIBILITY_VERSION_KEY, atomic=True)
+            self.assertEqual(cache.get(ELIGIBILITY_VERSION_KEY), version)
+
+
+class MemberQueryPlanTests(APITestCase):
+    """
+    Guards against N+1 regressions in the directory listing.
+    """
+
+    def setUp(self):
+        institutes = [
+            Institute.objects.create(name=f"Institute {i}", country="Switzerland", code=f"I{i}")
+            for i in range(3)
+        ]
+        for i in range(12):
+            member = Member.objects.create(first_name="Member", last_name=f"{i:03d}", cern_id=f"5{i:03d}",
+                                           institute=institutes[i % 3])
+            Shift.objects.create(member=member, date="2025-10-15", type="NIGHT", location="P5 Control Room")
+            Qualification.objects.create(member=member, name="DQM Shifter", date_earned="2024-01-01")
+
+    def test_member_list_query_count_is_independent_of_page_size(self):
+        # COUNT, members + institutes, shifts, qualifications
+        for page_size in (2, 12):
+            with self.assertNumQueries(4):
+                response = self.client.get(f'/api/members/?page_size={page_size}')
+            self.assertEqual(len(response.data['results']), page_size)
+            self.assertEqual(len(response.data['results'][0]['shifts']), 1)
+            self.assertEqual(response.data['results'][0]['qualifications'][0]['name'], "DQM Shifter")
+
+    def test_analysis_list_prefetches_authors(self):
+        members = list(Member.objects.all())
+        for i in range(4):
+            paper = Analysis.objects.create(title=f"Paper {i}", ref_code=f"P{i}", group="CMS")
+            paper.authors.set(members[i:i + 5])
+
+        # COUNT, analyses, authors + institutes
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/analyses/')
+        self.assertEqual(response.data['results'][0]['author_count'], 5)
+        self.assertTrue(response.data['results'][0]['authors'][0]['institute_name'].startswith("Institute"))
+
+    def test_analysis_sparse_fields_skip_author_list(self):
+        members = list(Member.objects.all())
+        paper = Analysis.objects.create(title="Paper", ref_code="P0", group="CMS")
+        paper.authors.set(members[:7])
+
+        # COUNT, annotated analyses; the author list is never loaded
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/analyses/?fields=id,ref_code,author_count')
+        self.assertEqual(response.data['results'][0], {'id': paper.id, 'ref_code': "P0", 'author_count': 7})
+
+
+class ValuesSerializationTests(APITestCase):
+    """
+    The values_list() lists must render exactly what the serializers render.
+    """
+
+    def setUp(self):
+        cern = Institute.objects.create(name="CERN", country="Switzerland", code="CERN")
+        orsay = Institute.objects.create(name="IJCLab Orsay", country="France", code="IJCL")
+        self.members = [
+            Member.objects.create(first_name="Zoë", last_name="Ålander", cern_id="1", institute=orsay,
+                                  email="zoe@example.com", cern_status="DOCTORAL STUDENT",
+                                  contract_end_date=date(2027, 3, 31)),
+            Member.objects.create(first_name="Line\u2028Break", last_name="Byrne", cern_id="2", institute=cern,
+                                  is_mo_qualified=True, is_active=False),
+            Member.objects.create(first_name="Ada", last_name="Curie", cern_id="3", institute=cern),
+        ]
+        for i, member in enumerate(self.members[:2]):
+            Shift.objects.create(member=member, date=date(2025, 10, 15 + i), type="NIGHT", location="P5")
+            Shift.objects.create(member=member, date=date(2025, 11, 1), type="MORNING", location="Point 5 — CCC")
+            Qualification.objects.create(member=member, name="DQM Shifter", date_earned=date(2024, 1, 1))
+        paper = Analysis.objects.create(title="Λ_b → J/ψ pK", ref_code="BPH-1", group="SND", phase=2,
+                                        target_journal="JHEP")
+        paper.authors.set(self.members)
+        Analysis.objects.create(title="No authors yet", ref_code="BPH-2", group="LHCb")
+
+    def test_fast_lists_render_the_same_bytes_as_the_serializers(self):
+        urls = [
+            '/api/members/',
+            '/api/members/?fields=id,institute_country,qualifications&page_size=2&page=2',
+            '/api/members/?is_active=true&facets=all',
+            '/api/analyses/',
+            '/api/analyses/?fields=ref_code,phase_name,author_count',
+            '/api/shifts/',
+            f'/api/shifts/?member={self.members[0].id}',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                with override_settings(FAST_LIST_SERIALIZATION=False):
+                    slow = self.client.get(url)
+                with mock.patch.object(ValuesSerializer, 'to_representation', autospec=True,
+                                       side_effect=ValuesSerializer.to_representation) as fast_path:
+                    fast = self.client.get(url)
+                fast_path.assert_called()
+                self.assertEqual(fast.status_code, status.HTTP_200_OK)
+                self.assertEqual(fast.content, slow.content)
+                # ...which is also what DRF's own JSONRenderer writes.
+                self.assertEqual(fast.content, JSONRenderer().render(slow.data))
+        self.assertIn(b'Line\\u2028Break', self.client.get('/api/members/').content)
+
+    def test_unknown_fields_fall_back_to_the_serializer(self):
+        # get_author_count is only mirrored when the count is annotated.
+        self.assertIsNone(ValuesSerializer.compile(AnalysisSerializer(), Analysis.objects.all()))
+        self.assertIsNotNone(ValuesSerializer.compile(MemberSerializer(), Member.objects.all()))
+
+    def test_indented_json_uses_the_stdlib_encoder(self):
+        response = self.client.get('/api/shifts/', HTTP_ACCEPT='application/json; indent=2')
+        self.assertEqual(response.content, JSONRenderer().render(response.data, 'application/json; indent=2'))
+        self.assertIn(b'\n  ', response.content)
+
+
+class CsvExportTests(APITestCase):
+    """
+    Tests the streaming CSV exports behind the 'Export' buttons.
+    """
+
+    def setUp(self):
+        self.cern = Institute.objects.create(name="CERN", country="Switzerland", code="CERN")
+        for i in range(5):
+            Member.objects.create(first_name="Ada", last_name=f"Export{i}", cern_id=f"70{i}", institute=self.cern,
+                                  cern_status="STAFF", is_mo_qualified=i % 2 == 0, email=f"ada{i}@cern.ch")
+        Analysis.objects.create(title="Higgs", ref_code="H1", group="CMS", phase=3, status_text="Accepted")
+
+    def test_member_export_streams_joined_rows(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/members/export/?cern_status=STAFF')
+            body = b''.join(response.streaming_content).decode()
+
+        lines = body.strip().splitlines()
+        self.assertEqual(lines[0], "CERN_ID,First Name,Last Name,Institute,Status,MO_Qualified,Email")
+        self.assertEqual(lines[1], "700,Ada,Export0,CERN,STAFF,Yes,ada0@cern.ch")
+        self.assertEqual(len(lines), 6)
+
+    def test_analysis_export_gzip(self):
+        response = self.client.get('/api/analyses/export/?compress=gzip')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('analysis_export.csv.gz', response['Content-Disposition'])
+
+        body = gzip.decompress(b''.join(response.streaming_content)).decode()
+        self.assertIn("H1,CMS,Higgs,Published,Accepted,", body)
+
+
+class ConditionalGetTests(APITestCase):
+    """
+    Tests the ETag / Last-Modified validators polled by the dashboards.
+    """
+
+    def setUp(self):
+        self.cern = Institute.objects.create(name="CERN", country="Switzerland", code="CERN")
+        self.member = Member.objects.create(first_name="Ada", last_name="Lovelace", cern_id="800",
+                                            institute=self.cern)
+        self.paper = Analysis.objects.create(title="Higgs", ref_code="H1", group="CMS")
+        self.paper.authors.add(self.member)
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_unchanged_list_is_not_modified_before_serializing(self):
+        first = self.client.get('/api/members/')
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first['Cache-Control'], 'private, no-cache')
+
+        with self.assertNumQueries(1):  # the max(updated_at)/count validator only
+            again = self.revalidate('/api/members/', first)
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(again['ETag'], first['ETag'])
+        self.assertEqual(again.content, b'')
+
+        # Another filter is another validator.
+        filtered = self.client.get('/api/members/?cern_status=STAFF', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(filtered.status_code, status.HTTP_200_OK)
+
+    def test_nested_changes_invalidate_their_parents(self):
+        members = self.client.get('/api/members/')
+        papers = self.client.get('/api/analyses/')
+
+        Shift.objects.create(member=self.member, date="2025-10-15", type="NIGHT", location="P5 Control Room")
+        changed = self.revalidate('/api/members/', members)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(changed.data['results'][0]['shifts']), 1)
+        self.assertEqual(self.revalidate('/api/analyses/', papers).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.cern.name = "CERN Geneva"
+        self.cern.save()
+        self.assertEqual(self.revalidate('/api/members/', changed).status_code, status.HTTP_200_OK)
+        papers_changed = self.revalidate('/api/analyses/', papers)
+        self.assertEqual(papers_changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(papers_changed.data['results'][0]['authors'][0]['institute_name'], "CERN Geneva")
+
+        self.member.papers.clear()
+        self.assertEqual(self.revalidate('/api/analyses/', papers_changed).status_code, status.HTTP_200_OK)
+
+    def test_deleting_a_row_changes_the_list_validator(self):
+        other = Member.objects.create(first_name="Bo", last_name="Zed", cern_id="801", institute=self.cern)
+        Member.objects.filter(pk=other.pk).update(updated_at=self.member.updated_at)
+        before = self.client.get('/api/members/')
+        other.delete()
+        self.assertEqual(self.revalidate('/api/members/', before).status_code, status.HTTP_200_OK)
+
+    def test_detail_honours_if_modified_since(self):
+        url = f'/api/members/{self.member.id}/'
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            again = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get('/api/members/999999/').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stats_not_modified_until_the_data_changes(self):
+        first = self.client.get('/api/stats/')
+        self.assertEqual(self.revalidate('/api/stats/', first).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Member.objects.create(first_name="Bo", last_name="Zed", cern_id="801", institute=self.cern)
+        changed = self.revalidate('/api/stats/', first)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(changed.data['metrics']['total_members'], 2)
+
+
+class MemberImportTests(APITestCase):
+    """
+    Tests the CSV import behind institute onboarding.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='importer', password='pw', is_staff=True)
+        self.fnal = Institute.objects.create(name="Fermilab", country="USA", code="US-FNAL")
+        Member.objects.create(first_name="Old", last_name="Name", cern_id="500", institute=self.fnal,
+                              email="old@cern.ch", contract_end_date=date(2030, 1, 1))
+
+    def upload(self, body):
+        self.client.force_authenticate(user=self.user)
+        upload = io.BytesIO(body.encode('utf-8-sig'))
+        upload.name = 'members.csv'
+        return self.client.post('/api/members/import/', {'file': upload}, format='multipart')
+
+    def test_import_upserts_valid_rows_and_reports_the_rest(self):
+        response = self.upload(
+            "CERN_ID,First Name,Last Name,Institute,Status,MO_Qualified,Email\n"
+            "500,New,Name,Fermilab,STAFF,Yes,new@cern.ch\n"
+            "501,Grace,Hopper,us-fnal,,No,grace@cern.ch\n"
+            "502,Bad,Email,US-FNAL,USER,No,not-an-email\n"
+            "503,No,Where,Atlantis,USER,No,x@cern.ch\n"
+            "501,Grace,Again,US-FNAL,USER,No,grace@cern.ch\n"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['rejected']), (1, 1, 3))
+        self.assertEqual([error['line'] for error in response.data['errors']], [4, 5, 6])
+
+        updated = Member.objects.get(cern_id="500")
+        self.assertEqual((updated.first_name, updated.cern_status, updated.is_mo_qualified), ("New", "STAFF", True))
+        self.assertEqual(updated.contract_end_date, date(2030, 1, 1))  # columns not in the file are kept
+        self.assertIn("grace hopper 501", Member.objects.get(cern_id="501").search_document)
+
+    def test_import_without_optional_columns_keeps_existing_values(self):
+        Member.objects.filter(cern_id="500").update(cern_status="STAFF", is_mo_qualified=True)
+        response = self.upload("CERN_ID,First Name,Last Name,Institute,Email\n"
+                               "500,New,Name,US-FNAL,new@cern.ch\n"
+                               "501,Grace,Hopper,US-FNAL,grace@cern.ch\n"
+                               f"502,Long,Email,US-FNAL,{'x' * 250}@cern.ch\n")
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['rejected']), (1, 1, 1))
+        self.assertIn("at most 254", response.data['errors'][0]['detail'])
+        self.assertEqual(Member.objects.values_list('cern_status', 'is_mo_qualified').get(cern_id="500"),
+                         ("STAFF", True))
+        self.assertEqual(Member.objects.values_list('cern_status', 'is_mo_qualified').get(cern_id="501"),
+                         ("USER", False))
+
+    def test_export_round_trips_through_import(self):
+        export = b''.join(self.client.get('/api/members/export/').streaming_content).decode()
+        response = self.upload(export)
+        self.assertEqual((response.data['created'], response.data['updated']), (0, 1))
+
+    def test_missing_columns_reject_the_file(self):
+        response = self.upload("CERN_ID,First Name\n1,Ada\n")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Last Name", response.data['detail'])
+
+    def test_import_is_staff_only(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.upload("CERN_ID,First Name,Last Name,Institute,Email\n600,Lise,Meitner,US-FNAL,lise@cern.ch\n")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Member.objects.filter(cern_id="600").exists())
+
+    def test_import_members_command(self):
+        out = io.StringIO()
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as csv_file:
+            csv_file.write("CERN_ID,First Name,Last Name,Institute,Email\n600,Lise,Meitner,US-FNAL,lise@cern.ch\n")
+            csv_file.flush()
+            call_command('import_members', csv_file.name, stdout=out)
+        self.assertIn("1 created", out.getvalue())
+        self.assertTrue(Member.objects.filter(cern_id="600", is_active=True).exists())
+
+
+class StatelessAuthenticationTests(APITestCase):
+    """
+    Tests that bearer tokens authenticate from their claims, without a user query.
+    """
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user(username='shift-manager', password='pw', is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def user_queries(self, captured):
+        return [query['sql'] for query in captured.captured_queries if 'auth_user' in query['sql']]
+
+    def test_authenticated_writes_skip_the_user_lookup(self):
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.post('/api/update-lhc-status/', {"status": "STABLE BEAMS"}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(self.user_queries(captured), [])
+        self.assertEqual(len(token_cache), 1)
+
+    def test_invalid_tokens_are_rejected_and_not_cached(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        response = self.client.post('/api/update-lhc-status/', {"status": "STABLE BEAMS"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(len(token_cache), 0)
+
+    def test_admin_actions_check_the_account_in_the_database(self):
+        upload = io.BytesIO(b"CERN_ID,First Name,Last Name,Institute,Email\n")
+        upload.name = 'members.csv'
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post('/api/members/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(self.user_queries(captured)), 1)
+
+        # The token still verifies, but the deactivated account no longer passes.
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        upload.seek(0)
+        response = self.client.post('/api/members/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_token_cache_evicts_least_recently_used_and_expired_entries(self):
+        cache = TokenCache(maxsize=2, ttl=60)
+        cache.set('a', 1, 60)
+        cache.set('b', 2, 60)
+        cache.get('a')
+        cache.set('c', 3, 60)
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+
+        cache.set('d', 4, 0)  # an expired token is never stored
+        self.assertIsNone(cache.get('d'))
+        with mock.patch('api.authentication.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 1)
+
+
+def _telemetry_worker(new_status, results):
+    """Runs in a forked process, standing in for one gunicorn worker."""
+    if new_status:
+        telemetry.set_beam_status(new_status)
+    results.put(telemetry.get_beam_status())
+
+
+class SharedTelemetryStateTests(SimpleTestCase):
+    """
+    Beam status written by one worker process must be what every other
+    worker serves.
+    """
+
+    def _run_workers(self, *statuses):
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        answers = []
+        for new_status in statuses:
+            worker = context.Process(target=_telemetry_worker, args=(new_status, results))
+            worker.start()
+            worker.join()
+            answers.append(results.get(timeout=5))
+        return answers
+
+    def test_status_is_consistent_across_processes(self):
+        with tempfile.TemporaryDirectory() as location:
+            shared = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+            with override_settings(CACHES={'default': shared, 'telemetry': shared}):
+                answers = self._run_workers('RAMP', None, None, 'NO BEAM', None)
+                self.assertEqual(answers, ['RAMP', 'RAMP', 'RAMP', 'NO BEAM', 'NO BEAM'])
+                self.assertEqual(telemetry.get_beam_status(), 'NO BEAM')
+
+    def test_per_process_cache_diverges(self):
+        """The failure mode the shared backend exists to prevent."""
+        with override_settings(CACHES=LOCMEM_CACHES):
+            telemetry.telemetry_cache().clear()
+            answers = self._run_workers('RAMP', None)
+        self.assertEqual(answers, ['RAMP', telemetry.DEFAULT_BEAM_STATUS])
+
+
+class TelemetryHistoryTests(APITestCase):
+    """
+    Tests the per-sensor ring buffer behind GET /api/lhc-telemetry/?since=.
+    """
+
+    def test_ring_wraps_and_keeps_order(self):
+        ring = telemetry.SampleRing(4)
+        for i in range(6):
+            ring.append(float(i), i * 10.0, 6800.0)
+
+        restored = telemetry.SampleRing.from_bytes(ring.to_bytes(), 4)
+        self.assertEqual([ts for ts, _, _ in restored.since(-1)], [2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(list(restored.since(3.0)), [(4.0, 40.0, 6800.0), (5.0, 50.0, 6800.0)])
+        self.assertEqual(list(restored.since(5.0)), [])
+
+    @override_settings(CACHES=LOCMEM_CACHES, TELEMETRY_HISTORY_SIZE=3)
+    def test_since_returns_only_new_samples(self):
+        self.client.force_authenticate(user=User.objects.create_user(username='sensor', password='pw'))
+        timestamps = []
+        for value in (1.1e11, 1.2e11, 1.3e11, 1.4e11):
+            response = self.client.post('/api/lhc-telemetry/', {"sensorId": "BCTDC-P5", "value": value,
+                                                                 "energy": 6800}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            timestamps.append(response.data['timestamp'])
+
+        response = self.client.get('/api/lhc-telemetry/?since=0')
+        self.assertEqual([s['value'] for s in response.data], [1.2e11, 1.3e11, 1.4e11])
+
+        response = self.client.get(f'/api/lhc-telemetry/?since={timestamps[2]}&sensor=BCTDC-P5')
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['timestamp'], timestamps[3])
+        self.assertEqual(response.data[0]['status'], telemetry.DEFAULT_BEAM_STATUS)
+
+        response = self.client.get('/api/lhc-telemetry/')
+        self.assertEqual(response.data[0]['value'], 1.4e11)
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_batch_ingest_reports_per_item_results(self):
+        self.client.force_authenticate(user=User.objects.create_user(username='sensor', password='pw'))
+        batch = [
+            {"sensorId": "BCTDC-P5", "value": 1.1e11, "energy": 450},
+            {"sensorId": "BCTDC-P5", "value": "not a number"},
+            {"sensorId": "BCTDC-P1", "value": 1.2e11},
+            {"energy": 6800},
+        ]
+        response = self.client.post('/api/lhc-telemetry/', batch, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['accepted'], 2)
+        self.assertEqual([e['index'] for e in response.data['errors']], [1, 3])
+
+        ndjson = '{"value": 1.3e11, "energy": 6800}\n{broken\n\n{"value": 1.4e11, "energy": 6800}\n'
+        response = self.client.post('/api/lhc-telemetry/', ndjson, content_type='application/x-ndjson')
+        self.assertEqual((response.data['accepted'], response.data['rejected']), (2, 1))
+
+        samples = self.client.get('/api/lhc-telemetry/?since=0').data
+        self.assertEqual([s['value'] for s in samples], [1.1e11, 1.2e11, 1.3e11, 1.4e11])
+        self.assertEqual(self.client.get('/api/lhc-telemetry/').data[0]['value'], 1.4e11)
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_a_held_lock_rejects_the_whole_batch(self):
+        self.client.force_authenticate(user=User.objects.create_user(username='sensor', password='pw'))
+        telemetry.telemetry_cache().add('telemetry_ring:BCTDC-P1:lock', 1, 60)  # another worker
+        self.addCleanup(telemetry.telemetry_cache().delete, 'telemetry_ring:BCTDC-P1:lock')
+        batch = [{"sensorId": "BCTDC-P5", "value": 1.1e11}, {"sensorId": "BCTDC-P1", "value": 1.2e11}]
+        with mock.patch.object(telemetry, 'LOCK_TIMEOUT', 0.05):
+            response = self.client.post('/api/lhc-telemetry/', batch, format='json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(self.client.get('/api/lhc-telemetry/?since=0').data, [])
+        self.assertIsNone(telemetry.telemetry_cache().get('telemetry_ring:BCTDC-P5:lock'))
+
+
+class LhcEventStreamTests(SimpleTestCase):
+    """
+    Tests the Server-Sent Events push stream served from config/asgi.py.
+    """
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_status_and_samples_fan_out_to_every_subscriber(self):
+        streams.broadcaster.poll_interval = 0.01
+        self.addCleanup(setattr, streams.broadcaster, 'poll_interval', streams.POLL_INTERVAL)
+        telemetry.set_beam_status('NO BEAM')
+
+        async def client(received, disconnect):
+            async def receive():
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.body' and message['body']:
+                    received.append(message['body'].decode())
+
+            await streams.lhc_event_stream({'type': 'http', 'method': 'GET', 'path': streams.STREAM_PATH},
+                                           receive, send)
+
+        async def scenario():
+            disconnect = asyncio.Event()
+            inboxes = [[] for _ in range(5)]
+            clients = [asyncio.create_task(client(inbox, disconnect)) for inbox in inboxes]
+            while not all(inboxes):
+                await asyncio.sleep(0.01)
+
+            await sync_to_async(telemetry.set_beam_status)('RAMP')
+            await sync_to_async(telemetry.record_sample)('BCTDC-P5', 1.1e11, 450.0)
+            while not all(len(inbox) == 3 for inbox in inboxes):
+                await asyncio.sleep(0.01)
+
+            disconnect.set()
+            await asyncio.wait_for(asyncio.gather(*clients), timeout=2)
+            return inboxes
+
+        inboxes = asyncio.run(scenario())
+        for inbox in inboxes:
+            self.assertEqual(inbox[0], 'event: status\ndata: {"status": "NO BEAM"}\n\n')
+            self.assertEqual(inbox[1], 'event: status\ndata: {"status": "RAMP"}\n\n')
+            self.assertTrue(inbox[2].startswith('event: sample\ndata: {"sensorId": "BCTDC-P5"'))
+        self.assertFalse(streams.broadcaster.subscribers)
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_every_sensor_is_followed_from_its_own_position(self):
+        telemetry.telemetry_cache().clear()
+        telemetry.record_sample('BCTDC-P5', 1.0, 450.0, timestamp=1000.0)
+        broadcaster = streams.Broadcaster(poll_interval=0.01)
+
+        async def scenario():
+            async with broadcaster.subscribe() as queue:
+                self.assertEqual(await queue.get(), ('status', {'status': telemetry.DEFAULT_BEAM_STATUS}))
+                await asyncio.sleep(0.05)
+                # Behind the first sensor's clock, and a new sensor far behind it.
+                await sync_to_async(telemetry.record_sample)('BCTDC-P5', 2.0, 450.0, 500.0)
+                await sync_to_async(telemetry.record_sample)('BCTDC-P8', 3.0, 450.0, 10.0)
+                return {(await asyncio.wait_for(queue.get(), 2))[1]['value'] for _ in range(2)}
+
+        self.assertEqual(asyncio.run(scenario()), {2.0, 3.0})
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_watcher_keeps_polling_after_an_error(self):
+        telemetry.telemetry_cache().clear()
+        broadcaster = streams.Broadcaster(poll_interval=0.01)
+        get_sequence = telemetry.get_sequence
+        failures = iter([ConnectionError("cache down")])
+
+        def flaky_sequence():
+            for error in failures:
+                raise error
+            return get_sequence()
+
+        async def scenario():
+            async with broadcaster.subscribe() as queue:
+                await queue.get()
+                with mock.patch.object(telemetry, 'get_sequence', flaky_sequence):
+                    await asyncio.sleep(0.05)
+                    await sync_to_async(telemetry.record_sample)('BCTDC-P5', 1.0, 450.0)
+                    event = await asyncio.wait_for(queue.get(), 2)
+                self.assertFalse(broadcaster._task.done())
+                return event
+
+        with self.assertLogs('api.streams', level='ERROR'):
+            event, sample = asyncio.run(scenario())
+        self.assertEqual((event, sample['value']), ('sample', 1.0))
+
+
+class AsyncViewTests(APITestCase):
+    """
+    Tests the coroutine views served under SERVER_MODE=asgi against their sync twins.
+    """
+
+    def setUp(self):
+        cern = Institute.objects.create(name="CERN", country="Switzerland", code="CERN")
+        members = [Member.objects.create(first_name="Ada", last_name=f"Async{i}", cern_id=f"95{i}", institute=cern)
+                   for i in range(5)]
+        self.member_id = members[0].id
+        Shift.objects.create(member=members[0], date="2025-10-15", type="NIGHT", location="P5 Control Room")
+        Qualification.objects.create(member=members[0], name="DQM Shifter", date_earned="2024-01-01")
+        Analysis.objects.create(title="Higgs", ref_code="H1", group="CMS").authors.set(members[:3])
+        self.factory = AsyncRequestFactory()
+
+    async def call(self, view_class, path, actions=None, method='get', headers=None, **kwargs):
+        view = view_class.as_view(actions) if actions else view_class.as_view()
+        return await view(getattr(self.factory, method)(path, headers=headers), **kwargs)
+
+    async def test_lists_match_the_sync_views(self):
+        cases = [
+            (async_views.AsyncMemberViewSet, '/api/members/?page_size=2&ordering=cern_id'),
+            (async_views.AsyncAnalysisViewSet, '/api/analyses/'),
+            (async_views.AsyncShiftViewSet, f'/api/shifts/?member={self.member_id}'),
+            (async_views.AsyncInstituteViewSet, '/api/institutes/'),
+        ]
+        for view_class, path in cases:
+            with self.subTest(path):
+                expected = await sync_to_async(self.client.get)(path)
+                response = await self.call(view_class, path, {'get': 'list'})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.data, expected.data)
+                self.assertEqual(response['ETag'], expected['ETag'])
+
+                again = await self.call(view_class, path, {'get': 'list'}, headers={'If-None-Match': response['ETag']})
+                self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_sync_handlers_still_run_behind_the_async_dispatch(self):
+        detail = await self.call(async_views.AsyncMemberViewSet, f'/api/members/{self.member_id}/',
+                                 {'get': 'retrieve'}, pk=self.member_id)
+        self.assertEqual(detail.data['shifts'][0]['location'], "P5 Control Room")
+
+        denied = await self.call(async_views.AsyncLhcTelemetryView, '/api/lhc-telemetry/', method='post')
+        self.assertEqual(denied.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_csv_export_streams_under_asgi(self):
+        with mock.patch.object(async_views.AsyncMemberViewSet, 'export_chunk_size', 2):
+            response = await self.call(async_views.AsyncMemberViewSet, '/api/members/export/', {'get': 'export'})
+            self.assertTrue(response.is_async)
+            chunks = [chunk async for chunk in response.streaming_content]
+        # Header and two rows per chunk, sent as each is written rather than collected first.
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(b''.join(chunks).decode().count("Async"), 5)
+
+        response = await self.call(async_views.AsyncMemberViewSet, '/api/members/export/?compress=gzip',
+                                   {'get': 'export'})
+        body = gzip.decompress(b''.join([chunk async for chunk in response.streaming_content]))
+        self.assertIn(b"950,Ada,Async0,CERN", body)
+
+    async def test_stats_and_telemetry(self):
+        stats = await self.call(async_views.AsyncDashboardStatsView, '/api/stats/')
+        self.assertEqual(stats.data['metrics']['total_members'], 5)
+        again = await self.call(async_views.AsyncDashboardStatsView, '/api/stats/',
+                                headers={'If-None-Match': stats['ETag']})
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        await sync_to_async(telemetry.set_beam_status)('RAMP')
+        await sync_to_async(telemetry.record_sample)('BCTDC-P5', 1.1e11, 450.0)
+        beam = await self.call(async_views.AsyncLhcStatusView, '/api/get-lhc-status/')
+        self.assertEqual(beam.data, {"status": "RAMP"})
+        history = await self.call(async_views.AsyncLhcTelemetryView, '/api/lhc-telemetry/?since=0')
+        self.assertEqual([(s['sensorId'], s['value'], s['status']) for s in history.data],
+                         [('BCTDC-P5', 1.1e11, 'RAMP')])
+        invalid = await self.call(async_views.AsyncLhcTelemetryView, '/api/lhc-telemetry/?since=soon')
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class KeysetPaginationTests(APITestCase):
+    """
+    Tests the opt-in cursor pagination used by infinite scroll.
+    """
+
+    def setUp(self):
+        inst = Institute.objects.create(name="CERN", country="Switzerland", code="CERN")
+        # Duplicate surnames force the id tie-breaker to do its job
+        for i, last_name in enumerate(["Adams", "Brown", "Brown", "Brown", "Clark", "Davis", "Evans"]):
+            member = Member.objects.create(first_name="Scroll", last_name=last_name, cern_id=f"80{i}",
+                                           institute=inst)
+            Shift.objects.create(member=member, date=f"2025-10-{10 + i % 3}", type="NIGHT", location="Remote")
+
+    def _walk(self, url):
+        seen, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(response.data['results'])
+            url = response.data['next']
+            pages += 1
+        return seen, pages
+
+    def test_members_walk_every_row_once_in_order(self):
+        with self.assertNumQueries(3):  # members + institutes, shifts, qualifications; no COUNT
+            first = self.client.get('/api/members/?pagination=cursor&page_size=3')
+        self.assertIsNone(first.data['count'])
+
+        rows, pages = self._walk('/api/members/?pagination=cursor&page_size=3')
+        expected = list(Member.objects.order_by('last_name', 'id').values_list('id', flat=True))
+        self.assertEqual([row['id'] for row in rows], expected)
+        self.assertEqual(pages, 3)
+
+    def test_descending_analysis_keyset_and_exact_count(self):
+        for i in range(5):
+            Analysis.objects.create(title=f"Paper {i}", ref_code=f"K{i}", group="CMS")
+        rows, _ = self._walk('/api/analyses/?pagination=cursor&page_size=2&count=exact')
+        expected = list(Analysis.objects.order_by('-creation_date', 'id').values_list('id', flat=True))
+        self.assertEqual([row['id'] for row in rows], expected)
+
+        # A planner estimate on PostgreSQL, so only its type is stable
+        response = self.client.get('/api/analyses/?pagination=cursor&page_size=2&count=estimate')
+        self.assertIsInstance(response.data['count'], int)
+
+    def test_shifts_stay_unpaginated_unless_requested(self):
+        self.assertEqual(len(self.client.get('/api/shifts/').data), 7)
+
+        rows, pages = self._walk('/api/shifts/?pagination=cursor&page_size=4')
+        self.assertEqual([row['date'] for row in rows], sorted(row['date'] for row in rows))
+        self.assertEqual((len(rows), pages), (7, 2))
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/members/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class QueryPlanCheckTests(APITestCase):
+    """
+    Runs the index coverage check used in CI against a tiny dataset.
+    """
+
+    def test_hot_endpoints_avoid_sequential_scans(self):
+        inst = Institute.objects.create(name="CERN", country="Switzerland", code="CERN")
+        member = Member.objects.create(first_name="Plan", last_name="Check", cern_id="900", institute=inst)
+        Shift.objects.create(member=member, date="2025-10-15", type="NIGHT", location="Remote")
+        Analysis.objects.create(title="Plan", ref_code="PC1", group="CMS").authors.add(member)
+
+        out = io.StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertNotIn("SEQ SCAN", out.getvalue())
+
+
+class SeedCommandTests(APITestCase):
+    def seed(self):
+        call_command('seed_glance', members=200, papers=10, shifts=300, seed=3, batch_size=64, stdout=io.StringIO())
+        return (list(Member.objects.order_by('id').values_list('first_name', 'last_name', 'institute__code')),
+                list(Shift.objects.order_by('id').values_list('member_id', 'date', 'type')),
+                list(Analysis.authors.through.objects.order_by('id').values_list('analysis_id', 'member_id')))
+
+    def test_seed_is_sized_and_reproducible(self):
+        members, shifts, authorships = self.seed()
+        self.assertEqual(len(members), 200)
+        self.assertEqual(len(shifts), 300)
+        self.assertEqual(Analysis.objects.count(), 10)
+        self.assertTrue(authorships)
+
+        self.assertEqual(self.seed(), (members, shifts, authorships))
+
+
+class RequestProfilingTests(APITestCase):
+    def setUp(self):
+        cern = Institute.objects.create(name="CERN", country="Switzerland", code="CERN")
+        Member.objects.create(first_name="Ada", last_name="Profiled", cern_id="800", institute=cern)
+
+    def test_disabled_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/members/'))
+
+    def test_server_timing_log_line_and_sampled_profile(self):
+        with tempfile.TemporaryDirectory() as profile_dir, override_settings(
+            REQUEST_PROFILING=True, REQUEST_PROFILING_SAMPLE_RATE=1.0,
+            REQUEST_PROFILING_PATHS=['/api/members/'], REQUEST_PROFILING_DIR=profile_dir,
+        ):
+            client = self.client_class()
+            with self.assertLogs('api.profiling', level='INFO') as logs, \
+                    CaptureQueriesContext(connection) as queries:
+                response = client.get('/api/members/')
+            self.assertRegex(response['Server-Timing'],
+                             r'^db;dur=[\d.]+;desc="\d+ queries", view;dur=[\d.]+, render;dur=[\d.]+, total;dur=')
+
+            record = json.loads(logs.records[0].getMessage())
+            self.assertEqual(record['queries'], len(queries.captured_queries))
+            self.assertEqual(len(record['slow_queries']), 3)
+            self.assertTrue(os.path.exists(record['profile']))
+
+            with self.assertLogs('api.profiling', level='INFO') as logs:
+                client.get('/api/stats/')  # outside REQUEST_PROFILING_PATHS: timed, not profiled
+            self.assertNotIn('profile', json.loads(logs.records[0].getMessage()))
+            self.assertEqual(len(os.listdir(profile_dir)), 1)
+
+    async def test_times_requests_under_asgi(self):
+        with override_settings(REQUEST_PROFILING=True):
+            client = AsyncClient()
+            with self.assertLogs('api.profiling', level='INFO') as logs:
+                response = await client.get('/api/members/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="[1-9]\d* queries", view;dur=')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertGreater(record['queries'], 0)
+        self.assertGreater(record['view_ms'] + record['render_ms'], 0)
+
+
+class MetricsTests(APITestCase):
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_requests_are_counted_by_route_name(self):
+        before = self.sample('glance_http_requests_total', route='dashboard-stats', method='GET', status='200')
+        self.client.get('/api/stats/')
+        self.client.get('/api/stats/')
+        self.assertEqual(self.sample('glance_http_requests_total', route='dashboard-stats', method='GET',
+                                     status='200') - before, 2)
+
+        response = self.client.get('/api/metrics')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b'glance_http_request_duration_seconds_bucket{le="0.005",method="GET",route="dashboard-stats"}',
+                      response.content)
+        self.assertIn(b'glance_cache_lookups_total{key="dashboard_stats",result="hit"}', response.content)
+
+    def test_telemetry_ingest_and_cache_hits(self):
+        accepted = self.sample('glance_telemetry_samples_total', result='accepted')
+        rejected = self.sample('glance_telemetry_samples_total', result='rejected')
+        user = User.objects.create_user(username='sensor', password='pw')
+        self.client.force_authenticate(user=user)
+        self.client.post('/api/lhc-telemetry/', [{"value": 1, "energy": 2}, {"energy": 2}], format='json')
+        self.assertEqual(self.sample('glance_telemetry_samples_total', result='accepted') - accepted, 1)
+        self.assertEqual(self.sample('glance_telemetry_samples_total', result='rejected') - rejected, 1)
+
+        hits = self.sample('glance_cache_lookups_total', key='last_lhc_data', result='hit')
+        self.client.get('/api/lhc-telemetry/')
+        self.assertEqual(self.sample('glance_cache_lookups_total', key='last_lhc_data', result='hit') - hits, 1)
+
+    def test_worker_processes_are_merged_at_scrape_time(self):
+        # Each process writes its own files; the endpoint sums them.
+        code = "from api import metrics; metrics.TELEMETRY_SAMPLES.labels(result='accepted').inc(3)"
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': metrics_dir}
+            for _ in range(2):
+                subprocess.run([sys.executable, '-c', code], env=env, cwd=settings.BASE_DIR, check=True)
+            self.assertEqual(len(os.listdir(metrics_dir)), 2)
+
+            with mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': metrics_dir}):
+                response = self.client.get('/api/metrics')
+        self.assertIn(b'glance_telemetry_samples_total{result="accepted"} 6.0', response.content)
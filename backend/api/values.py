@@ -0,0 +1,139 @@
+"""
+Read-only list serialization from ``values_list`` rows.
+
+``ValuesSerializer.compile`` turns a ModelSerializer (after ``?fields=``)
+into a column list plus one converter per field that mirrors what DRF
+outputs for it, in the same order. Each nested ``many=True`` serializer
+becomes one more ``values_list`` query, grouped by parent in Python, where
+the serializer path would prefetch model instances. No model instance or
+per-row serializer is created.
+
+``compile`` returns None for field kinds it does not know, and the view
+serializes model instances as before.
+"""
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import ForeignObjectRel
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+
+TEXT_FIELDS = {'CharField', 'TextField', 'EmailField', 'SlugField', 'URLField'}
+DISPLAY_SOURCE = re.compile(r'^get_(\w+)_display$')
+
+
+class ValuesSerializer:
+    """Produces ``serializer(rows, many=True).data`` for the ``values_list`` rows of ``rows()``."""
+
+    def __init__(self, columns, fields):
+        self.columns = columns
+        # (name, column index, converter or None) or (name, None, (model, relation, ValuesSerializer))
+        self.fields = fields
+
+    @classmethod
+    def compile(cls, serializer, queryset):
+        """The fast path for ``serializer`` over ``queryset``, or None when a field needs the serializer."""
+        model = queryset.model
+        annotations = set(queryset.query.annotations)
+        columns, fields = ['pk'], []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                relation = _relation(model, field.source)
+                child = relation and cls.compile(field.child, relation[0]._default_manager.all())
+                if child is None:
+                    return None
+                fields.append((name, None, (*relation, child)))
+                continue
+            column = _column(model, field, name, annotations)
+            if column is None:
+                return None
+            columns.append(column[0])
+            fields.append((name, len(columns) - 1, column[1]))
+        return cls(columns, fields)
+
+    def rows(self, queryset):
+        """``queryset`` as the rows ``to_representation`` takes; paginate this instead."""
+        return queryset.prefetch_related(None).values_list(*self.columns)
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        children = {
+            name: self._children(*nested, [row[0] for row in rows])
+            for name, index, nested in self.fields if index is None
+        }
+        data = []
+        for row in rows:
+            item = {}
+            for name, index, convert in self.fields:
+                if index is None:
+                    item[name] = children[name].get(row[0], [])
+                    continue
+                value = row[index]
+                item[name] = value if convert is None or value is None else convert(value)
+            data.append(item)
+        return data
+
+    def _children(self, model, relation, serializer, parents):
+        rows = list(model._default_manager.filter(**{f'{relation}__in': parents})
+                    .values_list(relation, *serializer.columns))
+        grouped = {}
+        for row, item in zip(rows, serializer.to_representation(row[1:] for row in rows)):
+            grouped.setdefault(row[0], []).append(item)
+        return grouped
+
+
+def _relation(model, source):
+    """``(related model, lookup back to model)`` for a to-many ``source``, else None."""
+    try:
+        field = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+    if isinstance(field, ForeignObjectRel) and (field.one_to_many or field.many_to_many):
+        return field.related_model, field.field.name
+    if field.many_to_many:
+        return field.related_model, field.related_query_name()
+    return None
+
+
+def _column(model, field, name, annotations):
+    """``(values_list path, converter or None)`` for a scalar serializer field, else None."""
+    if isinstance(field, serializers.SerializerMethodField):
+        # Only for methods that return the queryset annotation of the same name (author_count).
+        return (name, None) if name in annotations else None
+    if field.source == '*':
+        return None
+
+    *hops, attr = field.source_attrs
+    for hop in hops:
+        try:
+            related = model._meta.get_field(hop)
+        except FieldDoesNotExist:
+            return None
+        if not (related.many_to_one or related.one_to_one) or not related.concrete:
+            return None
+        model = related.related_model
+    path = '__'.join(field.source_attrs)
+
+    display = DISPLAY_SOURCE.match(attr)
+    if display and isinstance(field, serializers.CharField):
+        try:
+            choices = dict(model._meta.get_field(display[1]).flatchoices)
+        except FieldDoesNotExist:
+            return None
+        return '__'.join([*hops, display[1]]), lambda value: str(choices.get(value, value))
+    try:
+        model_field = model._meta.get_field(attr)
+    except FieldDoesNotExist:
+        return None
+    if not model_field.concrete:
+        return None
+    if model_field.is_relation:
+        return (path, None) if isinstance(field, PrimaryKeyRelatedField) else None
+    if isinstance(field, (serializers.BooleanField, serializers.IntegerField, serializers.ChoiceField)):
+        return path, None
+    if isinstance(field, serializers.CharField) and model_field.get_internal_type() in TEXT_FIELDS:
+        return path, None
+    # Dates and anything else: the field's own formatting, without the per-row attribute lookups.
+    return path, field.to_representation
@@ -1,43 +1,54 @@
-import csv
+import codecs
+from datetime import date, timedelta
+
 import requests
-from datetime import date
-from django.http import HttpResponse
-from django.core.cache import cache
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.views import APIView
-from django.db.models import Count
+from django.db import IntegrityError, transaction
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.cache import parse_etags
 from django_filters.rest_framework import DjangoFilterBackend
 
+from . import metrics, telemetry
+from .eligibility import MemberIds, eligibility_index, parse_eligibility_query
+from .imports import InvalidImportFile, import_members
+from .mixins import ConditionalGetMixin, CsvExportMixin, FacetMixin, QueryPlannedMixin, SparseFieldsMixin
 from .models import Institute, Member, Shift, Analysis, Qualification
+from .pagination import BitsetPagination, OptionalKeysetPagination, StandardResultsSetPagination
+from .parsers import InvalidLine, NDJSONParser
+from .permissions import IsAdminUserFromDatabase
+from .rosters import (
+    CALENDAR_MAX_DAYS, ROSTER_CHANGED, SHIFT_CONFLICT, build_calendar, calendar_version, generate_roster,
+    parse_dry_run, parse_roster_options, plan_roster, save_roster,
+)
+from .search import DocumentSearchFilter
 from .serializers import (
     InstituteSerializer, MemberSerializer, ShiftSerializer,
     AnalysisSerializer, QualificationSerializer
 )
+from .stats import PHASE_LABELS, current_generation, get_dashboard_stats
 
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 20
-    page_size_query_param = 'page_size'
-    max_page_size = 1000
-
-
-class InstituteViewSet(viewsets.ModelViewSet):
+class InstituteViewSet(ConditionalGetMixin, QueryPlannedMixin, viewsets.ModelViewSet):
     queryset = Institute.objects.all()
     serializer_class = InstituteSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
 
-class MemberViewSet(viewsets.ModelViewSet):
+class MemberViewSet(FacetMixin, ConditionalGetMixin, CsvExportMixin, SparseFieldsMixin, QueryPlannedMixin,
+                    viewsets.ModelViewSet):
     queryset = Member.objects.all().order_by('last_name')
     serializer_class = MemberSerializer
     pagination_class = StandardResultsSetPagination
+    values_serialization = True
+    keyset_ordering = ['last_name', 'id']
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['first_name', 'last_name', 'cern_id', 'email', 'institute__name', 'institute__code']
+    filter_backends = [DjangoFilterBackend, DocumentSearchFilter, filters.OrderingFilter]
     filterset_fields = {
         'is_active': ['exact'],
         'cern_status': ['exact'],
@@ -46,67 +57,210 @@ class MemberViewSet(viewsets.ModelViewSet):
         'institute__name': ['icontains'],
     }
     ordering_fields = ['last_name', 'cern_id', 'institute__name']
-
-    @action(detail=False, methods=['get'])
-    def export(self, request):
-        queryset = self.filter_queryset(self.get_queryset())
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="members_export.csv"'
-        writer = csv.writer(response)
-        writer.writerow(['CERN_ID', 'First Name', 'Last Name', 'Institute', 'Status', 'MO_Qualified', 'Email'])
-        for member in queryset:
-            writer.writerow([
-                member.cern_id, member.first_name, member.last_name,
-                member.institute.name, member.cern_status,
-                "Yes" if member.is_mo_qualified else "No", member.email
-            ])
-        return response
-
-
-class AnalysisViewSet(viewsets.ModelViewSet):
+    facet_fields = ['cern_status', 'institute__country', 'is_active', 'is_mo_qualified']
+    export_filename = 'members_export.csv'
+    export_columns = [
+        ('CERN_ID', 'cern_id'),
+        ('First Name', 'first_name'),
+        ('Last Name', 'last_name'),
+        ('Institute', 'institute__name'),
+        ('Status', 'cern_status'),
+        ('MO_Qualified', 'is_mo_qualified', lambda value: "Yes" if value else "No"),
+        ('Email', 'email'),
+    ]
+
+    @action(detail=False, methods=['post'], url_path='import', url_name='import',
+            parser_classes=[MultiPartParser], permission_classes=[IsAdminUserFromDatabase])
+    def import_csv(self, request):
+        """
+        Upserts members on CERN_ID from an uploaded CSV (``file``) with the
+        export's columns; ``Institute`` may hold an institute code or name.
+        Staff only, since one upload can rewrite the whole directory.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"detail": "Upload the CSV as 'file'."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = import_members(codecs.iterdecode(upload, 'utf-8-sig'))
+        except InvalidImportFile as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        imported = result["created"] + result["updated"]
+        return Response(result, status=status.HTTP_200_OK if imported or not result["rejected"]
+                        else status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['get'], pagination_class=BitsetPagination)
+    def eligible(self, request):
+        """
+        Members matching every criterion given, e.g. ``?is_active=true&
+        cern_status=STAFF&country=Switzerland&qualification=Cryogenics Expert
+        &free_on=2025-10-01``. ``a,b`` means any of, ``__all`` all of and
+        ``__not`` none of (``qualification__all=``, ``country__not=``). The
+        match is computed on the in-process bitmap index; only the page, in
+        id order, is read from the database.
+        """
+        try:
+            terms = parse_eligibility_query(request.query_params)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        page = self.paginate_queryset(MemberIds(eligibility_index.evaluate(terms)))
+        members = self.get_queryset().filter(id__in=page).order_by('id')
+        return self.get_paginated_response(self.get_serializer(members, many=True).data)
+
+
+class AnalysisViewSet(FacetMixin, ConditionalGetMixin, CsvExportMixin, SparseFieldsMixin, QueryPlannedMixin,
+                      viewsets.ModelViewSet):
     queryset = Analysis.objects.all().order_by('-creation_date')
     serializer_class = AnalysisSerializer
     pagination_class = StandardResultsSetPagination
+    values_serialization = True
+    keyset_ordering = ['-creation_date', 'id']
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'ref_code', 'group', 'target_journal', 'status_text']
+    filter_backends = [DjangoFilterBackend, DocumentSearchFilter, filters.OrderingFilter]
     filterset_fields = ['group', 'phase', 'status_text']
     ordering_fields = ['creation_date', 'phase', 'group']
-
-    @action(detail=False, methods=['get'])
-    def export(self, request):
-        queryset = self.filter_queryset(self.get_queryset())
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="analysis_export.csv"'
-        writer = csv.writer(response)
-        writer.writerow(['Ref Code', 'Group', 'Title', 'Phase', 'Status', 'Start Date'])
-        for paper in queryset:
-            writer.writerow([
-                paper.ref_code, paper.group, paper.title,
-                paper.get_phase_display(), paper.status_text, paper.creation_date
-            ])
-        return response
-
-
-class ShiftViewSet(viewsets.ModelViewSet):
+    facet_fields = ['group', 'phase', 'target_journal']
+    export_filename = 'analysis_export.csv'
+    export_columns = [
+        ('Ref Code', 'ref_code'),
+        ('Group', 'group'),
+        ('Title', 'title'),
+        ('Phase', 'phase', lambda value: PHASE_LABELS.get(value, value)),
+        ('Status', 'status_text'),
+        ('Start Date', 'creation_date'),
+    ]
+
+    def prepare_queryset(self, queryset, serializer):
+        fields = serializer.fields
+        if 'author_count' in fields:
+            # A correlated COUNT on the through table's index rather than a
+            # JOIN + GROUP BY, which pagination's COUNT(*) would have to repeat.
+            authors = Analysis.authors.through.objects.filter(analysis=OuterRef('pk')).order_by()
+            queryset = queryset.annotate(author_count=Coalesce(
+                Subquery(authors.values('analysis').annotate(count=Count('*')).values('count')), 0
+            ))
+        if 'authors' in fields:
+            queryset = queryset.prefetch_related(Prefetch(
+                'authors',
+                queryset=Member.objects.select_related('institute').only(
+                    'id', 'first_name', 'last_name', 'cern_id', 'institute__name'
+                )
+            ))
+        return queryset
+
+
+class ShiftViewSet(ConditionalGetMixin, QueryPlannedMixin, viewsets.ModelViewSet):
     queryset = Shift.objects.all()
     serializer_class = ShiftSerializer
+    pagination_class = OptionalKeysetPagination
+    values_serialization = True
+    keyset_ordering = ['date', 'id']
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['member', 'type', 'date']
 
     def create(self, request, *args, **kwargs):
-        member_id = request.data.get('member')
-        date = request.data.get('date')
-        if Shift.objects.filter(member_id=member_id, date=date).exists():
-            return Response(
-                {"detail": "Conflict: Member already has a shift on this date."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        return super().create(request, *args, **kwargs)
-
+        try:
+            with transaction.atomic():
+                return super().create(request, *args, **kwargs)
+        except IntegrityError:
+            return Response({"detail": SHIFT_CONFLICT}, status=status.HTTP_400_BAD_REQUEST)
+
+    def update(self, request, *args, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().update(request, *args, **kwargs)
+        except IntegrityError:
+            return Response({"detail": SHIFT_CONFLICT}, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Books a whole roster: a list of ``{member, date, type, location}``.
+        Valid, conflict-free rows are inserted together; every row gets a
+        result (``created``, ``conflict`` or ``invalid``) at its index.
+        """
+        if not isinstance(request.data, list):
+            return Response({"detail": "Expected a list of shifts."}, status=status.HTTP_400_BAD_REQUEST)
+
+        results, rows = plan_roster(request.data)
+        try:
+            save_roster([shift for _, shift in rows])
+        except IntegrityError:
+            # Someone booked one of these slots since the conflict query ran.
+            return Response({"detail": ROSTER_CHANGED}, status=status.HTTP_409_CONFLICT)
+
+        for index, shift in rows:
+            results[index] = {"index": index, "status": "created", "id": shift.id}
+        created = len(rows)
+        if created:
+            response_status = status.HTTP_201_CREATED
+        elif any(r["status"] == "conflict" for r in results):
+            response_status = status.HTTP_409_CONFLICT
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({"created": created, "rejected": len(results) - created, "results": results},
+                        status=response_status)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUserFromDatabase])
+    def generate(self, request):
+        """
+        Fills ``from``..``to`` x ``types`` (default: all) x ``locations`` with
+        ``per_slot`` (default 1) active members holding ``qualification``,
+        around the shifts already booked and balanced across institutes.
+        ``dry_run`` returns the roster without booking it. Staff only.
+        """
+        try:
+            options = parse_roster_options(request.data)
+            dry_run = parse_dry_run(request.data)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        shifts, unfilled = generate_roster(**options)
+        if not dry_run:
+            try:
+                save_roster(shifts)
+            except IntegrityError:
+                return Response({"detail": ROSTER_CHANGED}, status=status.HTTP_409_CONFLICT)
+        payload = {"created": 0 if dry_run else len(shifts), "dry_run": dry_run, "unfilled": unfilled,
+                   "shifts": ShiftSerializer(shifts, many=True).data}
+        return Response(payload, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
 
-class QualificationViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """
+        Shifts between ``from`` and ``to`` (inclusive, ISO dates; defaults to
+        the next 31 days), optionally at one ``location``, bucketed by date
+        and type. Repeat views send ``If-None-Match`` and get a 304 until a
+        shift in the range, or a member or institute it shows, changes.
+        """
+        try:
+            start = date.fromisoformat(request.query_params.get('from') or date.today().isoformat())
+            end = date.fromisoformat(request.query_params.get('to') or (start + timedelta(days=30)).isoformat())
+        except ValueError:
+            return Response({"detail": "'from' and 'to' must be ISO dates (YYYY-MM-DD)."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if end < start or (end - start).days >= CALENDAR_MAX_DAYS:
+            return Response({"detail": f"'to' must be on or after 'from' and at most {CALENDAR_MAX_DAYS} days later."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        shifts = Shift.objects.filter(date__range=(start, end))
+        location = request.query_params.get('location')
+        if location:
+            shifts = shifts.filter(location=location)
+
+        max_id, count = calendar_version(shifts)
+        # The generation catches in-place edits and renames, which keep id and count.
+        etag = f'"{current_generation()}-{max_id}-{count}"'
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        payload = {"from": start, "to": end, "location": location or None, "days": build_calendar(shifts)}
+        return Response(payload, headers={'ETag': etag})
+
+
+class QualificationViewSet(ConditionalGetMixin, QueryPlannedMixin, viewsets.ModelViewSet):
     queryset = Qualification.objects.all()
     serializer_class = QualificationSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -116,40 +270,14 @@ class DashboardStatsView(APIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get(self, request):
-        total_members = Member.objects.count()
-        total_papers = Analysis.objects.count()
-        upcoming_shifts = Shift.objects.filter(date__gte=date.today()).count()
-        mo_qualified = Member.objects.filter(is_mo_qualified=True).count()
-        top_institutes_data = Member.objects.values('institute__name').annotate(count=Count('id')).order_by('-count')[
-            :10]
-        shift_location_data = Shift.objects.values('location').annotate(count=Count('id')).order_by('-count')
-        shift_institute_data = Shift.objects.values('member__institute__name').annotate(count=Count('id')).order_by(
-            '-count')[:8]
-        journal_data = Analysis.objects.values('target_journal').annotate(count=Count('id')).order_by('-count')
-        member_contract_data = Member.objects.values('cern_status').annotate(count=Count('id')).order_by('-count')
-        phase_raw = Analysis.objects.values('phase').annotate(count=Count('id')).order_by('phase')
-        phase_map = {0: 'Phase 0 (Idea)', 1: 'Phase 1 (Analysis)', 2: 'Phase 2 (Review)', 3: 'Published'}
-        phase_data = [{'label': phase_map.get(x['phase'], 'Unknown'), 'count': x['count']} for x in phase_raw]
-        paper_status_data = Analysis.objects.values('status_text').annotate(count=Count('id')).order_by('-count')[:5]
-
-        return Response({
-            "metrics": {
-                "total_members": total_members,
-                "upcoming_shifts": upcoming_shifts,
-                "total_papers": total_papers,
-                "mo_qualified_count": mo_qualified,
-                "mo_percent": round((mo_qualified / total_members) * 100, 1) if total_members else 0
-            },
-            "charts": {
-                "top_institutes": top_institutes_data,
-                "shift_locations": shift_location_data,
-                "top_shift_institutes": shift_institute_data,
-                "journals": journal_data,
-                "member_contracts": member_contract_data,
-                "paper_phases": phase_data,
-                "papers_status": paper_status_data
-            }
-        })
+        etag = self.get_etag(current_generation())
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(get_dashboard_stats(), headers={'ETag': etag})
+
+    def get_etag(self, generation):
+        # Same inputs as the cached payload: the data generation and the day.
+        return f'"{generation}-{date.today()}"'
 
 
 # --- LHC TELEMETRY & POST-MORTEM CONTROL ---
@@ -157,14 +285,37 @@ class DashboardStatsView(APIView):
 class LhcTelemetryView(APIView):
     """
     Acts as the data buffer between C++ Producer and Vue Consumer.
+
+    ``GET ?since=<ts>`` returns every buffered sample newer than ``ts``
+    (optionally for one ``sensor``), so a client polling every few seconds
+    can still rebuild the 1 Hz stream from the last timestamp it saw.
     """
     permission_classes = [IsAuthenticatedOrReadOnly]
+    parser_classes = [JSONParser, NDJSONParser, FormParser, MultiPartParser]
+    invalid_since = "'since' must be a unix timestamp."
 
     def get(self, request):
-        current_status = cache.get('beam_status', 'STABLE BEAMS')
-
-        last_data = cache.get('last_lhc_data')
-
+        try:
+            since = self.get_since(request)
+        except ValueError:
+            return Response({"detail": self.invalid_since}, status=status.HTTP_400_BAD_REQUEST)
+
+        current_status = telemetry.get_beam_status()
+        if since is not None:
+            samples = telemetry.samples_since(since, request.query_params.get('sensor'))
+            return self.history_response(samples, current_status)
+        return self.latest_response(telemetry.get_last_sample(), current_status)
+
+    def get_since(self, request):
+        since = request.query_params.get('since')
+        return None if since is None else float(since)
+
+    def history_response(self, samples, current_status):
+        for sample in samples:
+            sample["status"] = current_status
+        return Response(samples, status=status.HTTP_200_OK)
+
+    def latest_response(self, last_data, current_status):
         if not last_data:
             last_data = {
                 "value": 0,
@@ -177,18 +328,67 @@ class LhcTelemetryView(APIView):
         return Response([last_data], status=status.HTTP_200_OK)
 
     def post(self, request):
-        cache.set('last_lhc_data', request.data, 30)
-        return Response({"status": "received"}, status=status.HTTP_201_CREATED)
+        """
+        Accepts one sample object, a JSON array of samples or an NDJSON body.
+        Valid samples of a batch are stored together; invalid ones are
+        reported by index.
+        """
+        if isinstance(request.data, list):
+            return self._ingest_batch(request.data)
+
+        try:
+            reading = telemetry.parse_sample(request.data)
+        except ValueError as exc:
+            metrics.TELEMETRY_SAMPLES.labels(result='rejected').inc()
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            timestamp = telemetry.record_sample(*reading)
+        except telemetry.TelemetryBusy as exc:
+            return self.busy_response(exc)
+        metrics.TELEMETRY_SAMPLES.labels(result='accepted').inc()
+        telemetry.set_last_sample({**request.data, "timestamp": timestamp})
+        return Response({"status": "received", "timestamp": timestamp}, status=status.HTTP_201_CREATED)
+
+    def _ingest_batch(self, items):
+        readings, accepted_items, errors = [], [], []
+        for index, item in enumerate(items):
+            try:
+                if isinstance(item, InvalidLine):
+                    raise ValueError(f"invalid JSON: {item.error}")
+                readings.append(telemetry.parse_sample(item))
+                accepted_items.append(item)
+            except ValueError as exc:
+                errors.append({"index": index, "detail": str(exc)})
+
+        try:
+            timestamps = telemetry.record_samples(readings)
+        except telemetry.TelemetryBusy as exc:
+            return self.busy_response(exc)
+        metrics.TELEMETRY_SAMPLES.labels(result='accepted').inc(len(readings))
+        metrics.TELEMETRY_SAMPLES.labels(result='rejected').inc(len(errors))
+        if accepted_items:
+            telemetry.set_last_sample({**accepted_items[-1], "timestamp": timestamps[-1]})
+
+        return Response(
+            {"accepted": len(readings), "rejected": len(errors), "errors": errors},
+            status=status.HTTP_201_CREATED if readings else status.HTTP_400_BAD_REQUEST
+        )
+
+    def busy_response(self, exc):
+        # Nothing of the request was stored; the client can resend it as is.
+        return Response({"detail": str(exc)}, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        headers={'Retry-After': '1'})
 
 
 @api_view(['POST'])
 def update_lhc_status(request):
     new_status = request.data.get('status', 'NO BEAM')
-    cache.set('beam_status', new_status, None)
+    telemetry.set_beam_status(new_status)
     return Response({"status": new_status}, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
 def get_lhc_status(request):
-    status_val = cache.get('beam_status', 'STABLE BEAMS')
+    status_val = telemetry.get_beam_status()
     return Response({"status": status_val}, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -28,9 +28,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.profiling.RequestProfilingMiddleware',  # outermost; inactive unless REQUEST_PROFILING=1
+    'api.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'api.staticfiles.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -58,6 +60,14 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# --- SERVER MODE ---
+# SERVER_MODE=wsgi  gunicorn sync workers on config.wsgi (default)
+# SERVER_MODE=asgi  gunicorn + uvicorn workers on config.asgi; the read-heavy
+#                   endpoints are then served by the coroutine views in
+#                   api/async_views.py (override with ASYNC_VIEWS=0/1).
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi').lower()
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', str(SERVER_MODE == 'asgi')).lower() in ('1', 'true', 'yes')
+
 # --- STEP 2: POSTGRESQL CONFIGURATION ---
 DATABASES = {
     'default': {
@@ -70,6 +80,91 @@ DATABASES = {
     }
 }
 
+# Migration 0011 adds the one-shift-per-member-per-day constraint and stops if
+# older data books a member twice on a day. DEDUPLICATE_SHIFTS=1 lets it keep
+# the earliest booking of each such day and delete the rest, listing them.
+DEDUPLICATE_SHIFTS = os.environ.get('DEDUPLICATE_SHIFTS', '').lower() in ('1', 'true', 'yes')
+
+# --- SHARED CACHE ---
+# Beam status, telemetry and the dashboard payload must be identical in every
+# gunicorn worker, so the cache is never per-process outside of tests.
+#   CACHE_BACKEND=database  cache table in Postgres, no extra service (default)
+#   CACHE_BACKEND=file      FileBasedCache in CACHE_LOCATION on a shared disk
+#   CACHE_BACKEND=redis     REDIS_URL (picked automatically when REDIS_URL is set)
+#   CACHE_BACKEND=locmem    single process only
+# TELEMETRY_CACHE_BACKEND lets the 1 Hz telemetry state live elsewhere.
+# CACHE_MAX_ENTRIES bounds each database/file cache before Django culls a third
+# of it (Django's default of 300 would cull on every busy minute).
+CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 100000))
+
+
+def cache_config(backend, prefix, max_entries=CACHE_MAX_ENTRIES):
+    if backend == 'redis':
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL', 'redis://redis:6379/0'),
+            'KEY_PREFIX': prefix,
+        }
+    if backend == 'file':
+        return {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(os.environ.get('CACHE_LOCATION', '/tmp/glance_cache'), prefix),
+            'OPTIONS': {'MAX_ENTRIES': max_entries},
+        }
+    if backend == 'locmem':
+        return {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': prefix,
+            'OPTIONS': {'MAX_ENTRIES': max_entries},
+        }
+    return {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        # One table per cache: a cull in one never deletes the other's keys.
+        'LOCATION': f'{prefix}_cache',
+        'KEY_PREFIX': prefix,
+        'OPTIONS': {'MAX_ENTRIES': max_entries},
+    }
+
+
+# Facet counts get their own, smaller cache: one entry per distinct filter and
+# search, so free-text searches only ever cull each other (Redis expires them).
+FACET_CACHE_MAX_ENTRIES = int(os.environ.get('FACET_CACHE_MAX_ENTRIES', 2000))
+
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'redis' if os.environ.get('REDIS_URL') else 'database')
+
+CACHES = {
+    'default': cache_config(CACHE_BACKEND, 'glance'),
+    'telemetry': cache_config(os.environ.get('TELEMETRY_CACHE_BACKEND', CACHE_BACKEND), 'telemetry'),
+    'facets': cache_config(CACHE_BACKEND, 'facets', FACET_CACHE_MAX_ENTRIES),
+}
+
+# Samples kept per sensor for GET /api/lhc-telemetry/?since= (5 minutes at 1 Hz)
+TELEMETRY_HISTORY_SIZE = int(os.environ.get('TELEMETRY_HISTORY_SIZE', 300))
+
+# --- REQUEST PROFILING (opt-in) ---
+# REQUEST_PROFILING=1 adds a Server-Timing header (db, view, render, total)
+# and one JSON line per request on the api.profiling logger, with the slowest
+# REQUEST_PROFILING_SLOW_QUERIES queries. REQUEST_PROFILING_SAMPLE_RATE of the
+# requests whose path starts with one of REQUEST_PROFILING_PATHS (comma
+# separated; every path when empty) also run under cProfile, dumped to
+# REQUEST_PROFILING_DIR.
+REQUEST_PROFILING = os.environ.get('REQUEST_PROFILING', '').lower() in ('1', 'true', 'yes')
+REQUEST_PROFILING_SAMPLE_RATE = float(os.environ.get('REQUEST_PROFILING_SAMPLE_RATE', 0))
+REQUEST_PROFILING_PATHS = [p for p in os.environ.get('REQUEST_PROFILING_PATHS', '').split(',') if p]
+REQUEST_PROFILING_DIR = os.environ.get('REQUEST_PROFILING_DIR', '/tmp/glance_profiles')
+REQUEST_PROFILING_SLOW_QUERIES = int(os.environ.get('REQUEST_PROFILING_SLOW_QUERIES', 3))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.profiling': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     { 'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator', },
     { 'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator', },
@@ -87,10 +182,36 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+# --- JWT AUTHENTICATION ---
+# JWT_AUTH_MODE=stateless  the user is built from the verified token claims;
+#                          verified tokens are kept in a per-process LRU of
+#                          JWT_TOKEN_CACHE_SIZE entries for at most
+#                          JWT_TOKEN_CACHE_TTL seconds (default)
+# JWT_AUTH_MODE=database   simplejwt's JWTAuthentication: one User query per request
+# Admin-only actions read the account from the database in either mode.
+JWT_AUTH_MODE = os.environ.get('JWT_AUTH_MODE', 'stateless').lower()
+JWT_TOKEN_CACHE_SIZE = int(os.environ.get('JWT_TOKEN_CACHE_SIZE', 1024))
+JWT_TOKEN_CACHE_TTL = int(os.environ.get('JWT_TOKEN_CACHE_TTL', 300))
+JWT_AUTHENTICATION_CLASSES = {
+    'stateless': 'api.authentication.StatelessJWTAuthentication',
+    'database': 'rest_framework_simplejwt.authentication.JWTAuthentication',
+}
+
+# --- LIST SERIALIZATION ---
+# FAST_LIST_SERIALIZATION=1  the member, analysis and shift lists are built from
+#                            values_list() rows instead of model instances
+#                            (api/values.py); same JSON, byte for byte (default)
+# Responses are rendered with orjson (api/renderers.py) either way.
+FAST_LIST_SERIALIZATION = os.environ.get('FAST_LIST_SERIALIZATION', '1').lower() in ('1', 'true', 'yes')
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        JWT_AUTHENTICATION_CLASSES[JWT_AUTH_MODE],
     ),
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
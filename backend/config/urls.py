@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
@@ -11,6 +12,15 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from api.metrics import metrics_view
+
+if settings.ASYNC_VIEWS:
+    from api.async_views import (
+        AsyncAnalysisViewSet as AnalysisViewSet, AsyncDashboardStatsView as DashboardStatsView,
+        AsyncInstituteViewSet as InstituteViewSet, AsyncLhcTelemetryView as LhcTelemetryView,
+        AsyncMemberViewSet as MemberViewSet, AsyncShiftViewSet as ShiftViewSet,
+        async_get_lhc_status as get_lhc_status,
+    )
 
 router = DefaultRouter()
 router.register(r'institutes', InstituteViewSet)
@@ -34,4 +44,7 @@ urlpatterns = [
     path('api/lhc-telemetry/', LhcTelemetryView.as_view(), name='lhc-telemetry'),
     path('api/update-lhc-status/', update_lhc_status, name='update-lhc-status'),
     path('api/get-lhc-status/', get_lhc_status, name='get-lhc-status'),
+
+    # Prometheus scrape target
+    path('api/metrics', metrics_view, name='metrics'),
 ]
\ No newline at end of file
@@ -1,4 +1,6 @@
 #!/bin/sh
+# Stop on the first failing step (e.g. a migration) rather than serve a half-migrated schema.
+set -e
 
 # 1. Wait for Postgres to be ready
 echo "Waiting for postgres..."
@@ -23,6 +25,8 @@ echo "PostgreSQL started"
 # 2. Apply Database Migrations
 echo "Applying migrations..."
 python manage.py migrate --noinput
+# No-op unless CACHE_BACKEND=database (the default shared cache)
+python manage.py createcachetable
 
 # 3. Create or Reset Superuser
 echo "Syncing demo admin credentials..."
@@ -57,5 +61,17 @@ else
 fi
 
 # 5. Start the Server
+# Each gunicorn worker writes its Prometheus metrics to mmap files here;
+# cleared on start so counters restart with the server.
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/glance_metrics}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# SERVER_MODE=asgi runs uvicorn workers on config/asgi.py, which also serves the
+# LHC event stream and routes the read-heavy endpoints to async views.
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    echo "Starting Gunicorn with Uvicorn workers (ASGI)..."
+    exec gunicorn --bind 0.0.0.0:8000 --worker-class uvicorn_worker.UvicornWorker config.asgi:application
+fi
+
 echo "Starting Gunicorn..."
 exec gunicorn --bind 0.0.0.0:8000 config.wsgi:application
\ No newline at end of file
@@ -0,0 +1,10 @@
+# Loaded automatically by gunicorn from the working directory (/app).
+import os
+
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    # Drops the dead worker's live gauge files; its counters stay in the merged totals.
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
@@ -8,6 +8,7 @@
 #include <cstdio>
 #include <iomanip>
 #include <sstream>
+#include <mutex>
 
 size_t WriteCallback(void* contents, size_t size, size_t nmemb, void* userp) {
     ((std::string*)userp)->append((char*)contents, size * nmemb);
@@ -54,15 +55,99 @@ public:
     }
 };
 
+// Follows /api/lhc-stream/ (Server-Sent Events) in a background thread, so the
+// beam status arrives when it changes instead of one HTTP poll per second.
+class StatusStream {
+public:
+    void start() {
+        std::thread([this] { run(); }).detach();
+    }
+
+    // Latest pushed status; empty while the stream is down (then poll instead).
+    std::string status() {
+        std::lock_guard<std::mutex> lock(mutex_);
+        return connected_ ? status_ : "";
+    }
+
+private:
+    std::mutex mutex_;
+    std::string status_;
+    bool connected_ = false;
+    std::string buffer_;
+    std::string event_;
+
+    static size_t onData(void* contents, size_t size, size_t nmemb, void* userp) {
+        static_cast<StatusStream*>(userp)->feed(std::string((char*)contents, size * nmemb));
+        return size * nmemb;
+    }
+
+    void feed(const std::string& chunk) {
+        buffer_ += chunk;
+        size_t end;
+        while ((end = buffer_.find('\n')) != std::string::npos) {
+            std::string line = buffer_.substr(0, end);
+            buffer_.erase(0, end + 1);
+            if (line.rfind("event: ", 0) == 0) {
+                event_ = line.substr(7);
+            } else if (line.rfind("data: ", 0) == 0 && event_ == "status") {
+                // data: {"status": "STABLE BEAMS"}
+                std::string data = line.substr(6);
+                size_t key = data.find("\"status\"");
+                size_t open = data.find('"', data.find(':', key) + 1);
+                size_t close = data.find('"', open + 1);
+                if (key != std::string::npos && open != std::string::npos && close != std::string::npos) {
+                    std::lock_guard<std::mutex> lock(mutex_);
+                    status_ = data.substr(open + 1, close - open - 1);
+                    connected_ = true;
+                }
+            } else if (line.empty()) {
+                event_.clear();
+            }
+        }
+    }
+
+    void run() {
+        const char* env_url = std::getenv("STREAM_URL");
+        std::string url = (env_url != nullptr) ? env_url : "http://glance-stream:8001/api/lhc-stream/";
+        while (true) {
+            CURL* curl = curl_easy_init();
+            if (curl) {
+                buffer_.clear();
+                event_.clear();
+                curl_easy_setopt(curl, CURLOPT_URL, url.c_str());
+                curl_easy_setopt(curl, CURLOPT_WRITEFUNCTION, onData);
+                curl_easy_setopt(curl, CURLOPT_WRITEDATA, this);
+                // The server sends a keep-alive comment every 15 s; a silent minute means it is gone.
+                curl_easy_setopt(curl, CURLOPT_LOW_SPEED_LIMIT, 1L);
+                curl_easy_setopt(curl, CURLOPT_LOW_SPEED_TIME, 60L);
+                CURLcode res = curl_easy_perform(curl);
+                curl_easy_cleanup(curl);
+                std::cerr << "Stream Error: " << curl_easy_strerror(res) << ", polling until it is back" << std::endl;
+            }
+            {
+                std::lock_guard<std::mutex> lock(mutex_);
+                connected_ = false;
+            }
+            std::this_thread::sleep_for(std::chrono::seconds(2));
+        }
+    }
+};
+
 int main() {
+    curl_global_init(CURL_GLOBAL_DEFAULT);
     TelemetryClient client;
+    StatusStream stream;
+    stream.start();
     std::default_random_engine generator;
     std::uniform_real_distribution<double> jitter(-0.06e11, 0.06e11);
 
     double currentEnergy = 0.0;
 
     while(true) {
-        std::string statusResponse = client.getStatus();
+        std::string statusResponse = stream.status();
+        if (statusResponse.empty()) {
+            statusResponse = client.getStatus();
+        }
         double intensity = 0;
         std::string mode = "NO BEAM";
 
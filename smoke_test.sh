@@ -43,4 +43,14 @@ else
     echo -e "${RED}FAIL (No sensor data found in history)${NC}"
 fi
 
+# 4. Test the LHC event stream (ASGI service behind Nginx)
+echo -n "Checking LHC event stream... "
+EVENTS=$(curl -s -N --max-time 3 http://localhost/api/lhc-stream/)
+
+if [[ $EVENTS == *"event: status"* ]]; then
+    echo -e "${GREEN}PASS${NC}"
+else
+    echo -e "${RED}FAIL (No status event on /api/lhc-stream/)${NC}"
+fi
+
 echo "---------------------------------------"